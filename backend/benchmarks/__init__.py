@@ -0,0 +1,2 @@
+# Benchmark and load-test tooling for the CareerUp backend.
+# Run `python -m backend.benchmarks.load_test --help` from the repository root.
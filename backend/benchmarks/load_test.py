@@ -0,0 +1,478 @@
+import argparse
+import http.client
+import json
+import math
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+from urllib.parse import urlencode
+
+# --- Load Test / Benchmark Driver ---
+# Boots the backend (see server.py) against the fake LLM provider, drives a mix of
+# realistic traffic and writes a JSON report that can be compared across commits.
+#
+#   python -m backend.benchmarks.load_test --duration 30 --concurrency 16
+#   python -m backend.benchmarks.load_test --compare benchmarks/results/<old>.json
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+DEFAULT_RESULTS_DIR = REPO_ROOT / "benchmarks" / "results"
+
+# Relative weight of each operation in the steady-state mix.
+DEFAULT_MIX = {
+    "login": 5,
+    "refresh": 5,
+    "me": 20,
+    "interview_history": 5,
+    "profile_edit": 25,
+    "roadmap": 10,
+    "interview_feedback": 8,
+    "interview_batch": 2,
+    "market_insights": 15,
+    "resume_review": 10,
+    "chat": 5,
+}
+
+SAMPLE_RESUME = (
+    "Jane Doe | jane@example.com\n\nEDUCATION\nB.Tech Computer Science, 2021-2025, CGPA 8.4\n\n"
+    "EXPERIENCE\nSoftware Intern, Acme Corp (May 2024 - Jul 2024)\n"
+    "- Built a REST API in FastAPI serving 2k requests/day\n- Reduced report generation time by 40%\n\n"
+    "PROJECTS\nCareer Tracker - React, Node.js, MongoDB\n- Tracks applications for 300 students\n\n"
+    "SKILLS\nPython, JavaScript, SQL, Docker, Git\n"
+)
+
+
+# --- HTTP Client ---
+
+class Client:
+    """A keep-alive HTTP client bound to one worker thread."""
+
+    def __init__(self, host: str, port: int, timeout: float):
+        self.host, self.port, self.timeout = host, port, timeout
+        self.conn = None
+
+    def request(self, method: str, path: str, body=None, headers=None, form: bool = False):
+        headers = dict(headers or {})
+        payload = None
+        if body is not None:
+            if form:
+                payload = urlencode(body)
+                headers["Content-Type"] = "application/x-www-form-urlencoded"
+            else:
+                payload = json.dumps(body)
+                headers["Content-Type"] = "application/json"
+        for attempt in range(2):
+            if self.conn is None:
+                self.conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            try:
+                self.conn.request(method, path, body=payload, headers=headers)
+                response = self.conn.getresponse()
+                data = response.read()
+                return response.status, data
+            except (http.client.HTTPException, ConnectionError, socket.timeout, OSError):
+                self.conn.close()
+                self.conn = None
+                if attempt:
+                    return 0, b""
+        return 0, b""
+
+
+# --- Resource Sampling ---
+
+class ResourceSampler(threading.Thread):
+    """Samples CPU and RSS of the server process; uses psutil when installed, /proc otherwise."""
+
+    def __init__(self, pid: int, interval: float = 0.5):
+        super().__init__(daemon=True)
+        self.pid, self.interval = pid, interval
+        self.samples = []
+        self._stop_event = threading.Event()
+        try:
+            import psutil
+            self._proc = psutil.Process(pid)
+        except Exception:
+            self._proc = None
+
+    def _read(self):
+        if self._proc is not None:
+            times = self._proc.cpu_times()
+            return times.user + times.system, self._proc.memory_info().rss
+        try:
+            with open(f"/proc/{self.pid}/stat") as fh:
+                fields = fh.read().rsplit(")", 1)[1].split()
+            ticks = os.sysconf("SC_CLK_TCK")
+            cpu = (int(fields[11]) + int(fields[12])) / ticks
+            with open(f"/proc/{self.pid}/status") as fh:
+                rss = next(int(line.split()[1]) * 1024 for line in fh if line.startswith("VmRSS:"))
+            return cpu, rss
+        except (OSError, StopIteration, IndexError, ValueError):
+            return None
+
+    def run(self):
+        previous = None
+        while not self._stop_event.is_set():
+            reading = self._read()
+            now = time.perf_counter()
+            if reading is not None:
+                if previous is not None:
+                    cpu_pct = 100.0 * (reading[0] - previous[1][0]) / max(now - previous[0], 1e-9)
+                    self.samples.append((cpu_pct, reading[1]))
+                previous = (now, reading)
+            self._stop_event.wait(self.interval)
+
+    def stop(self) -> dict:
+        self._stop_event.set()
+        self.join(timeout=2)
+        if not self.samples:
+            return {"available": False}
+        cpu = [s[0] for s in self.samples]
+        rss = [s[1] for s in self.samples]
+        return {
+            "available": True,
+            "cpu_percent_avg": round(sum(cpu) / len(cpu), 1),
+            "cpu_percent_max": round(max(cpu), 1),
+            "rss_mb_avg": round(sum(rss) / len(rss) / 2**20, 1),
+            "rss_mb_max": round(max(rss) / 2**20, 1),
+        }
+
+
+# --- Statistics ---
+
+def percentile(sorted_values, pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(pct / 100.0 * len(sorted_values)) - 1, 0)
+    return sorted_values[rank]
+
+
+def summarize(records, elapsed: float) -> dict:
+    def _stats(rows):
+        latencies = sorted(r[1] for r in rows)
+        errors = sum(1 for r in rows if not 200 <= r[2] < 300)
+        return {
+            "requests": len(rows),
+            "errors": errors,
+            "error_rate": round(errors / len(rows), 4) if rows else 0.0,
+            "rps": round(len(rows) / elapsed, 2) if elapsed else 0.0,
+            "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+            "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+            "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+            "max_ms": round(latencies[-1] * 1000, 2) if latencies else 0.0,
+        }
+
+    by_name = defaultdict(list)
+    for record in records:
+        by_name[record[0]].append(record)
+    return {
+        "overall": _stats(records),
+        "endpoints": {name: _stats(rows) for name, rows in sorted(by_name.items())},
+    }
+
+
+# --- Traffic Scenario ---
+
+class Scenario:
+    """Seeds users and performs the individual operations of the traffic mix."""
+
+    def __init__(self, host: str, port: int, timeout: float, users: int, rng: random.Random):
+        self.host, self.port, self.timeout = host, port, timeout
+        self.rng = rng
+        self.users = []  # list of dicts: email, password, token, refresh_token, skill_ids
+        self._count = users
+        self._lock = threading.Lock()
+
+    def seed(self):
+        client = Client(self.host, self.port, self.timeout)
+        run_id = uuid.uuid4().hex[:8]
+        for i in range(self._count):
+            email = f"bench-{run_id}-{i}@example.com"
+            password = "bench-password"
+            client.request("POST", "/api/auth/register", {
+                "full_name": f"Bench User {i}", "email": email, "password": password,
+                "role": "pro" if i % 5 == 0 else "free",
+            })
+            status, data = client.request("POST", "/api/auth/login",
+                                          {"username": email, "password": password}, form=True)
+            if status != 200:
+                raise RuntimeError(f"Could not log in seeded user {email}: {status} {data[:200]!r}")
+            tokens = json.loads(data)
+            self.users.append({"email": email, "password": password, "token": tokens["access_token"],
+                               "refresh_token": tokens.get("refresh_token"), "skill_ids": [],
+                               "conversation_id": None, "lock": threading.Lock()})
+
+    def _auth(self, user):
+        return {"Authorization": f"Bearer {user['token']}"}
+
+    def run(self, name: str, client: Client):
+        user = self.rng.choice(self.users)
+        return getattr(self, f"op_{name}")(client, user)
+
+    def op_login(self, client, user):
+        status, data = client.request("POST", "/api/auth/login",
+                                      {"username": user["email"], "password": user["password"]}, form=True)
+        if status == 200:
+            tokens = json.loads(data)
+            user["token"], user["refresh_token"] = tokens["access_token"], tokens.get("refresh_token")
+        return status
+
+    op_login_burst = op_login
+
+    def op_refresh(self, client, user):
+        # Rotation is single-use, so serialize refreshes of the same user.
+        with user["lock"]:
+            status, data = client.request("POST", "/api/auth/refresh", {"refresh_token": user["refresh_token"]})
+            if status == 200:
+                tokens = json.loads(data)
+                user["token"], user["refresh_token"] = tokens["access_token"], tokens["refresh_token"]
+        return status
+
+    def op_me(self, client, user):
+        return client.request("GET", "/api/users/me", headers=self._auth(user))[0]
+
+    def op_interview_history(self, client, user):
+        return client.request("GET", "/api/interview/sessions?limit=20", headers=self._auth(user))[0]
+
+    def op_profile_edit(self, client, user):
+        level = self.rng.choice(["Beginner", "Intermediate", "Advanced", "Expert"])
+        with self._lock:
+            skill_id = self.rng.choice(user["skill_ids"]) if user["skill_ids"] and self.rng.random() < 0.6 else None
+        body = {"skill_name": self.rng.choice(["Python", "SQL", "React", "Docker"]), "proficiency": level}
+        if skill_id is None:
+            status, data = client.request("POST", "/api/profile/skills", body, headers=self._auth(user))
+            if status == 201:
+                with self._lock:
+                    user["skill_ids"].append(json.loads(data)["skill_id"])
+            return status
+        return client.request("PUT", f"/api/profile/skills/{skill_id}", body, headers=self._auth(user))[0]
+
+    def op_roadmap(self, client, user):
+        body = {"job_title": self.rng.choice(["Data Analyst", "Backend Engineer", "ML Engineer"])}
+        return client.request("POST", "/api/career/generate-roadmap", body, headers=self._auth(user))[0]
+
+    def op_interview_feedback(self, client, user):
+        body = {"question": "Tell me about a time you handled a conflict.",
+                "user_answer": "In my internship two teammates disagreed on the API design, so I ..."}
+        return client.request("POST", "/api/interview/feedback", body, headers=self._auth(user))[0]
+
+    def op_interview_batch(self, client, user):
+        # A full 8-question mock interview evaluated in one request.
+        body = {"answers": [{"question": f"Interview question {i}?", "user_answer": "I used the STAR method."}
+                            for i in range(8)]}
+        return client.request("POST", "/api/interview/sessions/batch", body, headers=self._auth(user))[0]
+
+    def op_market_insights(self, client, user):
+        body = {"jobTitle": self.rng.choice(["Data Analyst", "DevOps Engineer", "Product Manager"])}
+        return client.request("POST", "/api/market-insights", body, headers=self._auth(user))[0]
+
+    def op_resume_review(self, client, user):
+        body = {"resumeText": SAMPLE_RESUME, "collegeTier": "Tier 2/3", "skills": ["Python", "SQL"]}
+        return client.request("POST", "/api/resume/review", body, headers=self._auth(user))[0]
+
+    def op_chat(self, client, user):
+        # Keeps extending one conversation per user, so long-history turns are measured too.
+        body = {"message": "How should I prepare for backend interviews?", "stream": False,
+                "conversation_id": user["conversation_id"]}
+        status, data = client.request("POST", "/api/chat", body, headers=self._auth(user))
+        if status == 200:
+            user["conversation_id"] = json.loads(data)["conversation_id"]
+        return status
+
+
+def run_load(scenario: Scenario, mix: dict, duration: float, concurrency: int,
+             burst_size: int, burst_interval: float):
+    records = []
+    records_lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+    names = list(mix)
+    weights = [mix[n] for n in names]
+
+    def _timed(name, client):
+        start = time.perf_counter()
+        try:
+            status = scenario.run(name, client)
+        except Exception:
+            status = 0
+        elapsed = time.perf_counter() - start
+        with records_lock:
+            records.append((name, elapsed, status))
+
+    def _worker(seed):
+        rng = random.Random(seed)
+        client = Client(scenario.host, scenario.port, scenario.timeout)
+        while time.perf_counter() < deadline:
+            _timed(rng.choices(names, weights)[0], client)
+
+    def _bursts():
+        # Login bursts model a class logging in at the start of a lab session.
+        while time.perf_counter() + burst_interval < deadline:
+            time.sleep(burst_interval)
+            threads = [threading.Thread(target=_timed, args=("login_burst", Client(scenario.host, scenario.port, scenario.timeout)))
+                       for _ in range(burst_size)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+
+    threads = [threading.Thread(target=_worker, args=(i,), daemon=True) for i in range(concurrency)]
+    if burst_size > 0:
+        threads.append(threading.Thread(target=_bursts, daemon=True))
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return records, time.perf_counter() - started
+
+
+# --- Server Lifecycle ---
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port: int, fake_config: dict, workdir: str):
+    env = dict(os.environ)
+    env.setdefault("JWT_SECRET_KEY", "benchmark-secret")
+    env["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    # A fresh shared cache per run keeps results comparable across runs.
+    env["CACHE_URL"] = f"sqlite:///{os.path.join(workdir, 'cache.db')}"
+    cmd = [sys.executable, "-m", "backend.benchmarks.server", "--port", str(port),
+           "--fake-config", json.dumps(fake_config)]
+    proc = subprocess.Popen(cmd, cwd=REPO_ROOT, env=env)
+    client = Client("127.0.0.1", port, timeout=2)
+    for _ in range(600):
+        if proc.poll() is not None:
+            raise RuntimeError("Benchmark server exited during startup.")
+        if client.request("GET", "/")[0] == 200:
+            return proc
+        time.sleep(0.1)
+    proc.terminate()
+    raise RuntimeError("Benchmark server did not become ready in time.")
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+# --- Reporting ---
+
+def print_report(report: dict, baseline: dict | None = None):
+    header = f"{'endpoint':<22}{'reqs':>8}{'rps':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'err%':>7}"
+    if baseline:
+        header += f"{'Δrps':>9}{'Δp95':>9}"
+    print(header)
+    rows = list(report["endpoints"].items()) + [("OVERALL", report["overall"])]
+    base_rows = dict(baseline["endpoints"], OVERALL=baseline["overall"]) if baseline else {}
+    for name, s in rows:
+        line = (f"{name:<22}{s['requests']:>8}{s['rps']:>9.1f}{s['p50_ms']:>9.1f}"
+                f"{s['p95_ms']:>9.1f}{s['p99_ms']:>9.1f}{100 * s['error_rate']:>7.1f}")
+        if name in base_rows:
+            b = base_rows[name]
+            line += f"{s['rps'] - b['rps']:>+9.1f}{s['p95_ms'] - b['p95_ms']:>+9.1f}"
+        print(line)
+    res = report["resources"]
+    if res.get("available"):
+        print(f"server cpu avg/max: {res['cpu_percent_avg']}%/{res['cpu_percent_max']}%  "
+              f"rss avg/max: {res['rss_mb_avg']}/{res['rss_mb_max']} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the backend against a fake LLM provider.")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds of steady-state load.")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent client workers.")
+    parser.add_argument("--users", type=int, default=20, help="Seeded user accounts.")
+    parser.add_argument("--mix", default=None, help="JSON object overriding operation weights.")
+    parser.add_argument("--burst-size", type=int, default=10, help="Logins per burst (0 disables).")
+    parser.add_argument("--burst-interval", type=float, default=5.0, help="Seconds between login bursts.")
+    parser.add_argument("--latency-ms", type=float, default=400.0)
+    parser.add_argument("--latency-distribution", default="lognormal",
+                        choices=["constant", "uniform", "exponential", "lognormal"])
+    parser.add_argument("--latency-jitter", type=float, default=0.35)
+    parser.add_argument("--tokens-per-second", type=float, default=80.0)
+    parser.add_argument("--output-tokens", type=int, default=120)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--timeout", type=float, default=60.0, help="Client request timeout in seconds.")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--results-dir", default=str(DEFAULT_RESULTS_DIR))
+    parser.add_argument("--compare", default=None, help="Previous result JSON to diff against.")
+    args = parser.parse_args()
+
+    mix = dict(DEFAULT_MIX)
+    if args.mix:
+        mix.update(json.loads(args.mix))
+    mix = {k: v for k, v in mix.items() if v > 0}
+    fake_config = {
+        "latency_ms": args.latency_ms,
+        "latency_distribution": args.latency_distribution,
+        "latency_jitter": args.latency_jitter,
+        "tokens_per_second": args.tokens_per_second,
+        "output_tokens": args.output_tokens,
+        "error_rate": args.error_rate,
+        "seed": args.seed,
+    }
+
+    with tempfile.TemporaryDirectory(prefix="careerup-bench-") as workdir:
+        port = _free_port()
+        proc = start_server(port, fake_config, workdir)
+        try:
+            scenario = Scenario("127.0.0.1", port, args.timeout, args.users, random.Random(args.seed))
+            print(f"Seeding {args.users} users...")
+            scenario.seed()
+            sampler = ResourceSampler(proc.pid)
+            sampler.start()
+            print(f"Running {args.duration:.0f}s of load at concurrency {args.concurrency}...")
+            records, elapsed = run_load(scenario, mix, args.duration, args.concurrency,
+                                        args.burst_size, args.burst_interval)
+            resources = sampler.stop()
+        finally:
+            proc.terminate()
+            try:
+                proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+
+    commit = _git_commit()
+    report = {
+        "meta": {
+            "commit": commit,
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "duration_s": round(elapsed, 2),
+            "concurrency": args.concurrency,
+            "users": args.users,
+            "mix": mix,
+            "burst": {"size": args.burst_size, "interval_s": args.burst_interval},
+            "fake_llm": fake_config,
+        },
+        **summarize(records, elapsed),
+        "resources": resources,
+    }
+
+    results_dir = Path(args.results_dir)
+    results_dir.mkdir(parents=True, exist_ok=True)
+    out_path = results_dir / f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{commit}.json"
+    out_path.write_text(json.dumps(report, indent=2))
+
+    baseline = json.loads(Path(args.compare).read_text()) if args.compare else None
+    print_report(report, baseline)
+    print(f"Results written to {out_path}")
+
+
+if __name__ == "__main__":
+    main()
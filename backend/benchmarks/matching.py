@@ -0,0 +1,118 @@
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+import numpy as np
+from sqlalchemy import create_engine, text
+
+# --- Role Matching Benchmark ---
+# Synthetic students and market-trend roles drawn from one skill vocabulary
+# (Zipf-like: a few skills everywhere, a long tail of rare ones). Times the
+# in-memory scoring pipeline, and with --end-to-end the whole nightly job
+# against a throwaway SQLite database (reads, process pool, bulk writes).
+#
+#   python -m backend.benchmarks.matching --students 100000 --roles 1000 --workers 4
+#   python -m backend.benchmarks.matching --end-to-end
+
+PROFICIENCIES = ["Beginner", "Intermediate", "Advanced", "Expert"]
+
+
+def synthetic_skills(count: int):
+    skills = [f"skill {i}" for i in range(count)]
+    weights = [1 / rank for rank in range(1, count + 1)]
+    return skills, weights
+
+
+def synthetic_roles(roles: int, skills, weights, rng: random.Random):
+    return [(trend_id, {name: 1.0 for name in rng.choices(skills, weights, k=rng.randint(6, 14))})
+            for trend_id in range(1, roles + 1)]
+
+
+def synthetic_students(students: int, skills, weights, rng: random.Random):
+    return {user_id: {name: rng.choice([0.25, 0.5, 0.75, 1.0])
+                      for name in rng.choices(skills, weights, k=rng.randint(3, 12))}
+            for user_id in range(1, students + 1)}
+
+
+def in_memory(args, rng: random.Random):
+    from backend.matching import RoleMatrix, StudentChunk, score_chunks, top_matches
+
+    skills, weights = synthetic_skills(args.skills)
+    roles = RoleMatrix.build(synthetic_roles(args.roles, skills, weights, rng))
+    profiles = synthetic_students(args.students, skills, weights, rng)
+    user_ids = list(profiles)
+
+    started = time.perf_counter()
+    chunks = [StudentChunk.build({u: profiles[u] for u in user_ids[i:i + args.chunk_students]}, roles.vocabulary)
+              for i in range(0, len(user_ids), args.chunk_students)]
+    print(f"built {len(chunks)} CSR chunks in {time.perf_counter() - started:.1f}s "
+          f"({sum(len(c.indices) for c in chunks)} non-zeros, {len(roles.vocabulary)} skills x {args.roles} roles)")
+
+    started = time.perf_counter()
+    matches = sum(len(m.match_user_ids) for m in score_chunks(chunks, roles, args.top_k, args.workers))
+    print(f"scored {args.students} x {args.roles} in {time.perf_counter() - started:.1f}s "
+          f"({args.workers or os.cpu_count()} workers, {matches} matches)")
+
+    # Cross-check one student against a dense dot product.
+    user_id = user_ids[0]
+    result = top_matches(chunks[0], roles, args.top_k)
+    vector = np.zeros(len(roles.vocabulary), dtype=np.float32)
+    for name, weight in profiles[user_id].items():
+        if name in roles.vocabulary:
+            vector[roles.vocabulary[name]] = weight
+    expected = np.sort(vector @ roles.weights)[::-1][:args.top_k]
+    got = result.scores[result.match_user_ids == user_id]
+    assert np.allclose(got, expected[:len(got)], atol=1e-5), (got, expected)
+    print(f"check: top {len(got)} scores of user {user_id} match a dense product")
+
+
+def end_to_end(args, rng: random.Random):
+    path = os.path.join(tempfile.mkdtemp(), "matching-bench.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+    from backend.matching import run_matching
+    from backend.migrations import upgrade
+
+    engine = create_engine(f"sqlite:///{path}")
+    upgrade(engine)
+    skills, weights = synthetic_skills(args.skills)
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO market_trends (trend_id, role, skills_required) VALUES (:id, :role, :skills)"),
+                     [{"id": trend_id, "role": f"Role {trend_id}", "skills": json.dumps(list(req))}
+                      for trend_id, req in synthetic_roles(args.roles, skills, weights, rng)])
+        conn.execute(text("INSERT INTO users (user_id, full_name, email, role) VALUES (:id, :name, :email, 'free')"),
+                     [{"id": i, "name": f"Student {i}", "email": f"s{i}@example.com"}
+                      for i in range(1, args.students + 1)])
+        conn.execute(text("INSERT INTO skills (user_id, skill_name, proficiency) VALUES (:id, :skill, :level)"),
+                     [{"id": user_id, "skill": name, "level": rng.choice(PROFICIENCIES)}
+                      for user_id, profile in synthetic_students(args.students, skills, weights, rng).items()
+                      for name in profile])
+
+    run = run_matching(k=args.top_k, workers=args.workers, chunk_students=args.chunk_students,
+                       bind=engine, read_bind=engine)
+    print(f"end to end: {run.students} students x {run.roles} roles, {run.matches} rows in {run.seconds:.1f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark batch student-role matching.")
+    parser.add_argument("--students", type=int, default=100_000)
+    parser.add_argument("--roles", type=int, default=1000)
+    parser.add_argument("--skills", type=int, default=1500)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--chunk-students", type=int, default=2000)
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--end-to-end", action="store_true", help="Run the full job against a temporary SQLite DB.")
+    parser.add_argument("--seed", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    if args.end_to_end:
+        end_to_end(args, rng)
+    else:
+        in_memory(args, rng)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+import argparse
+import sqlite3
+import time
+
+# --- Local SQLite Replicas ---
+# Stand-in read replicas for local testing of `get_read_db`: copies the primary
+# SQLite file to each replica path every `--interval` seconds, so replicas trail
+# the primary by up to that long (their file mtime is what the lag probe reads).
+#
+#   python -m backend.benchmarks.replicas careerbridge.db replica1.db replica2.db --interval 3
+#   DATABASE_REPLICA_URLS=sqlite:///./replica1.db,sqlite:///./replica2.db uvicorn backend.main:app
+
+
+def copy_database(primary: str, replica: str):
+    """Consistent snapshot of `primary` into `replica` via SQLite's online backup API."""
+    src = sqlite3.connect(primary)
+    dst = sqlite3.connect(replica)
+    try:
+        src.backup(dst)
+    finally:
+        dst.close()
+        src.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Periodically copy a SQLite database to stand-in replicas.")
+    parser.add_argument("primary")
+    parser.add_argument("replicas", nargs="+")
+    parser.add_argument("--interval", type=float, default=2.0, help="Seconds between copies (simulated lag).")
+    parser.add_argument("--once", action="store_true", help="Copy once and exit.")
+    args = parser.parse_args()
+
+    while True:
+        for replica in args.replicas:
+            copy_database(args.primary, replica)
+        print(f"Copied {args.primary} -> {', '.join(args.replicas)}")
+        if args.once:
+            return
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
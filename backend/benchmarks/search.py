@@ -0,0 +1,100 @@
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+# --- Candidate Search Benchmark ---
+# Builds a throwaway SQLite database with the real migrations, fills
+# search_documents with synthetic project / experience text (the FTS5 index is
+# maintained by the migration's triggers), and times search_candidates for
+# selective, common and filtered queries.
+#
+#   python -m backend.benchmarks.search --documents 1000000
+
+TECH = ["python", "java", "react", "node", "django", "fastapi", "redis", "kafka", "postgres", "mysql",
+        "docker", "kubernetes", "aws", "gcp", "tensorflow", "pytorch", "pandas", "spark", "flutter", "kotlin",
+        "swift", "golang", "rust", "graphql", "websocket", "tableau", "excel", "figma", "selenium", "jenkins"]
+WORDS = ["built", "designed", "implemented", "dashboard", "pipeline", "api", "service", "latency", "users",
+         "reduced", "improved", "analytics", "model", "deployment", "realtime", "chat", "inventory", "payments",
+         "search", "recommendation", "scalable", "microservice", "automation", "testing", "mobile", "app",
+         "data", "cloud", "team", "feature", "caching", "queue", "monitoring", "security", "ml", "web"]
+# Body text is drawn Zipf-style from WORDS followed by a long tail of rarer terms,
+# so common words match most documents and tail words only a few hundred.
+VOCABULARY = WORDS + TECH + [f"topic{i}" for i in range(2000)]
+ZIPF_WEIGHTS = [1 / rank for rank in range(1, len(VOCABULARY) + 1)]
+QUERIES = {
+    "rare term": ("topic1500", None),
+    "two rare-ish terms": ("rust websocket", None),
+    "common term": ("python", None),
+    "two terms, stemmed": ("redis cached", None),
+    "skill filter": ("kafka pipeline", {"skills": ["docker"]}),
+    "cohort filter": ("react dashboard", {"college": "college 7"}),
+}
+
+
+def populate(engine, documents: int, users: int, rng: random.Random):
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO users (user_id, full_name, email, role) VALUES (:id, :name, :email, 'free')"),
+                     [{"id": i, "name": f"Student {i}", "email": f"s{i}@example.com"} for i in range(1, users + 1)])
+        conn.execute(text("INSERT INTO students (user_id, fullname, email, college, branch, year_of_study) "
+                          "VALUES (:id, :name, :email, :college, 'cse', '3')"),
+                     [{"id": i, "name": f"Student {i}", "email": f"s{i}@example.com",
+                       "college": f"college {i % 500}"} for i in range(1, users + 1)])
+        conn.execute(text("INSERT INTO skills (user_id, skill_name, proficiency) VALUES (:id, :skill, 'Advanced')"),
+                     [{"id": i, "skill": rng.choice(TECH)} for i in range(1, users + 1) for _ in range(3)])
+    batch = 50_000
+    for start in range(0, documents, batch):
+        rows = []
+        for doc in range(start, min(start + batch, documents)):
+            tech = rng.sample(TECH, 3)
+            rows.append({
+                "user_id": rng.randrange(1, users + 1), "source": "project", "source_id": doc + 1,
+                "title": f"{rng.choice(WORDS)} {rng.choice(WORDS)} {tech[0]}",
+                "body": " ".join(rng.choices(VOCABULARY, ZIPF_WEIGHTS, k=25)) + " " + " ".join(tech),
+            })
+        with engine.begin() as conn:
+            conn.execute(text("INSERT INTO search_documents (user_id, source, source_id, title, body) "
+                              "VALUES (:user_id, :source, :source_id, :title, :body)"), rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark full-text candidate search on SQLite FTS5.")
+    parser.add_argument("--documents", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--database", help="Reuse (or create) this SQLite file instead of a temporary one.")
+    args = parser.parse_args()
+
+    path = args.database or os.path.join(tempfile.mkdtemp(), "search-bench.db")
+    fresh = not os.path.exists(path)
+    os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+    from backend.migrations import upgrade
+    from backend.services.search import SearchFilters, search_candidates
+
+    engine = create_engine(f"sqlite:///{path}")
+    if fresh:
+        upgrade(engine)
+        started = time.perf_counter()
+        populate(engine, args.documents, args.users, random.Random(11))
+        print(f"indexed {args.documents} documents in {time.perf_counter() - started:.0f}s ({path})")
+
+    db = sessionmaker(bind=engine)()
+    print(f"{'query':<22}{'median ms':>11}{'p95 ms':>9}{'hits':>6}")
+    for name, (q, filters) in QUERIES.items():
+        samples = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            hits, _ = search_candidates(db, q, SearchFilters(**(filters or {})), limit=20)
+            samples.append((time.perf_counter() - started) * 1000)
+        samples.sort()
+        print(f"{name:<22}{statistics.median(samples):>11.1f}{samples[int(len(samples) * 0.95) - 1]:>9.1f}"
+              f"{len(hits):>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+
+from backend.schemas import UserSchema
+from backend.utils.serialization import FastJSONResponse, schema_response
+
+# --- Serialization Benchmark ---
+# Compares FastAPI's default response path (response_model validation +
+# jsonable_encoder + json.dumps) with the fast path used by /api/users/me
+# (single validation, pydantic-core JSON bytes) on a large profile payload.
+# Both are measured through a real ASGI call so routing overhead is included.
+#
+#   python -m backend.benchmarks.serialization --sessions 500 --iterations 200
+
+
+def build_user(skills: int, projects: int, sessions: int) -> SimpleNamespace:
+    """Builds an ORM-like object shaped like a heavy `User` row."""
+    now = datetime(2025, 1, 1, 12, 0, 0)
+    return SimpleNamespace(
+        user_id=1, full_name="Bench User", email="bench@example.com", role="pro",
+        join_date=now, last_login=now,
+        skills=[SimpleNamespace(skill_id=i, user_id=1, skill_name=f"Skill {i}", proficiency="Advanced")
+                for i in range(skills)],
+        projects=[SimpleNamespace(project_id=i, user_id=1, title=f"Project {i}",
+                                  description="A project description. " * 20, tech_stack="Python, React",
+                                  project_link="https://example.com") for i in range(projects)],
+        experience=[SimpleNamespace(exp_id=i, user_id=1, company="Acme", role="Intern",
+                                    start_date=date(2024, 5, 1), end_date=date(2024, 7, 1),
+                                    achievements="Shipped features. " * 10) for i in range(5)],
+        education=[SimpleNamespace(edu_id=1, user_id=1, degree="B.Tech", university="Some University",
+                                   start_date=date(2021, 8, 1), end_date=date(2025, 5, 1), gpa=Decimal("3.62"))],
+        interview_sessions=[SimpleNamespace(session_id=i, user_id=1, question="Tell me about yourself?",
+                                            user_answer="An answer. " * 40, ai_feedback="Some feedback. " * 60,
+                                            score=Decimal("7.50"), created_at=now - timedelta(days=i))
+                            for i in range(sessions)],
+        career_score=SimpleNamespace(score_id=1, user_id=1, career_score=720, interview_success=Decimal("81.25"),
+                                     market_position="Top 20%", active_streak=12, updated_at=now),
+    )
+
+
+def build_app(user) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/default", response_model=UserSchema, response_class=JSONResponse)
+    def default_path():
+        return user
+
+    @app.get("/orjson", response_model=UserSchema, response_class=FastJSONResponse)
+    def orjson_path():
+        return user
+
+    @app.get("/fast", response_model=UserSchema)
+    def fast_path():
+        return schema_response(UserSchema, user)
+
+    return app
+
+
+async def call(app, path: str) -> bytes:
+    """Runs one GET through the ASGI app and returns the response body."""
+    body = []
+    scope = {"type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+             "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": b"",
+             "root_path": "", "headers": [], "client": ("127.0.0.1", 1), "server": ("127.0.0.1", 80)}
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.body":
+            body.append(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return b"".join(body)
+
+
+async def run(args):
+    user = build_user(args.skills, args.projects, args.sessions)
+    app = build_app(user)
+    results = {}
+    reference = None
+    for path in ("/default", "/orjson", "/fast"):
+        payload = await call(app, path)
+        decoded = json.loads(payload)
+        if reference is None:
+            reference = decoded
+        elif decoded != reference:
+            raise SystemExit(f"{path} produced a different payload than /default")
+        for _ in range(args.warmup):
+            await call(app, path)
+        timings = []
+        for _ in range(args.iterations):
+            start = time.perf_counter()
+            await call(app, path)
+            timings.append(time.perf_counter() - start)
+        timings.sort()
+        results[path] = {
+            "median_ms": round(statistics.median(timings) * 1000, 3),
+            "p95_ms": round(timings[int(len(timings) * 0.95) - 1] * 1000, 3),
+            "bytes": len(payload),
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark /me-style response serialization paths.")
+    parser.add_argument("--skills", type=int, default=40)
+    parser.add_argument("--projects", type=int, default=20)
+    parser.add_argument("--sessions", type=int, default=300)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=20)
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    base = results["/default"]["median_ms"]
+    print(f"{'path':<10}{'median ms':>12}{'p95 ms':>10}{'speedup':>10}{'bytes':>10}")
+    for path, r in results.items():
+        print(f"{path:<10}{r['median_ms']:>12.3f}{r['p95_ms']:>10.3f}{base / r['median_ms']:>9.2f}x{r['bytes']:>10}")
+
+
+if __name__ == "__main__":
+    main()
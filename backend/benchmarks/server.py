@@ -0,0 +1,37 @@
+import argparse
+import json
+import logging
+
+import uvicorn
+
+from .fake_llm import FakeLLM, FakeLLMConfig, install
+
+# --- Benchmark Server ---
+# Boots the FastAPI app with every LLM call routed to the local fake provider.
+# The load generator starts this module in a child process so that client-side
+# work does not compete with the server for the GIL.
+#
+#   python -m backend.benchmarks.server --port 8765 --fake-config '{"latency_ms": 300}'
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the backend against a fake LLM provider.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--fake-config", default="{}", help="JSON object of FakeLLMConfig fields.")
+    parser.add_argument("--log-level", default="warning")
+    args = parser.parse_args()
+
+    from backend.database import engine
+    from backend.main import app
+    from backend.migrations import upgrade
+
+    upgrade(engine)
+    install(FakeLLM(FakeLLMConfig.from_dict(json.loads(args.fake_config))))
+
+    logging.getLogger().setLevel(args.log_level.upper())
+    uvicorn.run(app, host=args.host, port=args.port, log_level=args.log_level, access_log=False)
+
+
+if __name__ == "__main__":
+    main()
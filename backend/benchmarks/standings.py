@@ -0,0 +1,71 @@
+import argparse
+import random
+import statistics
+import time
+
+from backend.services.standings import StandingsIndex
+
+# --- Cohort Standings Benchmark ---
+# Loads a synthetic population into the in-memory standings index and measures
+# the vectorized rebuild, per-user standing lookups (rank + percentile in all
+# three cohorts) and incremental score updates.
+#
+#   python -m backend.benchmarks.standings --students 300000 --colleges 1500
+
+
+def synthetic_population(students: int, colleges: int, rng: random.Random):
+    branches = ["cse", "ece", "me", "civil", "it", "eee"]
+    years = ["1", "2", "3", "4"]
+    batches, scores = {}, []
+    for user_id in range(1, students + 1):
+        batches[user_id] = (f"college {rng.randrange(colleges)}", rng.choice(branches), rng.choice(years))
+        scores.append((user_id, min(max(int(rng.gauss(550, 150)), 0), 1000)))
+    return batches, scores
+
+
+def _timings(fn, calls: int):
+    samples = []
+    for _ in range(calls):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.99) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark cohort rank / percentile queries.")
+    parser.add_argument("--students", type=int, default=300_000)
+    parser.add_argument("--colleges", type=int, default=1500)
+    parser.add_argument("--queries", type=int, default=20_000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    batches, scores = synthetic_population(args.students, args.colleges, rng)
+    index = StandingsIndex()
+
+    started = time.perf_counter()
+    index.load(batches, scores)
+    print(f"rebuild: {args.students} students in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+    users = [rng.randrange(1, args.students + 1) for _ in range(args.queries)]
+    it = iter(users)
+    p50, p99 = _timings(lambda: index.standings(next(it)), args.queries)
+    print(f"standing lookup: median {p50:.4f} ms, p99 {p99:.4f} ms")
+
+    it = iter(users)
+    p50, p99 = _timings(lambda: index.set_score(next(it), rng.randrange(1001)), args.queries)
+    print(f"score update:    median {p50:.4f} ms, p99 {p99:.4f} ms")
+
+    # Cross-check one cohort against a full sort.
+    user_id = users[0]
+    batch_standing = index.standings(user_id)[0]
+    cohort = [index.score_of(u) for u, b in batches.items() if b == batches[user_id]]
+    expected_rank = sum(1 for s in cohort if s > index.score_of(user_id)) + 1
+    assert (batch_standing.rank, batch_standing.total) == (expected_rank, len(cohort)), batch_standing
+    print(f"check: rank {batch_standing.rank}/{batch_standing.total} matches a full sort")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+import io
+import zlib
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Dict, Iterator, List, Optional
+
+import pandas as pd
+from sqlalchemy import Date, DateTime, Integer, Numeric, func, select
+from sqlalchemy.engine import Engine
+
+from ..database import choose_replica, engine as primary_engine
+from ..models import (ActivityLog, CareerScore, Education, Experience, InterviewSession, Project, Skill,
+                      Student)
+
+# --- Streaming Data Export ---
+# Placement-cell dumps of activity, interview and profile tables. Rows are read
+# through a server-side cursor (stream_results + yield_per) in EXPORT_CHUNK_ROWS
+# batches, each batch becomes a pandas DataFrame, and it is encoded and handed
+# on before the next batch is fetched: CSV chunks go through a streaming
+# gzip / zstd compressor, Parquet chunks become one row group each. Memory is
+# bounded by one chunk whatever the table size.
+#
+#   python -m backend.exports interview_sessions --format parquet --compression zstd -o sessions.parquet
+#   GET /api/admin/exports/interview_sessions?format=csv&compression=gzip&start=2025-01-01
+
+EXPORT_CHUNK_ROWS = 10_000
+FORMATS = ("csv", "parquet")
+COMPRESSIONS = ("none", "gzip", "zstd")
+
+
+class ExportError(ValueError):
+    """Unknown dataset, unsupported option, or a filter the dataset cannot apply."""
+
+
+@dataclass
+class Dataset:
+    table: object
+    columns: List[str]
+    # Column the start/end filters apply to; None if the table has no timestamp.
+    date_column: Optional[str] = None
+
+
+# Explicit column lists: credentials (password_hash) are never exported.
+DATASETS: Dict[str, Dataset] = {
+    "activity_logs": Dataset(
+        ActivityLog.__table__, ["log_id", "user_id", "activity_type", "details", "created_at"], "created_at"),
+    "interview_sessions": Dataset(
+        InterviewSession.__table__,
+        ["session_id", "user_id", "question", "user_answer", "ai_feedback", "score", "created_at"], "created_at"),
+    "students": Dataset(
+        Student.__table__,
+        ["id", "user_id", "fullname", "email", "mobile", "college", "degree", "branch", "year_of_study", "cgpa",
+         "skills", "other_skills", "job_type", "portfolio_url", "github_username", "linkedin_url",
+         "created_at", "last_login"], "created_at"),
+    "career_scores": Dataset(
+        CareerScore.__table__,
+        ["score_id", "user_id", "career_score", "interview_success", "market_position", "active_streak",
+         "updated_at"], "updated_at"),
+    "skills": Dataset(Skill.__table__, ["skill_id", "user_id", "skill_name", "proficiency"]),
+    "projects": Dataset(Project.__table__, ["project_id", "user_id", "title", "description", "tech_stack",
+                                            "project_link"]),
+    "experience": Dataset(Experience.__table__, ["exp_id", "user_id", "company", "role", "start_date",
+                                                 "end_date", "achievements"]),
+    "education": Dataset(Education.__table__, ["edu_id", "user_id", "degree", "university", "start_date",
+                                               "end_date", "gpa"]),
+}
+
+
+@dataclass
+class ExportFilters:
+    start: Optional[date] = None
+    # Inclusive: rows from the whole `end` day are exported.
+    end: Optional[date] = None
+    college: Optional[str] = None
+    branch: Optional[str] = None
+    year_of_study: Optional[str] = None
+
+    @property
+    def cohort(self) -> Dict[str, str]:
+        return {k: v for k, v in (("college", self.college), ("branch", self.branch),
+                                   ("year_of_study", self.year_of_study)) if v}
+
+
+def get_dataset(name: str) -> Dataset:
+    try:
+        return DATASETS[name]
+    except KeyError:
+        raise ExportError(f"Unknown dataset {name!r}. Choose one of: {', '.join(DATASETS)}.")
+
+
+def build_query(dataset: Dataset, filters: ExportFilters):
+    table = dataset.table
+    columns = [table.c[name] for name in dataset.columns]
+    query = select(*columns).order_by(*table.primary_key.columns)
+
+    if filters.start or filters.end:
+        if dataset.date_column is None:
+            raise ExportError("This dataset has no date column to filter on.")
+        when = table.c[dataset.date_column]
+        if filters.start:
+            query = query.where(when >= filters.start)
+        if filters.end:
+            query = query.where(when < filters.end + timedelta(days=1))
+
+    if filters.cohort:
+        students = Student.__table__
+        conditions = [func.lower(students.c[k]) == v.strip().lower() for k, v in filters.cohort.items()]
+        if table is students:
+            query = query.where(*conditions)
+        else:
+            # Semi-join, so a user never appears twice.
+            query = query.where(table.c.user_id.in_(select(students.c.user_id).where(*conditions)))
+    return query
+
+
+def read_chunks(dataset: Dataset, filters: ExportFilters, bind: Optional[Engine] = None,
+                chunk_rows: int = EXPORT_CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """Yields the export as DataFrames of at most `chunk_rows` rows, read via a server-side cursor."""
+    if bind is None:
+        # Reporting reads are fine on a replica; falls back to the primary.
+        replica = choose_replica()
+        bind = replica.engine if replica else primary_engine
+    query = build_query(dataset, filters)
+    with bind.connect() as conn:
+        result = conn.execution_options(stream_results=True, yield_per=chunk_rows).execute(query)
+        for rows in result.partitions():
+            yield pd.DataFrame.from_records(rows, columns=dataset.columns)
+
+
+# --- Encoders ---
+
+def arrow_schema(dataset: Dataset):
+    import pyarrow as pa
+
+    def arrow_type(column):
+        if isinstance(column.type, Integer):
+            return pa.int64()
+        if isinstance(column.type, Numeric):
+            return pa.decimal128(column.type.precision or 18, column.type.scale or 2)
+        if isinstance(column.type, DateTime):
+            return pa.timestamp("us")
+        if isinstance(column.type, Date):
+            return pa.date32()
+        return pa.string()
+
+    # Fixed up front, so every row group has the same schema even when a chunk is all NULLs.
+    return pa.schema([(name, arrow_type(dataset.table.c[name])) for name in dataset.columns])
+
+
+def _compressor(compression: str):
+    if compression == "gzip":
+        return zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    if compression == "zstd":
+        import zstandard
+        return zstandard.ZstdCompressor(level=3).compressobj()
+    return None
+
+
+def _encode_csv(chunks: Iterator[pd.DataFrame], dataset: Dataset, compression: str) -> Iterator[bytes]:
+    compressor = _compressor(compression)
+    header = True
+    for df in chunks:
+        data = df.to_csv(index=False, header=header).encode("utf-8")
+        header = False
+        if compressor is None:
+            yield data
+        elif data := compressor.compress(data):
+            yield data
+    if header:
+        # No rows matched: still emit the header line.
+        data = pd.DataFrame(columns=dataset.columns).to_csv(index=False).encode("utf-8")
+        yield data if compressor is None else compressor.compress(data)
+    if compressor is not None:
+        yield compressor.flush()
+
+
+class _Drain(io.RawIOBase):
+    """Write-only file that hands written bytes back to a generator."""
+
+    def __init__(self):
+        self.buffer = bytearray()
+        self.position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self.buffer += data
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def take(self) -> bytes:
+        data, self.buffer = bytes(self.buffer), bytearray()
+        return data
+
+
+def _encode_parquet(chunks: Iterator[pd.DataFrame], dataset: Dataset, compression: str) -> Iterator[bytes]:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = arrow_schema(dataset)
+    sink = _Drain()
+    codec = None if compression == "none" else compression
+    with pq.ParquetWriter(sink, schema, compression=codec) as writer:
+        for df in chunks:
+            writer.write_table(pa.Table.from_pandas(df, schema=schema, preserve_index=False))
+            yield sink.take()
+    yield sink.take()
+
+
+def stream_export(name: str, fmt: str = "csv", compression: str = "none",
+                  filters: Optional[ExportFilters] = None, bind: Optional[Engine] = None,
+                  chunk_rows: int = EXPORT_CHUNK_ROWS) -> Iterator[bytes]:
+    """
+    Encoded export of dataset `name` as a stream of byte chunks.
+
+    Raises ExportError for bad options before any row is read.
+    """
+    dataset = get_dataset(name)
+    if fmt not in FORMATS:
+        raise ExportError(f"Unsupported format {fmt!r}. Choose one of: {', '.join(FORMATS)}.")
+    if compression not in COMPRESSIONS:
+        raise ExportError(f"Unsupported compression {compression!r}. Choose one of: {', '.join(COMPRESSIONS)}.")
+    filters = filters or ExportFilters()
+    build_query(dataset, filters)  # validates the filters up front
+    chunks = read_chunks(dataset, filters, bind, chunk_rows)
+    if fmt == "parquet":
+        return _encode_parquet(chunks, dataset, compression)
+    return _encode_csv(chunks, dataset, compression)
+
+
+def export_filename(name: str, fmt: str, compression: str) -> str:
+    suffix = {"gzip": ".gz", "zstd": ".zst"}.get(compression, "") if fmt == "csv" else ""
+    return f"{name}-{date.today():%Y%m%d}.{fmt}{suffix}"
+
+
+def media_type(fmt: str, compression: str) -> str:
+    if fmt == "parquet":
+        return "application/vnd.apache.parquet"
+    return {"gzip": "application/gzip", "zstd": "application/zstd"}.get(compression, "text/csv")
@@ -0,0 +1,49 @@
+import argparse
+import sys
+import time
+from datetime import date
+
+from backend.exports import (COMPRESSIONS, DATASETS, EXPORT_CHUNK_ROWS, FORMATS, ExportError, ExportFilters,
+                             export_filename, stream_export)
+
+# --- Export CLI ---
+#   python -m backend.exports interview_sessions --format parquet --compression zstd
+#   python -m backend.exports activity_logs --start 2025-01-01 --end 2025-03-31 --college "NIT Trichy" -o - | head
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream a table to CSV or Parquet with constant memory.")
+    parser.add_argument("dataset", choices=sorted(DATASETS))
+    parser.add_argument("--format", choices=FORMATS, default="csv")
+    parser.add_argument("--compression", choices=COMPRESSIONS, default="none")
+    parser.add_argument("--start", type=date.fromisoformat, help="First day to include (YYYY-MM-DD).")
+    parser.add_argument("--end", type=date.fromisoformat, help="Last day to include (YYYY-MM-DD).")
+    parser.add_argument("--college")
+    parser.add_argument("--branch")
+    parser.add_argument("--year-of-study")
+    parser.add_argument("--chunk-rows", type=int, default=EXPORT_CHUNK_ROWS)
+    parser.add_argument("-o", "--output", help="Output file, or - for stdout (default: <dataset>-<date>.<ext>).")
+    args = parser.parse_args()
+
+    filters = ExportFilters(start=args.start, end=args.end, college=args.college, branch=args.branch,
+                            year_of_study=args.year_of_study)
+    output = args.output or export_filename(args.dataset, args.format, args.compression)
+    try:
+        chunks = stream_export(args.dataset, args.format, args.compression, filters, chunk_rows=args.chunk_rows)
+    except ExportError as e:
+        parser.error(str(e))
+
+    started, written = time.perf_counter(), 0
+    fh = sys.stdout.buffer if output == "-" else open(output, "wb")
+    try:
+        for chunk in chunks:
+            fh.write(chunk)
+            written += len(chunk)
+    finally:
+        if fh is not sys.stdout.buffer:
+            fh.close()
+    print(f"Wrote {written} bytes to {output} in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,41 +1,78 @@
+import asyncio
 import logging
+import os
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
-from .database import engine, Base  # Use relative import
+from .database import engine, replicas, RequestSubjectMiddleware  # Use relative import
+from .migrations import check_schema, upgrade as upgrade_schema
 from .models import *  # Import models
-from .routers import auth, user, profile_routes, career_path_routes, interview_routes, job_market, review_resume # Assuming all these router files exist
+from .routers import auth, user, profile_routes, career_path_routes, interview_routes, job_market, review_resume, admin_routes, chat_routes, search_routes # Assuming all these router files exist
+from .schemas import UserSchema
+from .services import resume_files
+from .services.idempotency import IdempotencyMiddleware
+from .services.model_router import ModelRoutingMiddleware
+from .services.standings import refresh_standings_periodically
+from .utils.admission import AdmissionMiddleware, pool_capacity
+from .utils.serialization import FastJSONResponse, warm_up
+from .utils.profiling import ProfilingMiddleware
+from .utils.query_stats import QueryStatsMiddleware, install_query_instrumentation
 
 # Configure logging to see server status in the terminal
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# --- Database Table Creation ---
-# This function creates all the tables defined in your models.py
-def create_db_and_tables():
-    try:
-        logger.info("Attempting to connect to the database and create tables...")
-        Base.metadata.create_all(bind=engine)
-        logger.info("Database connection successful and tables created/verified.")
-    except Exception as e:
-        logger.error(f"Error connecting to the database or creating tables: {e}")
+# --- Database Schema Check ---
+# Tables are created and changed by versioned migrations, applied once per deploy with
+# `python -m backend.migrations upgrade`. Workers only verify the recorded schema version.
+# MIGRATE_ON_STARTUP=1 applies pending migrations at boot (single-process development only).
+MIGRATE_ON_STARTUP = os.getenv("MIGRATE_ON_STARTUP", "0") == "1"
+
+def verify_database_schema():
+    if MIGRATE_ON_STARTUP:
+        for migration in upgrade_schema(engine):
+            logger.info(f"Applied migration {migration.version:04d}: {migration.description}")
+    version = check_schema(engine)
+    logger.info(f"Database schema is at version {version}.")
 
 # --- Lifespan Context Manager ---
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Startup
-    create_db_and_tables()
+    # Startup: fails fast if the database has not been migrated
+    verify_database_schema()
+    # Build the JSON serializers for the heavy response schemas before the first request
+    warm_up([UserSchema])
+    # Loads the cohort standings index and keeps rebuilding it to correct drift
+    standings_task = asyncio.create_task(refresh_standings_periodically())
     yield
-    # Shutdown (if needed)
+    # Shutdown: stop the resume text-extraction worker processes
+    standings_task.cancel()
+    resume_files.shutdown_pool()
 
 # --- FastAPI App Initialization ---
 app = FastAPI(
     title="CareerUp AI API",
     description="Backend services for the CareerUp platform, handling user auth, profiles, and AI-powered career tools.",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    # orjson-based responses; Decimal and datetime are handled natively
+    default_response_class=FastJSONResponse
 )
 
+# --- Admission Control ---
+# Per-route-class (AI / auth / CRUD) adaptive concurrency limits with a bounded queue
+# where pro users go first; overflow is rejected with 503 + Retry-After. Limits are capped
+# by the database pool so requests never pile up on connection checkout. Added before
+# CORS so it runs inside it and rejections still carry CORS headers. ADMISSION_CONTROL=0
+# disables it; current limits are listed at /api/admin/admission.
+app.add_middleware(AdmissionMiddleware, db_connections=pool_capacity(engine))
+
+# --- Idempotency Keys ---
+# Retried AI POSTs with the same Idempotency-Key wait for or replay the original response
+# instead of calling the model again. Outside admission control, so waiting duplicates
+# do not hold AI slots.
+app.add_middleware(IdempotencyMiddleware)
+
 # --- CORS (Cross-Origin Resource Sharing) Middleware ---
 # This allows your React frontend to communicate with this backend.
 # IMPORTANT: For production, you should restrict this to your actual frontend domain.
@@ -51,6 +88,29 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# --- Request Profiling ---
+# Profiles requests sent with `X-Profile: 1` + X-Admin-Token, plus a PROFILE_SAMPLE_RATE
+# fraction of all traffic. Captured profiles are listed under /api/admin/profiles.
+app.add_middleware(ProfilingMiddleware)
+
+# --- SQL Query Instrumentation ---
+# Counts and times statements per request, logs slow queries (SLOW_QUERY_MS) with
+# their EXPLAIN plans, and warns about requests over REQUEST_QUERY_WARN_COUNT statements.
+install_query_instrumentation(engine)
+# Reads moved to replicas (get_read_db) are counted and logged the same way.
+for replica in replicas:
+    install_query_instrumentation(replica.engine)
+app.add_middleware(QueryStatsMiddleware)
+
+# --- Read Replica Routing ---
+# Records the caller's token subject so reads can stick to the primary after that user writes.
+app.add_middleware(RequestSubjectMiddleware)
+
+# --- Model Routing ---
+# Keeps the caller's token so LLM calls can route pro users on heavy tasks to the large
+# model (see services/model_router). Decisions are listed at /api/admin/llm/routing.
+app.add_middleware(ModelRoutingMiddleware)
+
 # --- Include All Routers ---
 # This adds all the API endpoints from your different feature files to the main app.
 logger.info("Including API routers...")
@@ -61,6 +121,9 @@ app.include_router(career_path_routes)
 app.include_router(interview_routes)
 app.include_router(job_market)
 app.include_router(review_resume)
+app.include_router(admin_routes)
+app.include_router(chat_routes)
+app.include_router(search_routes)
 logger.info("All routers included successfully.")
 
 
@@ -0,0 +1,308 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import delete, insert, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, joinedload
+
+from ..database import choose_replica, engine as primary_engine
+from ..models import MarketTrend, RoleMatch, Skill, Student, User
+
+# --- Batch Role Matching ---
+# Scores every student against every role in market_trends without any LLM
+# call. Skills are sparse vectors over one vocabulary:
+#   student  proficiency weight per skill (Skill rows; Student.skills entries
+#            count as LISTED_SKILL_WEIGHT)
+#   role     IDF weight per required skill, normalised so a role's weights sum to 1
+# A score is the dot product: the proficiency-weighted share of the role's
+# requirements the student covers, between 0 and 1. Rare skills count for more
+# than ones every role asks for.
+#
+# Students are read MATCH_CHUNK_STUDENTS at a time; each chunk becomes a CSR
+# matrix that a worker process multiplies with the dense skill x role matrix,
+# and the MATCH_TOP_K best roles per student replace that student's rows in
+# role_matches. Meant to run nightly from cron:
+#
+#   python -m backend.matching --workers 4
+
+MATCH_TOP_K = int(os.getenv("MATCH_TOP_K", "10"))
+# Scoring holds a (skills in chunk) x (roles) float32 array: ~8 skills x 2000
+# students x 1000 roles is 64 MB per worker.
+MATCH_CHUNK_STUDENTS = int(os.getenv("MATCH_CHUNK_STUDENTS", "2000"))
+PROFICIENCY_WEIGHTS = {"Beginner": 0.25, "Intermediate": 0.5, "Advanced": 0.75, "Expert": 1.0}
+LISTED_SKILL_WEIGHT = 0.5
+
+
+def normalize_skill(name) -> str:
+    return " ".join(str(name).lower().split())
+
+
+def role_requirements(skills_required) -> Dict[str, float]:
+    """{skill: weight} from MarketTrend.skills_required: a list of names or a {name: weight} map."""
+    if not skills_required:
+        return {}
+    if isinstance(skills_required, str):
+        skills_required = skills_required.split(",")
+    if isinstance(skills_required, dict):
+        items = [(name, float(weight or 1)) for name, weight in skills_required.items()]
+    else:
+        items = [(name, 1.0) for name in skills_required]
+    requirements = {}
+    for name, weight in items:
+        if name and normalize_skill(name):
+            requirements[normalize_skill(name)] = weight
+    return requirements
+
+
+@dataclass
+class RoleMatrix:
+    trend_ids: np.ndarray  # (roles,)
+    vocabulary: Dict[str, int]  # skill name -> row of `weights`
+    weights: np.ndarray  # (skills, roles) float32; every role's column sums to 1
+
+    @classmethod
+    def build(cls, roles: Sequence[Tuple[int, Dict[str, float]]]) -> "RoleMatrix":
+        roles = [(trend_id, requirements) for trend_id, requirements in roles if requirements]
+        vocabulary: Dict[str, int] = {}
+        rows, cols, values = [], [], []
+        for col, (_, requirements) in enumerate(roles):
+            for name, weight in requirements.items():
+                rows.append(vocabulary.setdefault(name, len(vocabulary)))
+                cols.append(col)
+                values.append(weight)
+        rows, cols = np.array(rows, dtype=np.int64), np.array(cols, dtype=np.int64)
+        values = np.array(values, dtype=np.float64)
+
+        # IDF over roles, then normalise each role to a total of 1.
+        document_frequency = np.bincount(rows, minlength=len(vocabulary))
+        values *= np.log1p(len(roles) / np.maximum(document_frequency, 1))[rows]
+        values /= np.bincount(cols, weights=values, minlength=len(roles))[cols]
+
+        weights = np.zeros((len(vocabulary), len(roles)), dtype=np.float32)
+        weights[rows, cols] = values
+        return cls(np.array([trend_id for trend_id, _ in roles], dtype=np.int64), vocabulary, weights)
+
+
+@dataclass
+class StudentChunk:
+    user_ids: np.ndarray  # (students,) everyone read, including students with no known skill
+    # CSR rows: student i's skills are indices[indptr[i]:indptr[i + 1]] with weights in data.
+    indptr: np.ndarray
+    indices: np.ndarray  # rows of RoleMatrix.weights
+    data: np.ndarray
+
+    @classmethod
+    def build(cls, profiles: Dict[int, Dict[str, float]], vocabulary: Dict[str, int]) -> "StudentChunk":
+        """Skills no role asks for are dropped; they cannot change any score."""
+        indptr, indices, data = [0], [], []
+        for skills in profiles.values():
+            for name, weight in skills.items():
+                row = vocabulary.get(name)
+                if row is not None:
+                    indices.append(row)
+                    data.append(weight)
+            indptr.append(len(indices))
+        return cls(np.fromiter(profiles, dtype=np.int64, count=len(profiles)), np.array(indptr, dtype=np.int64),
+                   np.array(indices, dtype=np.int64), np.array(data, dtype=np.float32))
+
+
+@dataclass
+class ChunkMatches:
+    user_ids: np.ndarray  # every student of the chunk, for replacing their rows
+    # One row per (student, rank); only scores above zero.
+    match_user_ids: np.ndarray
+    trend_ids: np.ndarray
+    ranks: np.ndarray
+    scores: np.ndarray
+    matched_skills: np.ndarray
+
+
+def top_matches(chunk: StudentChunk, roles: RoleMatrix, k: int = MATCH_TOP_K) -> ChunkMatches:
+    """The k best roles for every student of the chunk, vectorized (sparse rows x dense matrix)."""
+    counts = np.diff(chunk.indptr)
+    scored = np.flatnonzero(counts)
+    k = min(k, len(roles.trend_ids))
+    if not len(scored) or not k:
+        empty = np.zeros(0, dtype=np.int64)
+        return ChunkMatches(chunk.user_ids, empty, empty, empty, empty.astype(np.float32), empty)
+
+    # Sum of the role rows of each student's skills, weighted by proficiency.
+    # reduceat over the non-empty rows' starts: each segment ends where the next
+    # non-empty row starts, which is exactly where the row itself ends.
+    starts = chunk.indptr[scored]
+    scores = np.add.reduceat(roles.weights[chunk.indices] * chunk.data[:, None], starts, axis=0)
+
+    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    top_scores = np.take_along_axis(scores, top, axis=1)
+    order = np.argsort(-top_scores, axis=1, kind="stable")
+    top = np.take_along_axis(top, order, axis=1)
+    top_scores = np.take_along_axis(top_scores, order, axis=1)
+
+    # How many of the student's skills each of their top roles asks for.
+    owner = np.repeat(np.arange(len(scored)), counts[scored])
+    asked = roles.weights[chunk.indices[:, None], top[owner]] > 0
+    matched = np.add.reduceat(asked.astype(np.int32), starts, axis=0)
+
+    keep = top_scores > 0
+    ranks = np.broadcast_to(np.arange(1, k + 1), top.shape)
+    return ChunkMatches(
+        user_ids=chunk.user_ids,
+        match_user_ids=np.broadcast_to(chunk.user_ids[scored][:, None], top.shape)[keep],
+        trend_ids=roles.trend_ids[top][keep],
+        ranks=ranks[keep],
+        scores=top_scores[keep],
+        matched_skills=matched[keep],
+    )
+
+
+# --- Worker Processes ---
+# The role matrix is sent once per worker (initializer), not once per chunk.
+
+_worker_roles: Optional[RoleMatrix] = None
+
+
+def _init_worker(roles: RoleMatrix):
+    global _worker_roles
+    _worker_roles = roles
+
+
+def _score_chunk(chunk: StudentChunk, k: int) -> ChunkMatches:
+    return top_matches(chunk, _worker_roles, k)
+
+
+def score_chunks(chunks: Iterable[StudentChunk], roles: RoleMatrix, k: int = MATCH_TOP_K,
+                 workers: Optional[int] = None) -> Iterator[ChunkMatches]:
+    """
+    Scores chunks in a process pool, yielding results in chunk order. At most
+    2 * workers chunks are in flight, so memory stays bounded.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for chunk in chunks:
+            yield top_matches(chunk, roles, k)
+        return
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(roles,)) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(_score_chunk, chunk, k))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+# --- Database ---
+
+def load_roles(bind) -> RoleMatrix:
+    with bind.connect() as conn:
+        rows = conn.execute(select(MarketTrend.trend_id, MarketTrend.skills_required)).all()
+    return RoleMatrix.build([(trend_id, role_requirements(skills)) for trend_id, skills in rows])
+
+
+def read_student_chunks(bind, vocabulary: Dict[str, int],
+                        chunk_students: int = MATCH_CHUNK_STUDENTS) -> Iterator[StudentChunk]:
+    """Keyset pages of users, with their Skill rows and Student.skills read per page."""
+    last = 0
+    with bind.connect() as conn:
+        while True:
+            user_ids = conn.execute(
+                select(User.user_id).where(User.user_id > last).order_by(User.user_id).limit(chunk_students)
+            ).scalars().all()
+            if not user_ids:
+                return
+            first, last = user_ids[0], user_ids[-1]
+            profiles: Dict[int, Dict[str, float]] = {user_id: {} for user_id in user_ids}
+
+            listed = conn.execute(
+                select(Student.user_id, Student.skills)
+                .where(Student.user_id.between(first, last), Student.skills.isnot(None))
+            )
+            for user_id, skills in listed:
+                profile = profiles.get(user_id)
+                if profile is not None:
+                    for name in skills.split(","):
+                        if normalize_skill(name):
+                            profile[normalize_skill(name)] = LISTED_SKILL_WEIGHT
+
+            rated = conn.execute(
+                select(Skill.user_id, Skill.skill_name, Skill.proficiency).where(Skill.user_id.between(first, last))
+            )
+            for user_id, name, proficiency in rated:
+                profile = profiles.get(user_id)
+                if profile is not None:
+                    name = normalize_skill(name)
+                    weight = PROFICIENCY_WEIGHTS.get(proficiency, LISTED_SKILL_WEIGHT)
+                    profile[name] = max(profile.get(name, 0.0), weight)
+
+            yield StudentChunk.build(profiles, vocabulary)
+
+
+def write_matches(conn, matches: ChunkMatches, computed_at: datetime):
+    """Replaces the chunk's students' rows in one transaction."""
+    user_ids = matches.user_ids.tolist()
+    conn.execute(delete(RoleMatch).where(RoleMatch.user_id.in_(user_ids)))
+    if len(matches.match_user_ids):
+        conn.execute(insert(RoleMatch), [
+            {"user_id": user_id, "trend_id": trend_id, "rank": rank, "score": round(score, 6),
+             "matched_skills": matched, "computed_at": computed_at}
+            for user_id, trend_id, rank, score, matched in zip(
+                matches.match_user_ids.tolist(), matches.trend_ids.tolist(), matches.ranks.tolist(),
+                matches.scores.tolist(), matches.matched_skills.tolist())
+        ])
+
+
+@dataclass
+class MatchingRun:
+    students: int = 0
+    roles: int = 0
+    matches: int = 0
+    seconds: float = 0.0
+
+
+def run_matching(k: int = MATCH_TOP_K, workers: Optional[int] = None,
+                 chunk_students: int = MATCH_CHUNK_STUDENTS, bind: Optional[Engine] = None,
+                 read_bind: Optional[Engine] = None) -> MatchingRun:
+    """
+    Scores all students against all roles and stores each student's top k.
+
+    Reads may go to a replica; writes go to `bind` (the primary by default).
+    Rows of users that no longer exist, and every row when no role qualifies,
+    are removed at the end.
+    """
+    bind = bind or primary_engine
+    if read_bind is None:
+        replica = choose_replica()
+        read_bind = replica.engine if replica else bind
+    started = datetime.utcnow()
+    run = MatchingRun()
+
+    roles = load_roles(read_bind)
+    run.roles = len(roles.trend_ids)
+    if run.roles:
+        chunks = read_student_chunks(read_bind, roles.vocabulary, chunk_students)
+        for matches in score_chunks(chunks, roles, k, workers):
+            with bind.begin() as conn:
+                write_matches(conn, matches, started)
+            run.students += len(matches.user_ids)
+            run.matches += len(matches.match_user_ids)
+    else:
+        # Still falls through to the cleanup: the last run's matches point at roles that no longer qualify.
+        print("Role matching skipped: no market trends with required skills.")
+
+    with bind.begin() as conn:
+        conn.execute(delete(RoleMatch).where(RoleMatch.computed_at < started))
+    run.seconds = (datetime.utcnow() - started).total_seconds()
+    return run
+
+
+def matches_for(db: Session, user_id: int, limit: int = MATCH_TOP_K) -> List[RoleMatch]:
+    """The user's stored matches from the last run, best first (with their MarketTrend loaded)."""
+    return (
+        db.query(RoleMatch).options(joinedload(RoleMatch.trend))
+        .filter(RoleMatch.user_id == user_id).order_by(RoleMatch.rank).limit(limit).all()
+    )
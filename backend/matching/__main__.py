@@ -0,0 +1,23 @@
+import argparse
+
+from backend.matching import MATCH_CHUNK_STUDENTS, MATCH_TOP_K, run_matching
+
+# --- Role Matching CLI ---
+# Nightly from cron, e.g.:
+#   30 2 * * *  cd /srv/app && python -m backend.matching --workers 4
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score every student against every market-trend role.")
+    parser.add_argument("--top-k", type=int, default=MATCH_TOP_K, help="Matches kept per student.")
+    parser.add_argument("--workers", type=int, help="Scoring processes (default: one per CPU).")
+    parser.add_argument("--chunk-students", type=int, default=MATCH_CHUNK_STUDENTS)
+    args = parser.parse_args()
+
+    run = run_matching(k=args.top_k, workers=args.workers, chunk_students=args.chunk_students)
+    print(f"Matched {run.students} students against {run.roles} roles: "
+          f"{run.matches} matches written in {run.seconds:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+import importlib
+import logging
+import pkgutil
+import re
+from contextlib import contextmanager
+from typing import Callable, List, Optional, Sequence
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, select, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.sql import func
+
+logger = logging.getLogger(__name__)
+
+# --- Schema Migrations ---
+# The schema is versioned: every module in `backend/migrations/versions` named
+# `mNNNN_<description>.py` defines `upgrade(conn)`, and each applied version is
+# recorded as a row in `schema_version`. Workers only run `check_schema()` at
+# startup (one SELECT); migrations are applied once, out-of-band:
+#
+#   python -m backend.migrations upgrade
+#
+# A migration module may set `transactional = False` when it must run outside a
+# transaction, e.g. to build indexes online with `create_index_online`.
+MIGRATION_LOCK_ID = 735_201  # advisory lock key shared by concurrent `upgrade` runs
+
+_metadata = MetaData()
+schema_version = Table(
+    "schema_version", _metadata,
+    Column("version", Integer, primary_key=True),
+    Column("description", String(200), nullable=False),
+    Column("applied_at", DateTime, server_default=func.now()),
+)
+
+_MODULE_NAME = re.compile(r"^m(\d{4})_(\w+)$")
+
+
+class SchemaVersionError(RuntimeError):
+    """Raised when the database schema is older (or newer) than the code expects."""
+
+
+class Migration:
+    def __init__(self, version: int, description: str, upgrade: Callable, transactional: bool = True):
+        self.version = version
+        self.description = description
+        self.upgrade = upgrade
+        self.transactional = transactional
+
+    def __repr__(self):
+        return f"<Migration {self.version:04d} {self.description}>"
+
+
+def load_migrations() -> List[Migration]:
+    """All migrations in `versions/`, ordered by version."""
+    from . import versions
+
+    migrations = []
+    for info in pkgutil.iter_modules(versions.__path__):
+        match = _MODULE_NAME.match(info.name)
+        if not match:
+            continue
+        module = importlib.import_module(f"{versions.__name__}.{info.name}")
+        migrations.append(Migration(
+            version=int(match.group(1)),
+            description=(module.__doc__ or match.group(2).replace("_", " ")).strip().splitlines()[0],
+            upgrade=module.upgrade,
+            transactional=getattr(module, "transactional", True),
+        ))
+    migrations.sort(key=lambda m: m.version)
+    versions_seen = [m.version for m in migrations]
+    if len(set(versions_seen)) != len(versions_seen):
+        raise SchemaVersionError(f"Duplicate migration versions: {versions_seen}")
+    return migrations
+
+
+def head_version() -> int:
+    migrations = load_migrations()
+    return migrations[-1].version if migrations else 0
+
+
+def current_version(engine) -> int:
+    """The highest applied version, or 0 for a database that was never migrated."""
+    try:
+        with engine.connect() as conn:
+            return conn.execute(select(func.max(schema_version.c.version))).scalar() or 0
+    except DBAPIError:
+        # No schema_version table yet.
+        return 0
+
+
+def check_schema(engine) -> int:
+    """Single startup check that the database is at the version this code expects."""
+    current, head = current_version(engine), head_version()
+    if current < head:
+        raise SchemaVersionError(
+            f"Database schema is at version {current}, code expects {head}. "
+            "Run `python -m backend.migrations upgrade`."
+        )
+    if current > head:
+        raise SchemaVersionError(
+            f"Database schema is at version {current}, newer than this code ({head}). "
+            "Deploy the matching code version."
+        )
+    return current
+
+
+# --- Locking ---
+
+@contextmanager
+def _migration_lock(engine):
+    """Serializes concurrent `upgrade` runs (advisory lock on PostgreSQL and MySQL)."""
+    dialect = engine.dialect.name
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        if dialect == "postgresql":
+            conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": MIGRATION_LOCK_ID})
+        elif dialect in ("mysql", "mariadb"):
+            conn.execute(text("SELECT GET_LOCK(:key, 600)"), {"key": f"migrations-{MIGRATION_LOCK_ID}"})
+        # SQLite: the primary key on schema_version makes a racing second run fail safely.
+        try:
+            yield
+        finally:
+            if dialect == "postgresql":
+                conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": MIGRATION_LOCK_ID})
+            elif dialect in ("mysql", "mariadb"):
+                conn.execute(text("SELECT RELEASE_LOCK(:key)"), {"key": f"migrations-{MIGRATION_LOCK_ID}"})
+
+
+# --- Upgrade ---
+
+def upgrade(engine, target: Optional[int] = None) -> List[Migration]:
+    """Applies pending migrations up to `target` (default: head) and returns them."""
+    migrations = load_migrations()
+    schema_version.create(engine, checkfirst=True)
+    applied = []
+    with _migration_lock(engine):
+        current = current_version(engine)
+        for migration in migrations:
+            if migration.version <= current or (target is not None and migration.version > target):
+                continue
+            logger.info("Applying migration %04d: %s", migration.version, migration.description)
+            record = schema_version.insert().values(version=migration.version, description=migration.description)
+            if migration.transactional:
+                with engine.begin() as conn:
+                    migration.upgrade(conn)
+                    conn.execute(record)
+            else:
+                with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+                    migration.upgrade(conn)
+                with engine.begin() as conn:
+                    conn.execute(record)
+            applied.append(migration)
+    return applied
+
+
+def history(engine) -> list:
+    """Applied versions as (version, description, applied_at) rows."""
+    try:
+        with engine.connect() as conn:
+            return conn.execute(select(schema_version).order_by(schema_version.c.version)).all()
+    except DBAPIError:
+        return []
+
+
+# --- Helpers for Migrations ---
+
+def create_index_online(conn, name: str, table: str, columns: Sequence[str], unique: bool = False):
+    """
+    Creates an index without blocking writes where the database supports it:
+    CONCURRENTLY on PostgreSQL, ALGORITHM=INPLACE LOCK=NONE on MySQL. Safe to
+    re-run. Must be used from a migration with `transactional = False`.
+    """
+    dialect = conn.dialect.name
+    quote = conn.dialect.identifier_preparer.quote
+    cols = ", ".join(quote(c) for c in columns)
+    kind = "UNIQUE INDEX" if unique else "INDEX"
+    if dialect == "postgresql":
+        conn.execute(text(f"CREATE {kind} CONCURRENTLY IF NOT EXISTS {quote(name)} ON {quote(table)} ({cols})"))
+    elif dialect in ("mysql", "mariadb"):
+        exists = conn.execute(text(
+            "SELECT 1 FROM information_schema.statistics "
+            "WHERE table_schema = DATABASE() AND table_name = :table AND index_name = :name LIMIT 1"
+        ), {"table": table, "name": name}).first()
+        if not exists:
+            conn.execute(text(f"CREATE {kind} {quote(name)} ON {quote(table)} ({cols}) ALGORITHM=INPLACE LOCK=NONE"))
+    else:
+        conn.execute(text(f"CREATE {kind} IF NOT EXISTS {quote(name)} ON {quote(table)} ({cols})"))
@@ -0,0 +1,37 @@
+import argparse
+import logging
+
+from backend.database import engine
+from backend.migrations import current_version, head_version, history, upgrade
+
+# --- Migration CLI ---
+#   python -m backend.migrations upgrade [--to N]
+#   python -m backend.migrations current
+#   python -m backend.migrations history
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the database schema version.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    upgrade_cmd = commands.add_parser("upgrade", help="Apply pending migrations.")
+    upgrade_cmd.add_argument("--to", type=int, default=None, help="Stop at this version (default: latest).")
+    commands.add_parser("current", help="Show the applied and latest versions.")
+    commands.add_parser("history", help="List applied migrations.")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    if args.command == "upgrade":
+        applied = upgrade(engine, target=args.to)
+        if not applied:
+            print(f"Already at version {current_version(engine)}.")
+        for migration in applied:
+            print(f"Applied {migration.version:04d} {migration.description}")
+    elif args.command == "current":
+        print(f"current: {current_version(engine)}  head: {head_version()}")
+    else:
+        for version, description, applied_at in history(engine):
+            print(f"{version:04d}  {applied_at}  {description}")
+
+
+if __name__ == "__main__":
+    main()
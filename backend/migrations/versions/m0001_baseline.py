@@ -0,0 +1,141 @@
+"""Baseline schema (models.py as of the refresh-token release)"""
+from sqlalchemy import (DECIMAL, JSON, Column, Date, DateTime, Enum, ForeignKey, Integer, MetaData, String,
+                        Table, Text)
+from sqlalchemy.sql import func
+
+# A frozen copy of the tables, deliberately not imported from models.py: later
+# model changes get their own migrations and must not rewrite this one.
+# `checkfirst` lets databases created by the old `create_all` startup adopt it.
+metadata = MetaData()
+
+Table(
+    "users", metadata,
+    Column("user_id", Integer, primary_key=True, autoincrement=True, index=True),
+    Column("full_name", String(100)),
+    Column("email", String(100), unique=True, index=True),
+    Column("password_hash", String(255)),
+    Column("role", Enum("free", "pro", name="user_role")),
+    Column("join_date", DateTime, server_default=func.now()),
+    Column("last_login", DateTime, nullable=True),
+)
+
+Table(
+    "students", metadata,
+    Column("id", Integer, primary_key=True, autoincrement=True, index=True),
+    Column("fullname", String(100)),
+    Column("email", String(100), unique=True, index=True),
+    Column("mobile", String(20)),
+    Column("password_hash", String(255)),
+    Column("college", String(100)),
+    Column("degree", String(50)),
+    Column("branch", String(50)),
+    Column("year_of_study", String(10)),
+    Column("cgpa", String(10)),
+    Column("skills", Text),
+    Column("other_skills", Text),
+    Column("job_type", String(100)),
+    Column("portfolio_url", String(255)),
+    Column("github_username", String(100)),
+    Column("linkedin_url", String(255)),
+    Column("resume", String(255)),
+    Column("created_at", DateTime, server_default=func.now()),
+    Column("last_login", DateTime, nullable=True),
+    Column("user_id", Integer, ForeignKey("users.user_id"), nullable=True),
+)
+
+Table(
+    "skills", metadata,
+    Column("skill_id", Integer, primary_key=True, index=True),
+    Column("user_id", Integer, ForeignKey("users.user_id")),
+    Column("skill_name", String(100), nullable=False),
+    Column("proficiency", Enum("Beginner", "Intermediate", "Advanced", "Expert", name="skill_proficiency")),
+)
+
+Table(
+    "projects", metadata,
+    Column("project_id", Integer, primary_key=True, index=True),
+    Column("user_id", Integer, ForeignKey("users.user_id")),
+    Column("title", String(150), nullable=False),
+    Column("description", Text),
+    Column("tech_stack", String(200)),
+    Column("project_link", String(200)),
+)
+
+Table(
+    "experience", metadata,
+    Column("exp_id", Integer, primary_key=True, index=True),
+    Column("user_id", Integer, ForeignKey("users.user_id")),
+    Column("company", String(150), nullable=False),
+    Column("role", String(100), nullable=False),
+    Column("start_date", Date),
+    Column("end_date", Date),
+    Column("achievements", Text),
+)
+
+Table(
+    "education", metadata,
+    Column("edu_id", Integer, primary_key=True, index=True),
+    Column("user_id", Integer, ForeignKey("users.user_id")),
+    Column("degree", String(100), nullable=False),
+    Column("university", String(150), nullable=False),
+    Column("start_date", Date),
+    Column("end_date", Date),
+    Column("gpa", DECIMAL(3, 2)),
+)
+
+Table(
+    "interview_sessions", metadata,
+    Column("session_id", Integer, primary_key=True, index=True),
+    Column("user_id", Integer, ForeignKey("users.user_id")),
+    Column("question", Text),
+    Column("user_answer", Text),
+    Column("ai_feedback", Text),
+    Column("score", DECIMAL(5, 2)),
+    Column("created_at", DateTime, server_default=func.now()),
+)
+
+Table(
+    "activity_logs", metadata,
+    Column("log_id", Integer, primary_key=True, index=True),
+    Column("user_id", Integer, ForeignKey("users.user_id")),
+    Column("activity_type", String(50)),
+    Column("details", Text),
+    Column("created_at", DateTime, server_default=func.now()),
+)
+
+Table(
+    "career_scores", metadata,
+    Column("score_id", Integer, primary_key=True, index=True),
+    Column("user_id", Integer, ForeignKey("users.user_id"), unique=True),
+    Column("career_score", Integer),
+    Column("interview_success", DECIMAL(5, 2)),
+    Column("market_position", String(50)),
+    Column("active_streak", Integer),
+    Column("updated_at", DateTime, server_default=func.now()),
+)
+
+Table(
+    "market_trends", metadata,
+    Column("trend_id", Integer, primary_key=True, index=True),
+    Column("role", String(100)),
+    Column("avg_salary_range", String(50)),
+    Column("demand_score", Integer),
+    Column("skills_required", JSON),
+    Column("updated_at", DateTime, server_default=func.now()),
+)
+
+Table(
+    "refresh_tokens", metadata,
+    Column("token_id", Integer, primary_key=True, index=True),
+    Column("user_id", Integer, ForeignKey("users.user_id"), nullable=False, index=True),
+    Column("token_hash", String(64), unique=True, index=True, nullable=False),
+    Column("family_id", String(32), nullable=False, index=True),
+    Column("expires_at", DateTime, nullable=False),
+    Column("created_at", DateTime, server_default=func.now()),
+    Column("used_at", DateTime, nullable=True),
+    Column("revoked_at", DateTime, nullable=True),
+)
+
+
+def upgrade(conn):
+    metadata.create_all(conn, checkfirst=True)
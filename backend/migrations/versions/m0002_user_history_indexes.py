@@ -0,0 +1,21 @@
+"""Composite (user_id, created_at) indexes and user_id indexes for profile tables"""
+from backend.migrations import create_index_online
+
+# Built online (CONCURRENTLY / INPLACE), which cannot run inside a transaction.
+transactional = False
+
+INDEXES = [
+    # Per-user history, newest first: interview history, activity feeds.
+    ("ix_interview_sessions_user_id_created_at", "interview_sessions", ["user_id", "created_at"]),
+    ("ix_activity_logs_user_id_created_at", "activity_logs", ["user_id", "created_at"]),
+    # Relationship loads on User (GET /api/users/me) filter these by user_id.
+    ("ix_skills_user_id", "skills", ["user_id"]),
+    ("ix_projects_user_id", "projects", ["user_id"]),
+    ("ix_experience_user_id", "experience", ["user_id"]),
+    ("ix_education_user_id", "education", ["user_id"]),
+]
+
+
+def upgrade(conn):
+    for name, table, columns in INDEXES:
+        create_index_online(conn, name, table, columns)
@@ -0,0 +1,26 @@
+"""Resume uploads with extracted text, deduplicated by content hash"""
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, MetaData, String, Table, Text
+from sqlalchemy.sql import func
+
+metadata = MetaData()
+
+# users is only declared so the foreign key resolves; it already exists.
+Table("users", metadata, Column("user_id", Integer, primary_key=True))
+
+resume_documents = Table(
+    "resume_documents", metadata,
+    Column("resume_id", Integer, primary_key=True, index=True),
+    Column("content_hash", String(64), unique=True, index=True, nullable=False),
+    Column("filename", String(255)),
+    Column("file_type", String(10), nullable=False),
+    Column("size_bytes", Integer, nullable=False),
+    Column("page_count", Integer),
+    Column("storage_path", String(500), nullable=False),
+    Column("extracted_text", Text, nullable=False),
+    Column("uploaded_by", Integer, ForeignKey("users.user_id"), nullable=True),
+    Column("created_at", DateTime, server_default=func.now()),
+)
+
+
+def upgrade(conn):
+    resume_documents.create(conn, checkfirst=True)
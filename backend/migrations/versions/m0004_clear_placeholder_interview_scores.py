@@ -0,0 +1,8 @@
+"""Clear the score=0 placeholders stored before interview answers were scored"""
+from sqlalchemy import text
+
+
+def upgrade(conn):
+    # Every session saved before structured scoring has score 0. NULL keeps those
+    # sessions out of the interview_success average instead of counting them as zeros.
+    conn.execute(text("UPDATE interview_sessions SET score = NULL WHERE score = 0"))
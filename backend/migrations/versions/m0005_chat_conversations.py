@@ -0,0 +1,37 @@
+"""Chat conversations and messages with rolling summaries"""
+from sqlalchemy import (Column, DateTime, Enum, ForeignKey, Index, Integer, MetaData, String, Table,
+                        Text)
+from sqlalchemy.sql import func
+
+metadata = MetaData()
+
+# users is only declared so the foreign key resolves; it already exists.
+Table("users", metadata, Column("user_id", Integer, primary_key=True))
+
+conversations = Table(
+    "conversations", metadata,
+    Column("conversation_id", Integer, primary_key=True, index=True),
+    Column("user_id", Integer, ForeignKey("users.user_id"), nullable=False),
+    Column("title", String(200)),
+    Column("summary", Text),
+    Column("summarized_through", Integer, nullable=True),
+    Column("created_at", DateTime, server_default=func.now()),
+    Column("updated_at", DateTime, server_default=func.now()),
+    Index("ix_conversations_user_id_updated_at", "user_id", "updated_at"),
+)
+
+chat_messages = Table(
+    "chat_messages", metadata,
+    Column("message_id", Integer, primary_key=True, index=True),
+    Column("conversation_id", Integer, ForeignKey("conversations.conversation_id"), nullable=False),
+    Column("role", Enum("user", "assistant", name="chat_role"), nullable=False),
+    Column("content", Text, nullable=False),
+    Column("token_count", Integer, nullable=False),
+    Column("created_at", DateTime, server_default=func.now()),
+    Index("ix_chat_messages_conversation_id_message_id", "conversation_id", "message_id"),
+)
+
+
+def upgrade(conn):
+    conversations.create(conn, checkfirst=True)
+    chat_messages.create(conn, checkfirst=True)
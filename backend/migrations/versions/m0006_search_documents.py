@@ -0,0 +1,112 @@
+"""Full-text search documents for projects, experience and resumes"""
+from sqlalchemy import (Column, DateTime, ForeignKey, Index, Integer, MetaData, String, Table, Text,
+                        UniqueConstraint, literal, select, text)
+from sqlalchemy.sql import func
+
+metadata = MetaData()
+
+# users is only declared so the foreign key resolves; it already exists.
+Table("users", metadata, Column("user_id", Integer, primary_key=True))
+
+search_documents = Table(
+    "search_documents", metadata,
+    Column("doc_id", Integer, primary_key=True),
+    Column("user_id", Integer, ForeignKey("users.user_id"), nullable=False),
+    Column("source", String(20), nullable=False),
+    Column("source_id", Integer, nullable=False),
+    Column("title", String(300)),
+    Column("body", Text),
+    Column("updated_at", DateTime, server_default=func.now()),
+    UniqueConstraint("source", "source_id", name="uq_search_documents_source"),
+    Index("ix_search_documents_user_id", "user_id"),
+)
+
+# Frozen copies of the columns the backfill reads.
+projects = Table(
+    "projects", metadata,
+    Column("project_id", Integer, primary_key=True), Column("user_id", Integer),
+    Column("title", String(150)), Column("description", Text), Column("tech_stack", String(200)),
+)
+experience = Table(
+    "experience", metadata,
+    Column("exp_id", Integer, primary_key=True), Column("user_id", Integer),
+    Column("company", String(150)), Column("role", String(100)), Column("achievements", Text),
+)
+resume_documents = Table(
+    "resume_documents", metadata,
+    Column("resume_id", Integer, primary_key=True), Column("uploaded_by", Integer),
+    Column("filename", String(255)), Column("extracted_text", Text),
+)
+
+SQLITE_FTS = [
+    # External-content FTS5 index over search_documents; triggers keep it in sync.
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS search_fts USING fts5(
+        title, body, content='search_documents', content_rowid='doc_id', tokenize='porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS search_documents_ai AFTER INSERT ON search_documents BEGIN
+        INSERT INTO search_fts(rowid, title, body) VALUES (new.doc_id, new.title, new.body);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS search_documents_ad AFTER DELETE ON search_documents BEGIN
+        INSERT INTO search_fts(search_fts, rowid, title, body) VALUES ('delete', old.doc_id, old.title, old.body);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS search_documents_au AFTER UPDATE ON search_documents BEGIN
+        INSERT INTO search_fts(search_fts, rowid, title, body) VALUES ('delete', old.doc_id, old.title, old.body);
+        INSERT INTO search_fts(rowid, title, body) VALUES (new.doc_id, new.title, new.body);
+    END
+    """,
+]
+
+POSTGRES_FTS = [
+    """
+    ALTER TABLE search_documents ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', COALESCE(title, '')), 'A') ||
+        setweight(to_tsvector('english', COALESCE(body, '')), 'B')
+    ) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_search_documents_search_vector ON search_documents USING GIN (search_vector)",
+]
+
+MYSQL_FTS = [
+    "ALTER TABLE search_documents ADD FULLTEXT INDEX ft_search_documents (title, body)",
+]
+
+
+def _backfill(conn):
+    # The same text backend/services/search.py writes on every change.
+    columns = ["user_id", "source", "source_id", "title", "body"]
+    sources = [
+        select(projects.c.user_id, literal("project"), projects.c.project_id, projects.c.title,
+               func.coalesce(projects.c.description, "") + " " + func.coalesce(projects.c.tech_stack, ""))
+        .where(projects.c.user_id.isnot(None)),
+        select(experience.c.user_id, literal("experience"), experience.c.exp_id,
+               experience.c.role + " at " + experience.c.company, func.coalesce(experience.c.achievements, ""))
+        .where(experience.c.user_id.isnot(None)),
+        select(resume_documents.c.uploaded_by, literal("resume"), resume_documents.c.resume_id,
+               resume_documents.c.filename, resume_documents.c.extracted_text)
+        .where(resume_documents.c.uploaded_by.isnot(None)),
+    ]
+    for source in sources:
+        conn.execute(search_documents.insert().from_select(columns, source))
+
+
+def upgrade(conn):
+    dialect = conn.dialect.name
+    search_documents.create(conn, checkfirst=True)
+    if dialect == "sqlite":
+        for statement in SQLITE_FTS:
+            conn.execute(text(statement))
+    elif dialect == "postgresql":
+        for statement in POSTGRES_FTS:
+            conn.execute(text(statement))
+    elif dialect in ("mysql", "mariadb"):
+        for statement in MYSQL_FTS:
+            conn.execute(text(statement))
+
+    _backfill(conn)
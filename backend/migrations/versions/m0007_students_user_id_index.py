@@ -0,0 +1,10 @@
+"""user_id index on students"""
+from backend.migrations import create_index_online
+
+# Built online (CONCURRENTLY / INPLACE), which cannot run inside a transaction.
+transactional = False
+
+
+def upgrade(conn):
+    # Candidate search and cohort filters look students up by user_id.
+    create_index_online(conn, "ix_students_user_id", "students", ["user_id"])
@@ -0,0 +1,24 @@
+"""Nightly student-role match results"""
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Index, Integer, MetaData, Table
+
+metadata = MetaData()
+
+# users and market_trends are only declared so the foreign keys resolve; they already exist.
+Table("users", metadata, Column("user_id", Integer, primary_key=True))
+Table("market_trends", metadata, Column("trend_id", Integer, primary_key=True))
+
+role_matches = Table(
+    "role_matches", metadata,
+    Column("match_id", Integer, primary_key=True),
+    Column("user_id", Integer, ForeignKey("users.user_id"), nullable=False),
+    Column("trend_id", Integer, ForeignKey("market_trends.trend_id"), nullable=False),
+    Column("rank", Integer, nullable=False),
+    Column("score", Float, nullable=False),
+    Column("matched_skills", Integer, nullable=False),
+    Column("computed_at", DateTime, nullable=False),
+    Index("ix_role_matches_user_id_rank", "user_id", "rank"),
+)
+
+
+def upgrade(conn):
+    role_matches.create(conn, checkfirst=True)
@@ -0,0 +1,52 @@
+"""Archive manifest and rollup tables for interview_sessions / activity_logs retention"""
+from sqlalchemy import (DECIMAL, Column, Date, DateTime, ForeignKey, Index, Integer, MetaData, String, Table,
+                        func)
+
+metadata = MetaData()
+
+# users is only declared so the foreign keys resolve; it already exists.
+Table("users", metadata, Column("user_id", Integer, primary_key=True))
+
+archive_partitions = Table(
+    "archive_partitions", metadata,
+    Column("partition_id", Integer, primary_key=True),
+    Column("table_name", String(50), nullable=False),
+    Column("day", Date, nullable=False),
+    Column("path", String(500), nullable=False),
+    Column("format", String(20), nullable=False),
+    Column("row_count", Integer, nullable=False),
+    Column("min_id", Integer, nullable=False),
+    Column("max_id", Integer, nullable=False),
+    Column("created_at", DateTime, server_default=func.now()),
+    Index("ix_archive_partitions_table_name_day", "table_name", "day"),
+)
+
+archive_user_partitions = Table(
+    "archive_user_partitions", metadata,
+    Column("partition_id", Integer, ForeignKey("archive_partitions.partition_id"), primary_key=True),
+    Column("user_id", Integer, primary_key=True),
+    Column("row_count", Integer, nullable=False),
+    Index("ix_archive_user_partitions_user_id", "user_id"),
+)
+
+interview_score_rollups = Table(
+    "interview_score_rollups", metadata,
+    Column("user_id", Integer, ForeignKey("users.user_id"), primary_key=True),
+    Column("sessions", Integer, nullable=False),
+    Column("scored_sessions", Integer, nullable=False),
+    Column("score_sum", DECIMAL(14, 2), nullable=False),
+    Column("archived_through", DateTime),
+)
+
+activity_daily_rollups = Table(
+    "activity_daily_rollups", metadata,
+    Column("user_id", Integer, ForeignKey("users.user_id"), primary_key=True),
+    Column("day", Date, primary_key=True),
+    Column("activity_type", String(50), primary_key=True),
+    Column("count", Integer, nullable=False),
+)
+
+
+def upgrade(conn):
+    for table in (archive_partitions, archive_user_partitions, interview_score_rollups, activity_daily_rollups):
+        table.create(conn, checkfirst=True)
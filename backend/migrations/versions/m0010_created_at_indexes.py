@@ -0,0 +1,16 @@
+"""created_at indexes on interview_sessions and activity_logs for retention scans"""
+from backend.migrations import create_index_online
+
+# Built online (CONCURRENTLY / INPLACE), which cannot run inside a transaction.
+transactional = False
+
+INDEXES = [
+    # Retention selects rows older than the cutoff, oldest first, across all users.
+    ("ix_interview_sessions_created_at", "interview_sessions", ["created_at"]),
+    ("ix_activity_logs_created_at", "activity_logs", ["created_at"]),
+]
+
+
+def upgrade(conn):
+    for name, table, columns in INDEXES:
+        create_index_online(conn, name, table, columns)
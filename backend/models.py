@@ -1,5 +1,5 @@
-from sqlalchemy import (Column, Integer, String, Text, Date, DateTime,
-                       ForeignKey, Enum, DECIMAL, JSON)
+from sqlalchemy import (Column, Integer, String, Text, Date, DateTime, Float,
+                       ForeignKey, Enum, DECIMAL, JSON, Index, UniqueConstraint)
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -7,6 +7,7 @@ from .database import Base
 
 # --- Database Models ---
 # Each class represents a table in the database.
+# Schema changes also need a migration in backend/migrations/versions.
 
 class User(Base):
     __tablename__ = 'users'
@@ -32,6 +33,11 @@ class User(Base):
     career_score = relationship("CareerScore", back_populates="user", uselist=False, cascade="all, delete-orphan")
     # Relationship to Student
     student = relationship("Student", back_populates="user", uselist=False, cascade="all, delete-orphan")
+    refresh_tokens = relationship("RefreshToken", back_populates="user", cascade="all, delete-orphan")
+    conversations = relationship("Conversation", back_populates="user", cascade="all, delete-orphan")
+    # Totals of rows moved to the archive by backend/retention
+    interview_score_rollup = relationship("InterviewScoreRollup", uselist=False, cascade="all, delete-orphan")
+    activity_rollups = relationship("ActivityDailyRollup", cascade="all, delete-orphan")
 
 
 class Student(Base):
@@ -58,7 +64,7 @@ class Student(Base):
     last_login = Column(DateTime, nullable=True)
 
     # Foreign key to User
-    user_id = Column(Integer, ForeignKey('users.user_id'), nullable=True)
+    user_id = Column(Integer, ForeignKey('users.user_id'), nullable=True, index=True)
 
     # Relationship back to User
     user = relationship("User", back_populates="student")
@@ -68,7 +74,7 @@ class Skill(Base):
     __tablename__ = 'skills'
 
     skill_id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey('users.user_id'))
+    user_id = Column(Integer, ForeignKey('users.user_id'), index=True)
     skill_name = Column(String(100), nullable=False)
     proficiency = Column(Enum('Beginner', 'Intermediate', 'Advanced', 'Expert'))
     
@@ -79,7 +85,7 @@ class Project(Base):
     __tablename__ = 'projects'
 
     project_id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey('users.user_id'))
+    user_id = Column(Integer, ForeignKey('users.user_id'), index=True)
     title = Column(String(150), nullable=False)
     description = Column(Text)
     tech_stack = Column(String(200))
@@ -92,7 +98,7 @@ class Experience(Base):
     __tablename__ = 'experience'
 
     exp_id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey('users.user_id'))
+    user_id = Column(Integer, ForeignKey('users.user_id'), index=True)
     company = Column(String(150), nullable=False)
     role = Column(String(100), nullable=False)
     start_date = Column(Date)
@@ -106,7 +112,7 @@ class Education(Base):
     __tablename__ = 'education'
 
     edu_id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey('users.user_id'))
+    user_id = Column(Integer, ForeignKey('users.user_id'), index=True)
     degree = Column(String(100), nullable=False)
     university = Column(String(150), nullable=False)
     start_date = Column(Date)
@@ -118,6 +124,10 @@ class Education(Base):
 
 class InterviewSession(Base):
     __tablename__ = 'interview_sessions'
+    __table_args__ = (
+        Index('ix_interview_sessions_user_id_created_at', 'user_id', 'created_at'),
+        Index('ix_interview_sessions_created_at', 'created_at'),
+    )
 
     session_id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey('users.user_id'))
@@ -132,6 +142,10 @@ class InterviewSession(Base):
 
 class ActivityLog(Base):
     __tablename__ = 'activity_logs'
+    __table_args__ = (
+        Index('ix_activity_logs_user_id_created_at', 'user_id', 'created_at'),
+        Index('ix_activity_logs_created_at', 'created_at'),
+    )
 
     log_id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey('users.user_id'))
@@ -166,3 +180,166 @@ class MarketTrend(Base):
     skills_required = Column(JSON)
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
 
+
+
+class RefreshToken(Base):
+    __tablename__ = 'refresh_tokens'
+
+    token_id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey('users.user_id'), nullable=False, index=True)
+    # SHA-256 of the opaque token; the raw token is never stored.
+    token_hash = Column(String(64), unique=True, index=True, nullable=False)
+    # All tokens produced by rotating one login share a family, so reuse of an
+    # old token can revoke the whole chain.
+    family_id = Column(String(32), nullable=False, index=True)
+    expires_at = Column(DateTime, nullable=False)
+    created_at = Column(DateTime, server_default=func.now())
+    used_at = Column(DateTime, nullable=True)
+    revoked_at = Column(DateTime, nullable=True)
+
+    user = relationship("User", back_populates="refresh_tokens")
+
+
+class ResumeDocument(Base):
+    __tablename__ = 'resume_documents'
+
+    resume_id = Column(Integer, primary_key=True, index=True)
+    # SHA-256 of the file bytes; identical uploads share one row.
+    content_hash = Column(String(64), unique=True, index=True, nullable=False)
+    filename = Column(String(255))
+    file_type = Column(String(10), nullable=False)
+    size_bytes = Column(Integer, nullable=False)
+    page_count = Column(Integer)
+    storage_path = Column(String(500), nullable=False)
+    extracted_text = Column(Text, nullable=False)
+    uploaded_by = Column(Integer, ForeignKey('users.user_id'), nullable=True)
+    created_at = Column(DateTime, server_default=func.now())
+
+
+class Conversation(Base):
+    __tablename__ = 'conversations'
+    __table_args__ = (
+        Index('ix_conversations_user_id_updated_at', 'user_id', 'updated_at'),
+    )
+
+    conversation_id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey('users.user_id'), nullable=False)
+    title = Column(String(200))
+    # Rolling summary of every message up to and including `summarized_through`;
+    # only later messages are sent to the model verbatim.
+    summary = Column(Text)
+    summarized_through = Column(Integer, nullable=True)
+    created_at = Column(DateTime, server_default=func.now())
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+    user = relationship("User", back_populates="conversations")
+    messages = relationship("ChatMessage", back_populates="conversation", cascade="all, delete-orphan",
+                            order_by="ChatMessage.message_id")
+
+
+class ChatMessage(Base):
+    __tablename__ = 'chat_messages'
+    __table_args__ = (
+        Index('ix_chat_messages_conversation_id_message_id', 'conversation_id', 'message_id'),
+    )
+
+    message_id = Column(Integer, primary_key=True, index=True)
+    conversation_id = Column(Integer, ForeignKey('conversations.conversation_id'), nullable=False)
+    role = Column(Enum('user', 'assistant', name='chat_role'), nullable=False)
+    content = Column(Text, nullable=False)
+    # Estimated once on insert so building a context never re-tokenizes history.
+    token_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, server_default=func.now())
+
+    conversation = relationship("Conversation", back_populates="messages")
+
+
+class SearchDocument(Base):
+    # Searchable text of projects, experience and resumes, one row per source record.
+    # Kept in sync by backend/services/search.py; the full-text index over it
+    # (FTS5 table, tsvector column or FULLTEXT index) is created by migration 0006.
+    __tablename__ = 'search_documents'
+    __table_args__ = (
+        UniqueConstraint('source', 'source_id', name='uq_search_documents_source'),
+        Index('ix_search_documents_user_id', 'user_id'),
+    )
+
+    doc_id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey('users.user_id'), nullable=False)
+    source = Column(String(20), nullable=False)  # "project", "experience" or "resume"
+    source_id = Column(Integer, nullable=False)
+    title = Column(String(300))
+    body = Column(Text)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+
+class RoleMatch(Base):
+    # Top roles per student from the nightly batch in backend/matching; a run
+    # replaces each student's rows, so they always come from one run.
+    __tablename__ = 'role_matches'
+    __table_args__ = (
+        Index('ix_role_matches_user_id_rank', 'user_id', 'rank'),
+    )
+
+    match_id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey('users.user_id'), nullable=False)
+    trend_id = Column(Integer, ForeignKey('market_trends.trend_id'), nullable=False)
+    rank = Column(Integer, nullable=False)  # 1 = best match
+    score = Column(Float, nullable=False)  # 0..1, see backend/matching
+    matched_skills = Column(Integer, nullable=False)
+    computed_at = Column(DateTime, nullable=False)
+
+    trend = relationship("MarketTrend")
+
+
+class ArchivePartition(Base):
+    # One archive file of rows that backend/retention moved out of interview_sessions
+    # or activity_logs. Readers only open files listed here.
+    __tablename__ = 'archive_partitions'
+    __table_args__ = (
+        Index('ix_archive_partitions_table_name_day', 'table_name', 'day'),
+    )
+
+    partition_id = Column(Integer, primary_key=True)
+    table_name = Column(String(50), nullable=False)
+    day = Column(Date, nullable=False)  # created_at date of every row in the file
+    path = Column(String(500), nullable=False)  # relative to ARCHIVE_DIR
+    format = Column(String(20), nullable=False)  # "parquet" or "jsonl.zst"
+    row_count = Column(Integer, nullable=False)
+    min_id = Column(Integer, nullable=False)
+    max_id = Column(Integer, nullable=False)
+    created_at = Column(DateTime, server_default=func.now())
+
+
+class ArchiveUserPartition(Base):
+    # Which archive files hold a user's rows, so history reads open only those.
+    __tablename__ = 'archive_user_partitions'
+    __table_args__ = (
+        Index('ix_archive_user_partitions_user_id', 'user_id'),
+    )
+
+    partition_id = Column(Integer, ForeignKey('archive_partitions.partition_id'), primary_key=True)
+    user_id = Column(Integer, primary_key=True)  # no foreign key: archive files are not rewritten
+    row_count = Column(Integer, nullable=False)
+
+
+class InterviewScoreRollup(Base):
+    # Per-user totals of archived interview sessions, so CareerScore.interview_success
+    # still averages over the whole history.
+    __tablename__ = 'interview_score_rollups'
+
+    user_id = Column(Integer, ForeignKey('users.user_id'), primary_key=True)
+    sessions = Column(Integer, nullable=False, default=0)
+    scored_sessions = Column(Integer, nullable=False, default=0)
+    score_sum = Column(DECIMAL(14, 2), nullable=False, default=0)
+    archived_through = Column(DateTime)  # created_at of the newest archived session
+
+
+class ActivityDailyRollup(Base):
+    # Archived activity_logs counted per user, day and activity type (streaks, engagement).
+    __tablename__ = 'activity_daily_rollups'
+
+    user_id = Column(Integer, ForeignKey('users.user_id'), primary_key=True)
+    day = Column(Date, primary_key=True)
+    activity_type = Column(String(50), primary_key=True)  # "" for rows without a type
+    count = Column(Integer, nullable=False)
@@ -0,0 +1,433 @@
+import io
+import json
+import os
+import time
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+from sqlalchemy import bindparam, delete, func, insert, select, update
+from sqlalchemy.engine import Connection, Engine
+
+from ..database import engine as primary_engine
+from ..exports import DATASETS, Dataset, arrow_schema
+from ..models import ActivityDailyRollup, ArchivePartition, ArchiveUserPartition, InterviewScoreRollup
+
+# --- Retention and Archival ---
+# interview_sessions and activity_logs only ever grow. Rows older than their
+# table's retention age are moved out of the database into compressed files,
+# one directory per table and created_at day:
+#
+#   ARCHIVE_DIR/interview_sessions/2025-01-31/part-<id>.parquet
+#
+# A run works in batches of RETENTION_BATCH_ROWS, oldest first: read the batch,
+# write its files (sorted by user, so Parquet row-group statistics skip other
+# users), then one short transaction records the files in archive_partitions /
+# archive_user_partitions, adds the rows to the rollups and deletes them. Files
+# are written before that transaction and only listed ones are ever read, so a
+# crash leaves at worst an unlisted file, never a lost row. Runs pause
+# RETENTION_BATCH_PAUSE between batches so request traffic gets the database.
+#
+# Rollups keep what CareerScore needs from archived rows: score totals per user
+# (interview_success) and activity counts per user and day. `history` reads a
+# user's rows from the table and then from their archive files, newest first.
+# `compact` merges the part files of each day into one. Meant to run nightly:
+#
+#   python -m backend.retention
+#   python -m backend.retention --compact
+
+ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", "./archive")
+# "parquet" (zstd) or "jsonl.zst"
+ARCHIVE_FORMAT = os.getenv("ARCHIVE_FORMAT", "parquet")
+RETENTION_BATCH_ROWS = int(os.getenv("RETENTION_BATCH_ROWS", "5000"))
+RETENTION_BATCH_PAUSE = float(os.getenv("RETENTION_BATCH_PAUSE", "0.1"))
+FORMATS = ("parquet", "jsonl.zst")
+
+
+class RetentionError(RuntimeError):
+    """Unknown table or format, or a batch another run archived first."""
+
+
+@dataclass
+class Policy:
+    dataset: Dataset
+    id_column: str
+    retention_days: int
+    # Adds a batch of archived rows to the table's rollups, inside the archiving transaction.
+    roll_up: Callable[[Connection, List[Dict[str, Any]]], None]
+
+    @property
+    def table(self):
+        return self.dataset.table
+
+    @property
+    def columns(self) -> List[str]:
+        return self.dataset.columns
+
+
+# --- Rollups ---
+
+def _roll_up_interview_sessions(conn: Connection, rows: List[Dict[str, Any]]):
+    totals: Dict[int, Dict[str, Any]] = {}
+    for row in rows:
+        total = totals.setdefault(row["user_id"], {"sessions": 0, "scored_sessions": 0,
+                                                   "score_sum": Decimal(0), "archived_through": None})
+        total["sessions"] += 1
+        if row["score"] is not None:
+            total["scored_sessions"] += 1
+            total["score_sum"] += Decimal(str(row["score"]))
+        if total["archived_through"] is None or row["created_at"] > total["archived_through"]:
+            total["archived_through"] = row["created_at"]
+
+    rollup = InterviewScoreRollup.__table__
+    existing = dict(conn.execute(
+        select(rollup.c.user_id, rollup.c.archived_through).where(rollup.c.user_id.in_(list(totals)))
+    ).all())
+    new = [{"user_id": user_id, **total} for user_id, total in totals.items() if user_id not in existing]
+    if new:
+        conn.execute(insert(rollup), new)
+    if existing:
+        conn.execute(
+            update(rollup).where(rollup.c.user_id == bindparam("b_user_id")).values(
+                sessions=rollup.c.sessions + bindparam("b_sessions"),
+                scored_sessions=rollup.c.scored_sessions + bindparam("b_scored"),
+                score_sum=rollup.c.score_sum + bindparam("b_score_sum"),
+                archived_through=bindparam("b_through"),
+            ),
+            [{"b_user_id": user_id, "b_sessions": totals[user_id]["sessions"],
+              "b_scored": totals[user_id]["scored_sessions"], "b_score_sum": totals[user_id]["score_sum"],
+              "b_through": max(filter(None, (through, totals[user_id]["archived_through"])))}
+             for user_id, through in existing.items()],
+        )
+
+
+def _roll_up_activity_logs(conn: Connection, rows: List[Dict[str, Any]]):
+    counts: Dict[tuple, int] = defaultdict(int)
+    for row in rows:
+        counts[(row["user_id"], row["created_at"].date(), row["activity_type"] or "")] += 1
+
+    rollup = ActivityDailyRollup.__table__
+    user_ids = {user_id for user_id, _, _ in counts}
+    days = {day for _, day, _ in counts}
+    existing = set(conn.execute(
+        select(rollup.c.user_id, rollup.c.day, rollup.c.activity_type)
+        .where(rollup.c.user_id.in_(list(user_ids)), rollup.c.day.in_(list(days)))
+    ).all())
+    new = [{"user_id": u, "day": d, "activity_type": t, "count": n}
+           for (u, d, t), n in counts.items() if (u, d, t) not in existing]
+    if new:
+        conn.execute(insert(rollup), new)
+    updates = [{"b_user_id": u, "b_day": d, "b_type": t, "b_count": n}
+               for (u, d, t), n in counts.items() if (u, d, t) in existing]
+    if updates:
+        conn.execute(
+            update(rollup).where(rollup.c.user_id == bindparam("b_user_id"), rollup.c.day == bindparam("b_day"),
+                                 rollup.c.activity_type == bindparam("b_type"))
+            .values(count=rollup.c.count + bindparam("b_count")),
+            updates,
+        )
+
+
+POLICIES: Dict[str, Policy] = {
+    "interview_sessions": Policy(DATASETS["interview_sessions"], "session_id",
+                                 int(os.getenv("RETENTION_INTERVIEW_SESSIONS_DAYS", "365")),
+                                 _roll_up_interview_sessions),
+    "activity_logs": Policy(DATASETS["activity_logs"], "log_id",
+                            int(os.getenv("RETENTION_ACTIVITY_LOGS_DAYS", "180")),
+                            _roll_up_activity_logs),
+}
+
+
+def get_policy(name: str) -> Policy:
+    try:
+        return POLICIES[name]
+    except KeyError:
+        raise RetentionError(f"No retention policy for {name!r}. Choose from: {', '.join(POLICIES)}") from None
+
+
+# --- Archive Files ---
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"Cannot archive {type(value).__name__}")
+
+
+def _write_file(policy: Policy, rows: List[Dict[str, Any]], path: Path, fmt: str):
+    """Writes `rows` to `path` via a temporary file, so a listed path is always complete."""
+    tmp = path.with_name(path.name + ".tmp")
+    if fmt == "parquet":
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        schema = arrow_schema(policy.dataset)
+        pq.write_table(pa.Table.from_pylist(rows, schema=schema), tmp, compression="zstd",
+                       row_group_size=1000)
+    elif fmt == "jsonl.zst":
+        import zstandard
+
+        with open(tmp, "wb") as raw, zstandard.ZstdCompressor(level=9).stream_writer(raw) as out:
+            for row in rows:
+                out.write(json.dumps(row, default=_json_default).encode("utf-8") + b"\n")
+    else:
+        raise RetentionError(f"Unknown archive format {fmt!r}. Choose from: {', '.join(FORMATS)}")
+    with open(tmp, "rb") as f:
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def _decode_json_row(policy: Policy, row: Dict[str, Any]) -> Dict[str, Any]:
+    for name in policy.columns:
+        value = row.get(name)
+        if value is None:
+            continue
+        column_type = policy.table.c[name].type.python_type
+        if column_type is datetime:
+            row[name] = datetime.fromisoformat(value)
+        elif column_type is Decimal:
+            row[name] = Decimal(value)
+    return row
+
+
+def read_file(policy: Policy, path: Path, fmt: str, user_id: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Rows of one archive file, optionally only `user_id`'s."""
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        filters = [("user_id", "=", user_id)] if user_id is not None else None
+        return pq.read_table(path, filters=filters).to_pylist()
+    if fmt == "jsonl.zst":
+        import zstandard
+
+        rows = []
+        with open(path, "rb") as raw, zstandard.ZstdDecompressor().stream_reader(raw) as compressed:
+            for line in io.TextIOWrapper(compressed, encoding="utf-8"):
+                row = json.loads(line)
+                if user_id is None or row["user_id"] == user_id:
+                    rows.append(_decode_json_row(policy, row))
+        return rows
+    raise RetentionError(f"Unknown archive format {fmt!r}. Choose from: {', '.join(FORMATS)}")
+
+
+def _new_file(name: str, day: date, fmt: str) -> Path:
+    """A fresh path (relative to ARCHIVE_DIR) in the table's directory for `day`."""
+    directory = Path(name) / day.isoformat()
+    (Path(ARCHIVE_DIR) / directory).mkdir(parents=True, exist_ok=True)
+    return directory / f"part-{uuid.uuid4().hex}.{fmt}"
+
+
+def _record_partition(conn: Connection, name: str, policy: Policy, day: date, path: Path, fmt: str,
+                      rows: List[Dict[str, Any]]):
+    ids = [row[policy.id_column] for row in rows]
+    partition_id = conn.execute(insert(ArchivePartition.__table__).values(
+        table_name=name, day=day, path=path.as_posix(), format=fmt, row_count=len(rows),
+        min_id=min(ids), max_id=max(ids),
+    )).inserted_primary_key[0]
+    per_user: Dict[int, int] = defaultdict(int)
+    for row in rows:
+        per_user[row["user_id"]] += 1
+    conn.execute(insert(ArchiveUserPartition.__table__), [
+        {"partition_id": partition_id, "user_id": user_id, "row_count": count}
+        for user_id, count in per_user.items()
+    ])
+
+
+def _by_day(rows: Iterable[Dict[str, Any]]) -> Dict[date, List[Dict[str, Any]]]:
+    days: Dict[date, List[Dict[str, Any]]] = defaultdict(list)
+    for row in rows:
+        days[row["created_at"].date()].append(row)
+    for day_rows in days.values():
+        day_rows.sort(key=lambda row: (row["user_id"], row["created_at"]))
+    return days
+
+
+def _remove(paths: Iterable[Path]):
+    for path in paths:
+        try:
+            (Path(ARCHIVE_DIR) / path).unlink()
+        except FileNotFoundError:
+            pass
+
+
+# --- Archiving ---
+
+@dataclass
+class RetentionRun:
+    table: str
+    cutoff: datetime
+    rows: int = 0
+    batches: int = 0
+    files: int = 0
+    seconds: float = 0.0
+
+
+def archive_batch(name: str, cutoff: datetime, batch_rows: int = RETENTION_BATCH_ROWS,
+                  fmt: str = ARCHIVE_FORMAT, bind: Optional[Engine] = None) -> RetentionRun:
+    """Moves up to `batch_rows` of the oldest rows created before `cutoff` into archive files."""
+    policy = get_policy(name)
+    bind = bind or primary_engine
+    run = RetentionRun(name, cutoff)
+    table, id_column = policy.table, policy.table.c[policy.id_column]
+
+    with bind.connect() as conn:
+        rows = [dict(row) for row in conn.execute(
+            select(*(table.c[c] for c in policy.columns))
+            .where(table.c.created_at < cutoff)
+            .order_by(table.c.created_at, id_column)
+            .limit(batch_rows)
+        ).mappings()]
+    if not rows:
+        return run
+
+    written = []
+    try:
+        files = []
+        for day, day_rows in sorted(_by_day(rows).items()):
+            path = _new_file(name, day, fmt)
+            _write_file(policy, day_rows, Path(ARCHIVE_DIR) / path, fmt)
+            written.append(path)
+            files.append((day, path, day_rows))
+
+        ids = [row[policy.id_column] for row in rows]
+        with bind.begin() as conn:
+            deleted = conn.execute(delete(table).where(id_column.in_(ids))).rowcount
+            if deleted != len(ids):
+                # Another run archived (some of) these rows first; roll back and let the caller retry.
+                raise RetentionError(f"{name}: {len(ids) - deleted} rows of the batch were already gone")
+            for day, path, day_rows in files:
+                _record_partition(conn, name, policy, day, path, fmt, day_rows)
+            policy.roll_up(conn, rows)
+    except BaseException:
+        _remove(written)
+        raise
+
+    run.rows, run.batches, run.files = len(rows), 1, len(files)
+    return run
+
+
+def archive(name: str, older_than_days: Optional[int] = None, batch_rows: int = RETENTION_BATCH_ROWS,
+            fmt: str = ARCHIVE_FORMAT, pause: float = RETENTION_BATCH_PAUSE,
+            max_batches: Optional[int] = None, bind: Optional[Engine] = None) -> RetentionRun:
+    """Archives every row of `name` older than its retention age (or `older_than_days`)."""
+    policy = get_policy(name)
+    if fmt not in FORMATS:
+        raise RetentionError(f"Unknown archive format {fmt!r}. Choose from: {', '.join(FORMATS)}")
+    days = policy.retention_days if older_than_days is None else older_than_days
+    started = time.perf_counter()
+    run = RetentionRun(name, datetime.utcnow() - timedelta(days=days))
+    while max_batches is None or run.batches < max_batches:
+        batch = archive_batch(name, run.cutoff, batch_rows, fmt, bind)
+        if not batch.rows:
+            break
+        run.rows += batch.rows
+        run.batches += 1
+        run.files += batch.files
+        if batch.rows < batch_rows:
+            break
+        time.sleep(pause)
+    run.seconds = time.perf_counter() - started
+    return run
+
+
+# --- Compaction ---
+
+def compact(name: str, fmt: str = ARCHIVE_FORMAT, bind: Optional[Engine] = None) -> int:
+    """
+    Merges the part files of each day of `name` into one file. Returns the
+    number of files removed. Old files are deleted only after the manifest
+    points at the merged one.
+    """
+    policy = get_policy(name)
+    bind = bind or primary_engine
+    partitions = ArchivePartition.__table__
+    user_partitions = ArchiveUserPartition.__table__
+    with bind.connect() as conn:
+        days = conn.execute(
+            select(partitions.c.day).where(partitions.c.table_name == name)
+            .group_by(partitions.c.day).having(func.count() > 1).order_by(partitions.c.day)
+        ).scalars().all()
+
+    removed = 0
+    for day in days:
+        with bind.connect() as conn:
+            parts = conn.execute(
+                select(partitions.c.partition_id, partitions.c.path, partitions.c.format)
+                .where(partitions.c.table_name == name, partitions.c.day == day)
+            ).all()
+        rows = [row for part in parts for row in read_file(policy, Path(ARCHIVE_DIR) / part.path, part.format)]
+        rows.sort(key=lambda row: (row["user_id"], row["created_at"]))
+        path = _new_file(name, day, fmt)
+        _write_file(policy, rows, Path(ARCHIVE_DIR) / path, fmt)
+        part_ids = [part.partition_id for part in parts]
+        try:
+            with bind.begin() as conn:
+                conn.execute(delete(user_partitions).where(user_partitions.c.partition_id.in_(part_ids)))
+                if conn.execute(delete(partitions).where(partitions.c.partition_id.in_(part_ids))).rowcount \
+                        != len(part_ids):
+                    raise RetentionError(f"{name} {day}: partitions changed during compaction")
+                _record_partition(conn, name, policy, day, path, fmt, rows)
+        except BaseException:
+            _remove([path])
+            raise
+        _remove(Path(part.path) for part in parts)
+        removed += len(parts) - 1
+    return removed
+
+
+# --- Read Path ---
+
+def archived_rows(conn, name: str, user_id: int, before_id: Optional[int] = None,
+                  limit: int = 20) -> List[Dict[str, Any]]:
+    """
+    Up to `limit` of the user's archived rows of `name`, newest first, with ids
+    below `before_id` when given. `conn` is a Session or Connection for the manifest.
+    """
+    policy = get_policy(name)
+    partitions = ArchivePartition.__table__
+    user_partitions = ArchiveUserPartition.__table__
+    query = (
+        select(partitions.c.path, partitions.c.format, partitions.c.max_id)
+        .join(user_partitions, user_partitions.c.partition_id == partitions.c.partition_id)
+        .where(partitions.c.table_name == name, user_partitions.c.user_id == user_id)
+        .order_by(partitions.c.max_id.desc())
+    )
+    if before_id is not None:
+        query = query.where(partitions.c.min_id < before_id)
+
+    for attempt in range(2):
+        rows: List[Dict[str, Any]] = []
+        try:
+            for part in conn.execute(query).all():
+                # Files are ordered by their newest id: once `limit` rows are newer than
+                # everything left, the remaining files cannot change the page.
+                if len(rows) >= limit and rows[limit - 1][policy.id_column] > part.max_id:
+                    break
+                rows.extend(row for row in read_file(policy, Path(ARCHIVE_DIR) / part.path, part.format, user_id)
+                            if before_id is None or row[policy.id_column] < before_id)
+                rows.sort(key=lambda row: row[policy.id_column], reverse=True)
+            return rows[:limit]
+        except FileNotFoundError:
+            # Compaction replaced a file after the manifest was read; read the new manifest.
+            if attempt:
+                raise
+    return []
+
+
+def history(db, name: str, user_id: int, live: Sequence[Any], before_id: Optional[int],
+            limit: int) -> List[Any]:
+    """
+    Completes a page of the user's rows: `live` are up to `limit` + 1 rows from
+    the table (newest first). Archived rows are all older than live ones, so
+    they are only read when the table ran out before the page filled up.
+    """
+    if len(live) > limit:
+        return list(live)
+    policy = get_policy(name)
+    last_id = getattr(live[-1], policy.id_column) if live else before_id
+    return list(live) + archived_rows(db, name, user_id, last_id, limit + 1 - len(live))
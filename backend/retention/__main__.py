@@ -0,0 +1,29 @@
+import argparse
+
+from backend.retention import ARCHIVE_FORMAT, FORMATS, POLICIES, RETENTION_BATCH_ROWS, archive, compact
+
+# --- Retention CLI ---
+# Nightly from cron, e.g.:
+#   15 3 * * *  cd /srv/app && python -m backend.retention --compact
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Move old interview sessions and activity logs to archive files.")
+    parser.add_argument("tables", nargs="*", help=f"Tables to archive: {', '.join(POLICIES)} (default: all).")
+    parser.add_argument("--older-than-days", type=int, help="Override the table's retention age.")
+    parser.add_argument("--batch-rows", type=int, default=RETENTION_BATCH_ROWS)
+    parser.add_argument("--max-batches", type=int, help="Stop after this many batches per table.")
+    parser.add_argument("--format", choices=FORMATS, default=ARCHIVE_FORMAT)
+    parser.add_argument("--compact", action="store_true", help="Then merge each day's part files into one.")
+    args = parser.parse_args()
+
+    for name in args.tables or list(POLICIES):
+        run = archive(name, args.older_than_days, args.batch_rows, args.format, max_batches=args.max_batches)
+        print(f"{name}: archived {run.rows} rows older than {run.cutoff:%Y-%m-%d} "
+              f"into {run.files} files ({run.batches} batches) in {run.seconds:.1f}s")
+        if args.compact:
+            print(f"{name}: compaction removed {compact(name, args.format)} files")
+
+
+if __name__ == "__main__":
+    main()
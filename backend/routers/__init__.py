@@ -5,3 +5,6 @@ from .career_path_routes import router as career_path_routes
 from .interview_routes import router as interview_routes
 from .job_market import router as job_market
 from .review_resume import router as review_resume
+from .admin_routes import router as admin_routes
+from .chat_routes import router as chat_routes
+from .search_routes import router as search_routes
@@ -0,0 +1,111 @@
+from datetime import date
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from backend.exports import ExportError, ExportFilters, export_filename, media_type, stream_export
+from backend.services.llm_provider import circuit_states
+from backend.services.model_router import routing_stats
+from backend.utils.admission import admission_stats
+from backend.utils.security import require_admin
+from backend.utils.profiling import profile_store
+from backend.utils.query_stats import slow_queries
+
+# Operator-only endpoints; every route requires the X-Admin-Token header
+router = APIRouter(
+    prefix="/api/admin",
+    tags=["Admin"],
+    dependencies=[Depends(require_admin)]
+)
+
+# --- Request Profiles ---
+@router.get("/profiles")
+def list_profiles(limit: int = 50):
+    """
+    Lists captured request profiles (newest first) without their stacks.
+    """
+    return {"profiles": profile_store.list()[:limit]}
+
+@router.get("/profiles/{profile_id}")
+def get_profile(profile_id: str):
+    """
+    Returns one profile, including phase timings and folded stacks.
+    """
+    profile = profile_store.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return profile
+
+@router.get("/profiles/{profile_id}/folded", response_class=PlainTextResponse)
+def download_folded_stacks(profile_id: str):
+    """
+    Folded stacks of one profile, ready for flamegraph.pl or speedscope.
+    """
+    profile = profile_store.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return PlainTextResponse(
+        "\n".join(profile["folded"]) + "\n",
+        headers={"Content-Disposition": f'attachment; filename="profile-{profile_id}.folded"'}
+    )
+
+# --- Slow Queries ---
+@router.get("/slow-queries")
+def list_slow_queries(limit: int = 50):
+    """
+    Recent slow SQL statements (normalized, parameters redacted) with EXPLAIN plans.
+    """
+    return {"slow_queries": list(reversed(slow_queries))[:limit]}
+
+# --- LLM Circuits ---
+@router.get("/llm/circuits")
+def list_llm_circuits():
+    """
+    Circuit breaker state and recent p95 latency per LLM provider and model.
+    """
+    return {"circuits": circuit_states()}
+
+# --- LLM Routing ---
+@router.get("/llm/routing")
+def list_llm_routing():
+    """
+    Model routing tiers and SLOs, decision counts by task and reason, and
+    end-to-end latency and errors per routed model.
+    """
+    return routing_stats()
+
+# --- Admission Control ---
+@router.get("/admission")
+def list_admission_limits():
+    """
+    Current adaptive concurrency limit, queue depth and counters per route class (this worker).
+    """
+    return {"route_classes": admission_stats()}
+
+# --- Data Exports ---
+@router.get("/exports/{dataset}")
+def export_dataset(
+    dataset: str,
+    format: Literal["csv", "parquet"] = "csv",
+    compression: Literal["none", "gzip", "zstd"] = "none",
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    college: Optional[str] = None,
+    branch: Optional[str] = None,
+    year_of_study: Optional[str] = None
+):
+    """
+    Streams a table (activity_logs, interview_sessions, students, career_scores, skills,
+    projects, experience, education) as CSV or Parquet, optionally filtered by date range
+    (inclusive) and student cohort. Rows are read and encoded in bounded chunks.
+    """
+    filters = ExportFilters(start=start, end=end, college=college, branch=branch, year_of_study=year_of_study)
+    try:
+        chunks = stream_export(dataset, format, compression, filters)
+    except ExportError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return StreamingResponse(
+        chunks,
+        media_type=media_type(format, compression),
+        headers={"Content-Disposition": f'attachment; filename="{export_filename(dataset, format, compression)}"'}
+    )
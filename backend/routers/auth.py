@@ -1,21 +1,25 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from fastapi.responses import JSONResponse
-from ..schemas import UserCreate, UserSchema
-from ..models import User, Student
+from ..schemas import UserCreate, UserSchema, Token, RefreshTokenRequest
+from ..models import User, Student, RefreshToken
 from ..database import get_db
 from sqlalchemy.orm import Session
+from ..utils.serialization import FastJSONResponse, schema_response
 from ..utils.security import (
     verify_password,
     get_password_hash,
     create_access_token,
+    generate_refresh_token,
+    hash_refresh_token,
     ACCESS_TOKEN_EXPIRE_MINUTES,
+    REFRESH_TOKEN_EXPIRE_DAYS,
     oauth2_scheme,
     verify_token,
 )
 from datetime import datetime, timedelta
 import logging
 import traceback
+import uuid
 
 
 # --- Logging Setup ---
@@ -28,6 +32,29 @@ router = APIRouter(
     tags=["Authentication"]
 )
 
+# --- Refresh Token Helpers ---
+
+def issue_refresh_token(db: Session, user: User, family_id: str = None) -> str:
+    """
+    Creates a refresh token row for `user` and returns the raw token.
+    A new login starts a new family; rotation keeps the family of the old token.
+    The caller commits.
+    """
+    token = generate_refresh_token()
+    db.add(RefreshToken(
+        user_id=user.user_id,
+        token_hash=hash_refresh_token(token),
+        family_id=family_id or uuid.uuid4().hex,
+        expires_at=datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS),
+    ))
+    return token
+
+def revoke_token_family(db: Session, family_id: str):
+    db.query(RefreshToken).filter(
+        RefreshToken.family_id == family_id,
+        RefreshToken.revoked_at.is_(None)
+    ).update({RefreshToken.revoked_at: datetime.utcnow()}, synchronize_session=False)
+
 # --- API Endpoints ---
 
 @router.post("/register", response_model=UserSchema, status_code=status.HTTP_201_CREATED)
@@ -55,7 +82,7 @@ def register_user(user_data: UserCreate, db: Session = Depends(get_db)):
         db.add(new_user)
         db.commit()
         db.refresh(new_user)
-        return new_user
+        return schema_response(UserSchema, new_user, status_code=status.HTTP_201_CREATED)
 
     except HTTPException:
         raise
@@ -99,24 +126,27 @@ async def login_for_access_token(
             headers={"WWW-Authenticate":"Bearer"}
         )
 
-    # Update last login
+    # Update last login and start a new refresh token family
+    refresh_token = issue_refresh_token(db, user)
+    user.last_login = datetime.utcnow()
     try:
-        user.last_login = datetime.utcnow()
         db.commit()
     except Exception as e:
-        logger.error(f"Could not update last_login: {e}")
+        logger.error(f"Could not update last_login or store refresh token: {e}")
         db.rollback()
+        refresh_token = None
 
     # Create access token
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     token = create_access_token(
-        data={"sub": user.email},
+        data={"sub": user.email, "role": user.role},
         expires_delta=access_token_expires
     )
 
-    return JSONResponse(content={
+    return FastJSONResponse(content={
         "access_token": token,
         "token_type": "bearer",
+        "refresh_token": refresh_token,
         "user": {
             "email": user.email,
             "full_name": user.full_name,
@@ -155,11 +185,75 @@ async def generate_jwt_token(
             headers={"WWW-Authenticate":"Bearer"}
         )
 
-    # Create token
+    # Create tokens
+    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    token = create_access_token(data={"sub": user.email, "role": user.role}, expires_delta=access_token_expires)
+    refresh_token = issue_refresh_token(db, user)
+    db.commit()
+
+    return {"access_token": token, "token_type": "bearer", "refresh_token": refresh_token}
+
+@router.post("/refresh", response_model=Token)
+def refresh_access_token(request: RefreshTokenRequest, db: Session = Depends(get_db)):
+    """
+    Exchange a refresh token for a new access token and a new refresh token.
+    No password hashing happens here: the token is looked up by its SHA-256.
+    Each refresh token works once; presenting a used or revoked token is treated
+    as theft and revokes every token in its family.
+    """
+    invalid = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid or expired refresh token",
+        headers={"WWW-Authenticate":"Bearer"}
+    )
+    stored = db.query(RefreshToken).filter(
+        RefreshToken.token_hash == hash_refresh_token(request.refresh_token)
+    ).first()
+    if not stored:
+        raise invalid
+
+    now = datetime.utcnow()
+    if stored.revoked_at is not None or stored.used_at is not None:
+        logger.warning(f"Refresh token reuse detected for user_id={stored.user_id}; revoking family")
+        revoke_token_family(db, stored.family_id)
+        db.commit()
+        raise invalid
+    if stored.expires_at <= now:
+        raise invalid
+
+    # Claim the token atomically so two concurrent refreshes cannot both succeed
+    claimed = db.query(RefreshToken).filter(
+        RefreshToken.token_id == stored.token_id,
+        RefreshToken.used_at.is_(None),
+        RefreshToken.revoked_at.is_(None)
+    ).update({RefreshToken.used_at: now}, synchronize_session=False)
+    if claimed != 1:
+        logger.warning(f"Concurrent refresh token reuse for user_id={stored.user_id}; revoking family")
+        revoke_token_family(db, stored.family_id)
+        db.commit()
+        raise invalid
+
+    user = stored.user
+    new_refresh_token = issue_refresh_token(db, user, family_id=stored.family_id)
+    db.commit()
+
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    token = create_access_token(data={"sub": user.email}, expires_delta=access_token_expires)
+    token = create_access_token(data={"sub": user.email, "role": user.role}, expires_delta=access_token_expires)
+    return {"access_token": token, "token_type": "bearer", "refresh_token": new_refresh_token}
 
-    return {"access_token": token, "token_type": "bearer"}
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+def revoke_refresh_token(request: RefreshTokenRequest, db: Session = Depends(get_db)):
+    """
+    Revoke a refresh token and every token rotated from the same login.
+    Unknown tokens are ignored so logout is idempotent.
+    """
+    stored = db.query(RefreshToken).filter(
+        RefreshToken.token_hash == hash_refresh_token(request.refresh_token)
+    ).first()
+    if stored:
+        revoke_token_family(db, stored.family_id)
+        db.commit()
+    return
 
 # convenience dependency to protect other endpoints/apps
 def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
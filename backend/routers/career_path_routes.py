@@ -1,9 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
-from backend.schemas import CareerPathRequest, CareerPathResponse
+from backend.matching import matches_for
+from backend.schemas import (CareerPathRequest, CareerPathResponse, CohortStanding, RoleMatchesResponse,
+                             RoleMatchSchema, StandingResponse)
 from backend.services import gemini_service
-from backend.database import get_db
+from backend.services.standings import batch_of, clamp_score, standings_index
+from backend.database import get_db, get_read_db
 from backend.models import User
 from .user import get_current_user
 
@@ -52,3 +55,48 @@ def generate_user_career_roadmap(
             detail="An internal error occurred while generating the career path."
         )
 
+
+@router.get("/standing", response_model=StandingResponse)
+def get_career_standing(current_user: User = Depends(get_current_user)):
+    """
+    Returns the user's rank and percentile by career score within their batch
+    (college, branch and year), their college, and all students.
+    Served from the in-memory cohort index; no table scan per request.
+    """
+    career_score = current_user.career_score
+    if career_score is None or career_score.career_score is None:
+        raise HTTPException(status_code=404, detail="No career score has been calculated yet.")
+
+    # The caller's own entry is refreshed from the database, so it is never stale
+    # even if the score was written by another worker since the last rebuild.
+    standings_index.set_batch(current_user.user_id, batch_of(current_user.student))
+    if standings_index.score_of(current_user.user_id) != clamp_score(career_score.career_score):
+        standings_index.set_score(current_user.user_id, career_score.career_score)
+
+    cohorts = standings_index.standings(current_user.user_id)
+    return StandingResponse(
+        career_score=career_score.career_score,
+        cohorts=[CohortStanding(**vars(standing)) for standing in cohorts],
+    )
+
+
+@router.get("/matches", response_model=RoleMatchesResponse)
+def get_role_matches(
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    The market-trend roles that best fit the user's skills, as scored by the
+    nightly matching run (backend/matching). Reads stored rows only.
+    """
+    matches = matches_for(db, current_user.user_id)
+    return RoleMatchesResponse(
+        matches=[
+            RoleMatchSchema(
+                rank=m.rank, trend_id=m.trend_id, role=m.trend.role, avg_salary_range=m.trend.avg_salary_range,
+                demand_score=m.trend.demand_score, score=m.score, matched_skills=m.matched_skills,
+            )
+            for m in matches
+        ],
+        computed_at=matches[0].computed_at if matches else None,
+    )
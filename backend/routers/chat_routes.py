@@ -0,0 +1,140 @@
+import asyncio
+from typing import List
+
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from starlette.background import BackgroundTask
+
+from backend.database import get_db
+from backend.models import Conversation, User
+from backend.schemas import ChatRequest, ChatResponse, ConversationDetail, ConversationSchema
+from backend.services import chat_service
+from backend.utils.serialization import dumps
+from .user import get_current_user
+
+# --- Router Setup ---
+router = APIRouter(
+    prefix="/api/chat",
+    tags=["Chat"]
+)
+
+CHAT_ERROR_MESSAGE = "Sorry, the assistant is unavailable right now. Please try again in a moment."
+
+
+def _event(payload: dict) -> bytes:
+    # One server-sent event
+    return b"data: " + dumps(payload) + b"\n\n"
+
+
+def _start_turn(db: Session, user: User, request: ChatRequest) -> chat_service.ChatTurn:
+    try:
+        return chat_service.start_turn(db, user, request.message, request.conversation_id)
+    except chat_service.ConversationNotFound:
+        raise HTTPException(status_code=404, detail="Conversation not found")
+
+
+# --- API Endpoints ---
+@router.post("", response_model=ChatResponse)
+async def chat(
+    request: ChatRequest,
+    background_tasks: BackgroundTasks,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Sends a message to the career assistant.
+
+    Streams the reply as server-sent events by default:
+    `start` (conversation_id), `delta` (text chunks), then `done` (message_id) or `error`.
+    With `"stream": false` the reply is returned as one ChatResponse.
+    """
+    turn = await asyncio.to_thread(_start_turn, db, current_user, request)
+
+    if not request.stream:
+        try:
+            reply = await chat_service.reply(turn)
+        except Exception as e:
+            print(f"Error generating chat reply: {e}")
+            reply = ""
+        if not reply:
+            raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=CHAT_ERROR_MESSAGE)
+        message_id = await asyncio.to_thread(chat_service.save_reply, turn.conversation_id, reply)
+        background_tasks.add_task(chat_service.summarize_if_needed, turn.conversation_id)
+        return ChatResponse(conversation_id=turn.conversation_id, message_id=message_id, reply=reply)
+
+    async def events():
+        yield _event({"type": "start", "conversation_id": turn.conversation_id})
+        parts = []
+        try:
+            async for chunk in chat_service.stream_reply(turn):
+                parts.append(chunk)
+                yield _event({"type": "delta", "text": chunk})
+        except Exception as e:
+            print(f"Error streaming chat reply: {e}")
+        reply = "".join(parts)
+        # A failed stream, or one that ended without any text, is not saved as an empty reply.
+        if not reply:
+            yield _event({"type": "error", "detail": CHAT_ERROR_MESSAGE})
+            return
+        # A stream cut off mid-way is still saved, so the history matches what the user saw.
+        message_id = await asyncio.to_thread(chat_service.save_reply, turn.conversation_id, reply)
+        yield _event({"type": "done", "message_id": message_id})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        # Runs after the last event is sent, so summarizing never delays a reply.
+        background=BackgroundTask(chat_service.summarize_if_needed, turn.conversation_id),
+    )
+
+
+@router.get("/conversations", response_model=List[ConversationSchema])
+def list_conversations(
+    limit: int = Query(20, ge=1, le=100),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Lists the user's conversations, most recently active first.
+    """
+    return (
+        db.query(Conversation)
+        .filter(Conversation.user_id == current_user.user_id)
+        .order_by(Conversation.updated_at.desc(), Conversation.conversation_id.desc())
+        .limit(limit)
+        .all()
+    )
+
+
+@router.get("/conversations/{conversation_id}", response_model=ConversationDetail)
+def get_conversation(
+    conversation_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Returns one conversation with its full message history.
+    """
+    try:
+        return chat_service.get_conversation(db, current_user.user_id, conversation_id)
+    except chat_service.ConversationNotFound:
+        raise HTTPException(status_code=404, detail="Conversation not found")
+
+
+@router.delete("/conversations/{conversation_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_conversation(
+    conversation_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Deletes a conversation and its messages.
+    """
+    try:
+        conversation = chat_service.get_conversation(db, current_user.user_id, conversation_id)
+    except chat_service.ConversationNotFound:
+        raise HTTPException(status_code=404, detail="Conversation not found")
+    db.delete(conversation)
+    db.commit()
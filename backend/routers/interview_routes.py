@@ -1,11 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import asyncio
+from decimal import Decimal
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 
-from backend.schemas import InterviewFeedbackRequest, InterviewFeedbackResponse
-from backend.services import gemini_service
-from backend.database import get_db
-from backend.models import User, InterviewSession
-from .user import get_current_user
+from backend.schemas import (InterviewBatchRequest, InterviewBatchResponse, InterviewFeedbackRequest,
+                             InterviewFeedbackResponse, InterviewHistoryResponse, MockInterviewAnswerRequest,
+                             MockInterviewAnswerResponse, MockInterviewResponse, MockInterviewStartRequest)
+from backend.services import gemini_service, mock_interview
+from backend.database import get_db, get_read_db
+from backend.models import CareerScore, InterviewScoreRollup, User, InterviewSession
+from backend import retention
+from backend.services.interview_scoring import to_markdown
+from backend.utils.serialization import schema_response
+from .user import get_current_user, get_current_user_read
 
 # --- Router Setup ---
 router = APIRouter(
@@ -13,6 +23,64 @@ router = APIRouter(
     tags=["Interview"]
 )
 
+# --- Helpers ---
+
+def _update_interview_success(db: Session, user_id: int) -> Decimal:
+    """
+    Recomputes CareerScore.interview_success (0-100) as the mean session score x 10,
+    over live sessions and the rollup of archived ones.
+    Runs inside the caller's transaction, so it commits together with the new sessions.
+    """
+    db.flush()
+    scored, total = (
+        db.query(func.count(InterviewSession.score), func.sum(InterviewSession.score))
+        .filter(InterviewSession.user_id == user_id, InterviewSession.score.isnot(None))
+        .one()
+    )
+    scored, total = scored or 0, Decimal(str(total or 0))
+    archived = db.get(InterviewScoreRollup, user_id)
+    if archived is not None:
+        scored += archived.scored_sessions
+        total += Decimal(str(archived.score_sum))
+    average = total / scored if scored else 0
+    success = Decimal(str(round(float(average) * 10, 2)))
+    career_score = db.query(CareerScore).filter(CareerScore.user_id == user_id).first()
+    if career_score is None:
+        career_score = CareerScore(user_id=user_id)
+        db.add(career_score)
+    career_score.interview_success = success
+    return success
+
+def _save_sessions(db: Session, user_id: int, sessions: List[InterviewSession]):
+    # One transaction for the sessions and the updated career score
+    db.add_all(sessions)
+    success = _update_interview_success(db, user_id)
+    db.commit()
+    for session in sessions:
+        db.refresh(session)
+    return sessions, success
+
+def _mock_state(interview: mock_interview.MockInterview) -> dict:
+    current = interview.current
+    return {
+        "session_id": interview.session_id,
+        "role": interview.role,
+        "total": interview.total,
+        "answered": interview.answered,
+        "question": current,
+        "question_number": len(interview.asked) if current else None,
+        "finished": interview.finished,
+    }
+
+def _new_session(user_id: int, question: str, user_answer: str, evaluation) -> InterviewSession:
+    return InterviewSession(
+        user_id=user_id,
+        question=question,
+        user_answer=user_answer,
+        ai_feedback=to_markdown(evaluation),
+        score=Decimal(str(round(evaluation.score, 2)))
+    )
+
 # --- API Endpoints ---
 
 @router.post("/feedback", response_model=InterviewFeedbackResponse)
@@ -22,8 +90,9 @@ def get_interview_feedback(
     current_user: User = Depends(get_current_user)
 ):
     """
-    Receives an interview question and a user's answer, gets feedback from the Gemini API,
-    and saves the session to the database.
+    Receives an interview question and a user's answer, gets a score and feedback from
+    the model in one structured call (or the local fallback scorer), and saves the
+    session together with the user's updated interview success rate.
     """
     if not request.question or not request.user_answer:
         raise HTTPException(
@@ -32,33 +101,21 @@ def get_interview_feedback(
         )
 
     try:
-        # 1. Get AI feedback from the Gemini service
-        ai_feedback_text = gemini_service.generate_interview_feedback(
+        # 1. Score the answer and get feedback (never fails; falls back to local heuristics)
+        evaluation = gemini_service.evaluate_interview_answer(
             question=request.question,
             user_answer=request.user_answer
         )
-        
-        # Check for errors from the service
-        if ai_feedback_text.startswith("Error:") or ai_feedback_text.startswith("Sorry,"):
-             raise HTTPException(
-                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-                detail=ai_feedback_text
-            )
 
-        # 2. Save the entire session to the database
-        new_session = InterviewSession(
-            user_id=current_user.user_id,
-            question=request.question,
-            user_answer=request.user_answer,
-            ai_feedback=ai_feedback_text,
-            score=0  # Placeholder for potential future scoring logic
-        )
-        db.add(new_session)
-        db.commit()
+        # 2. Save the session and update CareerScore in one transaction
+        new_session = _new_session(current_user.user_id, request.question, request.user_answer, evaluation)
+        _save_sessions(db, current_user.user_id, [new_session])
 
-        # 3. Return the feedback to the user
-        return {"feedback": ai_feedback_text}
+        # 3. Return the saved session (including the feedback) to the user
+        return {"session": new_session, "evaluation": evaluation}
 
+    except HTTPException:
+        raise
     except Exception as e:
         # Catch any other unexpected errors during the process
         print(f"An unexpected error occurred in interview feedback: {e}")
@@ -67,3 +124,163 @@ def get_interview_feedback(
             detail="An internal error occurred while processing your interview feedback."
         )
 
+@router.post("/sessions/batch", response_model=InterviewBatchResponse)
+async def evaluate_interview_batch(
+    request: InterviewBatchRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Evaluates a whole mock interview at once. Every answer is scored concurrently
+    (one structured model call each), and all sessions plus the updated career score
+    are saved in a single transaction, so the request takes about one model latency
+    instead of one per question.
+    """
+    answers = request.answers
+    for index, item in enumerate(answers):
+        if not item.question or not item.user_answer:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Question and answer cannot be empty (answer {index})."
+            )
+
+    evaluations = await gemini_service.evaluate_interview_batch(
+        [(item.question, item.user_answer) for item in answers]
+    )
+    new_sessions = [
+        _new_session(current_user.user_id, item.question, item.user_answer, evaluation)
+        for item, evaluation in zip(answers, evaluations)
+    ]
+    try:
+        saved, success = await asyncio.to_thread(_save_sessions, db, current_user.user_id, new_sessions)
+    except Exception as e:
+        print(f"An unexpected error occurred while saving the interview batch: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="An internal error occurred while saving your interview."
+        )
+
+    return schema_response(InterviewBatchResponse, {
+        "sessions": saved,
+        "evaluations": evaluations,
+        "evaluated": len(saved),
+        "average_score": round(sum(e.score for e in evaluations) / len(evaluations), 2),
+        "interview_success": success,
+    })
+
+@router.get("/sessions", response_model=InterviewHistoryResponse)
+def list_interview_sessions(
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[int] = None,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user_read)
+):
+    """
+    Returns the user's interview history, newest first, read from a replica when possible.
+    Pages are keyset-paginated: `cursor` is the last session_id of the previous
+    page. Ids grow with created_at, and the (user_id, created_at) index serves the
+    ordering without a sort. Pages past the sessions still in the table continue
+    into the user's archive files (see backend/retention).
+    """
+    query = db.query(InterviewSession).filter(InterviewSession.user_id == current_user.user_id)
+    if cursor is not None:
+        query = query.filter(InterviewSession.session_id < cursor)
+    sessions = (
+        query.order_by(InterviewSession.created_at.desc(), InterviewSession.session_id.desc())
+        .limit(limit + 1)
+        .all()
+    )
+    sessions = retention.history(db, "interview_sessions", current_user.user_id, sessions, cursor, limit)
+    next_cursor = None
+    if len(sessions) > limit:
+        sessions = sessions[:limit]
+        last = sessions[-1]
+        next_cursor = last["session_id"] if isinstance(last, dict) else last.session_id
+    return schema_response(InterviewHistoryResponse, {"sessions": sessions, "next_cursor": next_cursor})
+
+# --- Mock Interview Sessions ---
+# Questions are served from a per-session buffer that is refilled in the background
+# while the user answers (see services/mock_interview.py), so only feedback is waited for.
+
+QUESTIONS_UNAVAILABLE = "Could not generate interview questions right now. Please try again shortly."
+
+@router.post("/mock", response_model=MockInterviewResponse, status_code=status.HTTP_201_CREATED)
+async def start_mock_interview(
+    request: MockInterviewStartRequest,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Starts a mock interview for a role and returns its first question.
+    The following questions are prefetched in the background.
+    """
+    if not request.role.strip():
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Role cannot be empty.")
+    try:
+        interview = await mock_interview.start(current_user.user_id, request.role, request.questions)
+    except mock_interview.QuestionsUnavailable:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=QUESTIONS_UNAVAILABLE)
+    return _mock_state(interview)
+
+@router.get("/mock/{session_id}", response_model=MockInterviewResponse)
+async def get_mock_interview(session_id: str, current_user: User = Depends(get_current_user_read)):
+    """
+    Returns the mock interview's progress and the question to answer now.
+    """
+    try:
+        interview = await mock_interview.get(session_id, current_user.user_id)
+    except mock_interview.MockInterviewNotFound:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Mock interview not found or expired.")
+    except mock_interview.QuestionsUnavailable:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=QUESTIONS_UNAVAILABLE)
+    return _mock_state(interview)
+
+@router.post("/mock/{session_id}/answer", response_model=MockInterviewAnswerResponse)
+async def answer_mock_interview(
+    session_id: str,
+    request: MockInterviewAnswerRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Grades the answer to the current question, saves it like /feedback does, and
+    returns the feedback together with the next question (already prefetched).
+    """
+    if not request.user_answer:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Answer cannot be empty.")
+    try:
+        interview = await mock_interview.get(session_id, current_user.user_id)
+    except mock_interview.MockInterviewNotFound:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Mock interview not found or expired.")
+    except mock_interview.QuestionsUnavailable:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=QUESTIONS_UNAVAILABLE)
+    question = interview.current
+    if question is None:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="This mock interview is already finished.")
+    # Claimed before the slow grading call: a concurrent submit for the same question gets a 409.
+    try:
+        interview = await mock_interview.claim(interview, question)
+    except mock_interview.AnswerInProgress:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT,
+                            detail="An answer to this question has already been submitted.")
+
+    try:
+        evaluation = await asyncio.to_thread(gemini_service.evaluate_interview_answer, question, request.user_answer)
+        new_session = _new_session(current_user.user_id, question, request.user_answer, evaluation)
+        (saved,), _ = await asyncio.to_thread(_save_sessions, db, current_user.user_id, [new_session])
+    except Exception as e:
+        await mock_interview.release(interview, question)
+        print(f"An unexpected error occurred while grading or saving a mock interview answer: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="An internal error occurred while saving your answer."
+        )
+
+    try:
+        interview = await mock_interview.advance(interview, question)
+    except mock_interview.QuestionsUnavailable:
+        # The answer is saved; GET /mock/{session_id} fetches the next question later.
+        interview.answered += 1
+        interview.answering_until = 0.0
+    return schema_response(MockInterviewAnswerResponse, {
+        **_mock_state(interview), "session": saved, "evaluation": evaluation,
+    })
@@ -1,8 +1,13 @@
+import asyncio
 import json
 import os
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel, Field
 from backend.services.vertex_ai_service import vertex_ai_service
+from backend.services.cache import get_cache
+
+# Insights depend only on the job title, so they are shared across users and workers
+insights_cache = get_cache("market_insights", version=1, ttl=int(os.getenv("MARKET_INSIGHTS_CACHE_TTL", str(6 * 3600))))
 
 # --- Pydantic Model for Request Body ---
 class MarketInsightsRequest(BaseModel):
@@ -21,6 +26,11 @@ async def get_market_insights(request: MarketInsightsRequest):
     Provides job market insights for a specific job title using Vertex AI Gemini.
     """
     print(f"Received market insights request for: {request.jobTitle}")
+    cache_key = " ".join(request.jobTitle.lower().split())
+    cached = await asyncio.to_thread(insights_cache.get, cache_key)
+    if cached:
+        return cached
+
     try:
         # Use Vertex AI service for job market analysis
         insights_data = await vertex_ai_service.analyze_job_market(
@@ -32,17 +42,28 @@ async def get_market_insights(request: MarketInsightsRequest):
             raise HTTPException(status_code=500, detail=insights_data["error"])
 
         # Transform the response to match the expected format
+        degraded = bool(insights_data.get("degraded"))
         formatted_response = {
             "averageSalary": insights_data.get("salary_range", "Not available"),
             "demand": insights_data.get("demand_level", "Medium"),
             "topSkills": [
                 {"name": skill, "importance": 80} for skill in insights_data.get("emerging_trends", [])
-            ]
+            ],
+            "degraded": degraded
         }
 
+        # The placeholder served while providers are down is not cached, so real
+        # insights come back as soon as they recover instead of after the TTL.
+        if degraded:
+            print("Market insights unavailable; serving the degraded placeholder.")
+            return formatted_response
+
         print("Market insights generated successfully.")
+        await asyncio.to_thread(insights_cache.set, cache_key, formatted_response)
         return formatted_response
 
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"An error occurred: {e}")
         raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
@@ -1,15 +1,43 @@
-from fastapi import APIRouter
-from pydantic import BaseModel
+import asyncio
+import hashlib
+import os
+from typing import Optional
+
+from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
+from fastapi.security import OAuth2PasswordBearer
+from pydantic import BaseModel, Field, model_validator
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
 import litellm
 
+from backend.database import get_db
+from backend.models import ResumeDocument, User
+from backend.services import model_router, prompts, resume_files, resume_service
+from backend.services.cache import get_cache
+from backend.utils.security import verify_token
+
+# Finished reviews of uploaded resumes, keyed by file hash + review inputs, so a
+# re-upload of the same file skips the model entirely.
+review_cache = get_cache("resume_reviews", version=1, ttl=int(os.getenv("RESUME_REVIEW_CACHE_TTL", str(7 * 24 * 3600))))
+
 # --- Pydantic Models ---
 # Yeh define karta hai ki frontend se resume review ke liye kaisa data aayega
+# resumeText ya resumeId (from /api/resume/upload) mein se ek zaroori hai
 class ResumeRequest(BaseModel):
-    resumeText: str
+    resumeText: str | None = None
+    # The upload's SHA-256, not the row id: only someone who had the file (or was
+    # given its id) can review it, and ids cannot be enumerated.
+    resumeId: str | None = Field(None, pattern="^[0-9a-f]{64}$")
     collegeTier: str | None = "Tier 2/3"
     characterProfileKey: str | None = "Not specified"
     skills: list[str] | None = []
 
+    @model_validator(mode="after")
+    def require_resume(self):
+        if not self.resumeId and not (self.resumeText and self.resumeText.strip()):
+            raise ValueError("Provide either resumeText or resumeId.")
+        return self
+
 # --- Mock Data (For context, same as frontend) ---
 character_profiles = {
     "Explorer": {"name": "The Explorer"},
@@ -26,50 +54,134 @@ router = APIRouter(
     tags=["Resume Review"]
 )
 
-# --- API Endpoint ---
-@router.post("/review")
-async def review_resume(data: ResumeRequest):
+# Upload works without login; a valid token just records who uploaded the file.
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login", auto_error=False)
+
+def _uploader_id(db: Session, token: Optional[str]) -> Optional[int]:
+    if not token:
+        return None
+    try:
+        email = verify_token(token).get("sub")
+    except HTTPException:
+        return None
+    user = db.query(User).filter(User.email == email).first()
+    return user.user_id if user else None
+
+def _find_document(db: Session, content_hash: str) -> Optional[ResumeDocument]:
+    return db.query(ResumeDocument).filter(ResumeDocument.content_hash == content_hash).first()
+
+def _save_document(db: Session, document: ResumeDocument) -> ResumeDocument:
+    try:
+        db.add(document)
+        db.commit()
+        db.refresh(document)
+        return document
+    except IntegrityError:
+        # The same file finished uploading concurrently; use that row.
+        db.rollback()
+        return _find_document(db, document.content_hash)
+
+def _document_response(document: ResumeDocument, duplicate: bool) -> dict:
+    return {
+        "resumeId": document.content_hash,
+        "fileName": document.filename,
+        "fileType": document.file_type,
+        "sizeBytes": document.size_bytes,
+        "pages": document.page_count,
+        "characters": len(document.extracted_text),
+        "duplicate": duplicate,
+        "resumeText": document.extracted_text,
+    }
+
+# --- API Endpoints ---
+@router.post("/upload", status_code=status.HTTP_201_CREATED)
+async def upload_resume(
+    file: UploadFile = File(...),
+    token: Optional[str] = Depends(optional_oauth2_scheme),
+    db: Session = Depends(get_db)
+):
     """
-    User ke resume text ko analyze karke AI-powered feedback deta hai.
+    PDF/DOCX/TXT resume upload karke uska text nikalta hai.
+    The file is streamed to disk in chunks while being hashed, and parsed in a worker
+    process. A file uploaded before (same SHA-256) returns the stored text without
+    re-parsing. Use the returned `resumeId` with /api/resume/review.
     """
     try:
-        system_instruction = """You are an expert career coach and recruiter specializing in helping students from Tier 2/3 colleges land jobs at top companies.
-Your feedback must be constructive, encouraging, and highly actionable.
-Analyze the resume for ATS compatibility, impact metrics, action verbs, and clarity.
-Provide feedback in simple markdown format."""
-
-        prompt = f"""{system_instruction}
-
-Please review the following resume for a student from a {data.collegeTier} college.
-Their self-identified character profile on CareerBridge is "{character_profiles.get(data.characterProfileKey, {}).get('name', 'Not specified')}".
-Their target skills are: {', '.join(data.skills) if data.skills else "Not specified"}.
-
-Resume Text:
----
-{data.resumeText}
----
-
-Provide a review with the following structure:
-### Overall Impression
-(A brief, encouraging summary)
-
-### ATS Compatibility Score: [Give a score out of 10]
-(Briefly explain why, mentioning keywords and formatting)
-
-### Actionable Feedback (Bulleted List)
-- Point 1
-- Point 2
-- Point 3"""
-
-        response = litellm.completion(
-            model=litellm.model,
-            messages=[
-                {"role": "system", "content": system_instruction},
-                {"role": "user", "content": prompt}
-            ]
+        tmp_path, content_hash, size, kind = await resume_files.save_upload(file)
+    except resume_files.UploadRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    finally:
+        await file.close()
+
+    existing = await asyncio.to_thread(_find_document, db, content_hash)
+    if existing is not None:
+        tmp_path.unlink(missing_ok=True)
+        return _document_response(existing, duplicate=True)
+
+    stored_path = await asyncio.to_thread(resume_files.commit_upload, tmp_path, content_hash, kind)
+    try:
+        text, pages = await resume_files.extract_text_async(stored_path, kind)
+    except Exception as e:
+        print(f"Resume text extraction failed for {file.filename}: {e!r}")
+        stored_path.unlink(missing_ok=True)
+        raise HTTPException(status_code=422,
+                            detail="Could not read text from this file.")
+    if not text:
+        stored_path.unlink(missing_ok=True)
+        raise HTTPException(status_code=422,
+                            detail="No text found in this file. Scanned resumes are not supported.")
+
+    document = ResumeDocument(
+        content_hash=content_hash,
+        filename=(file.filename or "")[:255] or None,
+        file_type=kind,
+        size_bytes=size,
+        page_count=pages,
+        storage_path=str(stored_path),
+        extracted_text=text,
+        uploaded_by=await asyncio.to_thread(_uploader_id, db, token),
+    )
+    saved = await asyncio.to_thread(_save_document, db, document)
+    return _document_response(saved, duplicate=saved.resume_id != document.resume_id)
+
+@router.post("/review")
+async def review_resume(data: ResumeRequest, db: Session = Depends(get_db)):
+    """
+    User ke resume text (ya uploaded resumeId) ko analyze karke AI-powered feedback deta hai.
+    """
+    document = None
+    if data.resumeId:
+        document = await asyncio.to_thread(_find_document, db, data.resumeId)
+        if document is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Resume not found.")
+
+    character_profile = character_profiles.get(data.characterProfileKey, {}).get('name', 'Not specified')
+
+    async def generate():
+        # Long resumes are reviewed section by section (see resume_service)
+        feedback = await resume_service.review_resume(
+            resume_text=document.extracted_text if document else data.resumeText,
+            college_tier=data.collegeTier,
+            character_profile=character_profile,
+            skills=data.skills,
+            provider="litellm",
+            default_model=litellm.model,
         )
+        # None keeps empty responses out of the review cache
+        return feedback if feedback and feedback.strip() else None
 
-        feedback = response.choices[0].message.content
+    try:
+        if document is not None:
+            # Routing sends pro users and free users to different models, so the model is part of the key
+            model = model_router.cache_tag("litellm", prompts.estimate_tokens(document.extracted_text),
+                                           "resume_review") or litellm.model or ""
+            key = hashlib.sha256("\x1f".join([
+                document.content_hash, model, data.collegeTier or "", character_profile,
+                ",".join(data.skills or []),
+            ]).encode("utf-8")).hexdigest()
+            feedback = await review_cache.aget_or_set(key, generate)
+        else:
+            feedback = await generate()
 
         if feedback and feedback.strip():
             return {"feedback": feedback}
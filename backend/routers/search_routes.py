@@ -0,0 +1,49 @@
+from typing import List, Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from backend.database import get_read_db
+from backend.schemas import CandidateResult, CandidateSearchResponse
+from backend.services.search import SearchFilters, search_candidates
+from backend.utils.security import require_admin
+
+# Recruiter-side search over student profiles. There is no recruiter role yet,
+# so it is limited to operators (X-Admin-Token) like the other reporting tools.
+router = APIRouter(
+    prefix="/api/search",
+    tags=["Search"],
+    dependencies=[Depends(require_admin)]
+)
+
+MAX_SEARCH_OFFSET = 1000
+
+# --- API Endpoints ---
+@router.get("/candidates", response_model=CandidateSearchResponse)
+def search_for_candidates(
+    q: str = Query(..., min_length=1, max_length=200),
+    skill: List[str] = Query(default=[]),
+    college: Optional[str] = None,
+    branch: Optional[str] = None,
+    year_of_study: Optional[str] = None,
+    source: Optional[Literal["project", "experience", "resume"]] = None,
+    limit: int = Query(20, ge=1, le=50),
+    offset: int = Query(0, ge=0, le=MAX_SEARCH_OFFSET),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Full-text search over students' projects, experience and resumes, ranked by
+    relevance (BM25 on SQLite). Every term must match, inflections included
+    ("caching" finds "cached"). `skill` may be repeated, and all listed skills
+    are required.
+    """
+    filters = SearchFilters(skills=skill, college=college, branch=branch,
+                            year_of_study=year_of_study, source=source)
+    try:
+        hits, has_more = search_candidates(db, q, filters, limit=limit, offset=offset)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return CandidateSearchResponse(
+        candidates=[CandidateResult(**{k: v for k, v in vars(hit).items() if k != "doc_id"}) for hit in hits],
+        next_offset=offset + limit if has_more and offset + limit <= MAX_SEARCH_OFFSET else None,
+    )
@@ -1,12 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
 
-from ..database import get_db
+from ..database import SessionLocal, get_db, get_read_db
 from ..models import User
 from ..schemas import UserSchema
 
 from ..utils.security import verify_token
+from ..utils.serialization import schema_response
 
 # --- Router Setup ---
 router = APIRouter(
@@ -18,7 +19,7 @@ router = APIRouter(
 # This scheme will look for an "Authorization: Bearer <token>" header in requests.
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
+def get_current_user(request: Request, token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
     """
     Dependency to get the current authenticated user.
     It verifies the JWT token and fetches the user from the database.
@@ -31,7 +32,8 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
     )
     
     # Verify the token to get the user's email
-    email = verify_token(token, credentials_exception)
+    payload = verify_token(token, request.scope)
+    email = payload.get("sub")
     
     # Fetch the user from the database
     user = db.query(User).filter(User.email == email).first()
@@ -42,17 +44,51 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
     return user
 
 
+def get_current_user_read(request: Request, token: str = Depends(oauth2_scheme), db: Session = Depends(get_read_db)):
+    """
+    Like `get_current_user`, but loads the user through a read replica when one is
+    healthy. Use it for endpoints that only read. A user missing on the replica
+    (e.g. just registered and not yet replicated) is loaded from the primary.
+    """
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+    payload = verify_token(token, request.scope)
+    email = payload.get("sub")
+
+    user = db.query(User).filter(User.email == email).first()
+    if user is not None or not db.info.get("replica"):
+        if user is None:
+            raise credentials_exception
+        yield user
+        return
+
+    # Replica miss: fall back to the primary, keeping its session open for lazy loads.
+    primary = SessionLocal()
+    try:
+        user = primary.query(User).filter(User.email == email).first()
+        if user is None:
+            raise credentials_exception
+        yield user
+    finally:
+        primary.close()
+
+
 # --- API Endpoints ---
 
 @router.get("/me", response_model=UserSchema)
-def read_users_me(current_user: User = Depends(get_current_user)):
+def read_users_me(current_user: User = Depends(get_current_user_read)):
     """
     Get profile information for the currently logged-in user.
     
-    The `Depends(get_current_user)` part ensures that this endpoint is protected.
-    Only requests with a valid JWT token will be able to access it.
-    FastAPI automatically handles serializing the returned `current_user` object
-    using the `UserSchema`, so the password hash is not exposed.
+    The `Depends(get_current_user_read)` part ensures that this endpoint is protected.
+    Only requests with a valid JWT token will be able to access it. The user is
+    read from a replica when one is healthy and this user has not written recently.
+    The `current_user` object is serialized once through the precomputed
+    `UserSchema` serializer, so the password hash is not exposed.
     """
-    return current_user
+    return schema_response(UserSchema, current_user)
 
@@ -122,6 +122,10 @@ class UserSchema(BaseModel):
 class Token(BaseModel):
     access_token: str
     token_type: str
+    refresh_token: Optional[str] = None
+
+class RefreshTokenRequest(BaseModel):
+    refresh_token: str = Field(..., min_length=20)
 
 # --- AI Feature Schemas ---
 
@@ -135,6 +139,149 @@ class InterviewFeedbackRequest(BaseModel):
     question: str
     user_answer: str
 
+class InterviewEvaluation(BaseModel):
+    # Structured interview grading, requested from the model in one call
+    score: float = Field(..., ge=0, le=10)
+    strengths: List[str] = Field(default_factory=list, max_length=5)
+    improvements: List[str] = Field(default_factory=list, max_length=5)
+    feedback: str = Field(..., min_length=1)
+    # "model", or "heuristic" when the local fallback scorer was used
+    scored_by: str = "model"
+
 class InterviewFeedbackResponse(BaseModel):
     session: InterviewSessionSchema
+    evaluation: Optional[InterviewEvaluation] = None
+
+
+class InterviewBatchRequest(BaseModel):
+    # Every answered question of one mock interview
+    answers: List[InterviewFeedbackRequest] = Field(..., min_length=1, max_length=20)
+
+class InterviewBatchResponse(BaseModel):
+    sessions: List[InterviewSessionSchema]
+    evaluations: List[InterviewEvaluation]
+    evaluated: int
+    average_score: float
+    # The user's updated CareerScore.interview_success (0-100)
+    interview_success: Optional[Decimal] = None
+
+class InterviewHistoryResponse(BaseModel):
+    sessions: List[InterviewSessionSchema]
+    # Pass back as `cursor` to fetch the next (older) page; None on the last page.
+    next_cursor: Optional[int] = None
+
+class MockInterviewStartRequest(BaseModel):
+    role: str = Field(..., min_length=1, max_length=100)
+    questions: int = Field(8, ge=1, le=20)
+
+class MockInterviewAnswerRequest(BaseModel):
+    user_answer: str
+
+class MockInterviewResponse(BaseModel):
+    session_id: str
+    role: str
+    total: int
+    answered: int
+    # The question to answer now (1-based number); None once the interview is finished.
+    question: Optional[str] = None
+    question_number: Optional[int] = None
+    finished: bool = False
+
+class MockInterviewAnswerResponse(MockInterviewResponse):
+    # The graded answer; `question` above is already the next one.
+    session: InterviewSessionSchema
+    evaluation: InterviewEvaluation
+
+# --- Chat Schemas ---
+
+class ChatRequest(BaseModel):
+    message: str = Field(..., min_length=1, max_length=4000)
+    # Omit to start a new conversation
+    conversation_id: Optional[int] = None
+    # False returns one JSON ChatResponse instead of a server-sent event stream
+    stream: bool = True
+
+class ChatResponse(BaseModel):
+    conversation_id: int
+    message_id: int
+    reply: str
 
+class ChatMessageSchema(BaseModel):
+    message_id: int
+    role: str
+    content: str
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class ConversationSchema(BaseModel):
+    conversation_id: int
+    title: Optional[str] = None
+    summary: Optional[str] = None
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class ConversationDetail(ConversationSchema):
+    messages: List[ChatMessageSchema] = []
+
+# --- Cohort Standing Schemas ---
+
+class CohortStanding(BaseModel):
+    # "batch" (college + branch + year), "college" or "overall"
+    scope: str
+    college: Optional[str] = None
+    branch: Optional[str] = None
+    year_of_study: Optional[str] = None
+    rank: int
+    total: int
+    percentile: float
+    top_10_percent_score: int
+
+class StandingResponse(BaseModel):
+    career_score: int
+    cohorts: List[CohortStanding]
+
+# --- Candidate Search Schemas ---
+
+class CandidateResult(BaseModel):
+    user_id: int
+    full_name: Optional[str] = None
+    college: Optional[str] = None
+    branch: Optional[str] = None
+    year_of_study: Optional[str] = None
+    # Relevance of the best-matching document (higher is better)
+    score: float
+    # How many of the candidate's documents matched
+    matches: int
+    # The best-matching project, experience entry or resume
+    source: Optional[str] = None
+    source_id: Optional[int] = None
+    title: Optional[str] = None
+    # Matching excerpt with the query terms wrapped in **
+    snippet: Optional[str] = None
+
+class CandidateSearchResponse(BaseModel):
+    candidates: List[CandidateResult]
+    # Pass back as `offset` for the next page; None on the last page.
+    next_offset: Optional[int] = None
+
+# --- Role Match Schemas ---
+
+class RoleMatchSchema(BaseModel):
+    rank: int
+    trend_id: int
+    role: Optional[str] = None
+    avg_salary_range: Optional[str] = None
+    demand_score: Optional[int] = None
+    # Share of the role's (rarity-weighted) skills the student has, 0..1.
+    score: float
+    matched_skills: int
+
+class RoleMatchesResponse(BaseModel):
+    matches: List[RoleMatchSchema]
+    # When the nightly matching run scored this student; None if it has not yet.
+    computed_at: Optional[datetime] = None
@@ -0,0 +1,417 @@
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Optional, Tuple
+
+import orjson
+
+# --- Shared Cache ---
+# Caches have to be shared across uvicorn workers to be useful, so every cache
+# is a small in-process LRU in front of a shared tier:
+#   - sqlite:///path/to/file.db  a SQLite file all local workers open (default)
+#   - redis://host:port/0        Redis, for production deployments
+#   - memory://                  in-process only (single worker / tests)
+#
+# Keys are namespaced and versioned ("careerup:roadmaps:v1:<key>"), so bumping a
+# cache's version invalidates it without a flush. Mutable state that several
+# workers update (mock interview sessions) skips the local tier (local=False)
+# and changes through Cache.update, an atomic compare-and-set on the shared tier. Values are encoded with
+# msgpack when it is installed and CACHE_CODEC=msgpack, otherwise orjson.
+CACHE_URL = os.getenv("CACHE_URL", "sqlite:///./.cache/careerup-cache.db")
+CACHE_PREFIX = os.getenv("CACHE_PREFIX", "careerup")
+CACHE_CODEC = os.getenv("CACHE_CODEC", "orjson").lower()
+# Seconds a value may live in a worker's local tier before it is re-read from the shared tier.
+CACHE_LOCAL_TTL = float(os.getenv("CACHE_LOCAL_TTL", "30"))
+CACHE_LOCAL_MAX_ENTRIES = int(os.getenv("CACHE_LOCAL_MAX_ENTRIES", "4096"))
+
+
+# --- Value Encoding ---
+# The first byte tags the codec, so workers with different settings can share a store.
+
+try:
+    import msgpack
+except ImportError:  # msgpack is optional
+    msgpack = None
+
+
+def encode(value: Any) -> bytes:
+    if CACHE_CODEC == "msgpack" and msgpack is not None:
+        return b"m" + msgpack.packb(value, use_bin_type=True)
+    return b"j" + orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+
+
+def decode(data: bytes) -> Any:
+    tag, body = data[:1], data[1:]
+    if tag == b"m":
+        if msgpack is None:
+            raise ValueError("msgpack-encoded cache value but msgpack is not installed")
+        return msgpack.unpackb(body, raw=False)
+    return orjson.loads(body)
+
+
+# --- Backends ---
+# Backends store raw bytes with an optional TTL (seconds).
+
+class CacheBackend:
+    def get(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None):
+        raise NotImplementedError
+
+    def delete(self, key: str):
+        raise NotImplementedError
+
+    def get_with_ttl(self, key: str) -> Tuple[Optional[bytes], Optional[float]]:
+        """Returns the value and its remaining TTL (None = no expiry)."""
+        return self.get(key), None
+
+    def compare_and_set(self, key: str, expected: Optional[bytes], value: bytes,
+                        ttl: Optional[float] = None) -> bool:
+        """
+        Stores `value` only if the current value is still `expected` (None: no
+        live value), as one atomic step. Returns whether it was stored.
+        """
+        raise NotImplementedError
+
+
+class LRUBackend(CacheBackend):
+    """Bounded in-process LRU with per-entry expiry."""
+
+    def __init__(self, max_entries: int = CACHE_LOCAL_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, Tuple[bytes, Optional[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_with_ttl(self, key: str):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None, None
+            value, expires_at = entry
+            now = time.monotonic()
+            if expires_at is not None and expires_at <= now:
+                del self._data[key]
+                return None, None
+            self._data.move_to_end(key)
+            return value, (expires_at - now if expires_at is not None else None)
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.get_with_ttl(key)[0]
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None):
+        with self._lock:
+            self._store(key, value, ttl)
+
+    def _store(self, key: str, value: bytes, ttl: Optional[float]):
+        self._data[key] = (value, time.monotonic() + ttl if ttl else None)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+    def compare_and_set(self, key, expected, value, ttl=None):
+        with self._lock:
+            entry = self._data.get(key)
+            current = entry[0] if entry and (entry[1] is None or entry[1] > time.monotonic()) else None
+            if current != expected:
+                return False
+            self._store(key, value, ttl)
+            return True
+
+    def delete(self, key: str):
+        with self._lock:
+            self._data.pop(key, None)
+
+
+class SQLiteBackend(CacheBackend):
+    """
+    Shared cache in a SQLite file, usable by every worker on the host.
+
+    WAL mode lets readers proceed while one worker writes. Each thread keeps its
+    own connection. Expired rows are skipped on read and purged periodically.
+    """
+
+    PURGE_EVERY = 500  # writes between expired-row purges
+
+    def __init__(self, path: str):
+        self.path = path
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._writes = 0
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache_entries ("
+            " key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_cache_entries_expires_at ON cache_entries (expires_at)")
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get_with_ttl(self, key: str):
+        row = self._conn().execute(
+            "SELECT value, expires_at FROM cache_entries WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None, None
+        value, expires_at = row
+        now = time.time()
+        if expires_at is not None and expires_at <= now:
+            return None, None
+        return bytes(value), (expires_at - now if expires_at is not None else None)
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.get_with_ttl(key)[0]
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None):
+        expires_at = time.time() + ttl if ttl else None
+        conn = self._conn()
+        conn.execute(
+            "INSERT INTO cache_entries (key, value, expires_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at",
+            (key, value, expires_at),
+        )
+        self._writes += 1
+        if self._writes % self.PURGE_EVERY == 0:
+            conn.execute("DELETE FROM cache_entries WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),))
+
+    def compare_and_set(self, key, expected, value, ttl=None):
+        now = time.time()
+        expires_at = now + ttl if ttl else None
+        if expected is None:
+            # Inserts, or takes over an expired row.
+            return self._conn().execute(
+                "INSERT INTO cache_entries (key, value, expires_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at "
+                "WHERE cache_entries.expires_at IS NOT NULL AND cache_entries.expires_at <= ?",
+                (key, value, expires_at, now),
+            ).rowcount == 1
+        return self._conn().execute(
+            "UPDATE cache_entries SET value = ?, expires_at = ? "
+            "WHERE key = ? AND value = ? AND (expires_at IS NULL OR expires_at > ?)",
+            (value, expires_at, key, expected, now),
+        ).rowcount == 1
+
+    def delete(self, key: str):
+        self._conn().execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+
+
+class RedisBackend(CacheBackend):
+    """Shared cache on any Redis-protocol server (Redis, Valkey, KeyDB, ...)."""
+
+    # KEYS[1]; ARGV: expected exists ("0"/"1"), expected value, new value, TTL in ms (0: none).
+    _COMPARE_AND_SET = """
+        local current = redis.call('GET', KEYS[1])
+        if ARGV[1] == '1' then
+            if current ~= ARGV[2] then return 0 end
+        elseif current then
+            return 0
+        end
+        if tonumber(ARGV[4]) > 0 then
+            redis.call('SET', KEYS[1], ARGV[3], 'PX', ARGV[4])
+        else
+            redis.call('SET', KEYS[1], ARGV[3])
+        end
+        return 1
+    """
+
+    def __init__(self, url: str):
+        import redis  # optional dependency, only needed when CACHE_URL is redis://
+        self._client = redis.Redis.from_url(url)
+        self._compare_and_set = self._client.register_script(self._COMPARE_AND_SET)
+
+    def get_with_ttl(self, key: str):
+        pipe = self._client.pipeline()
+        pipe.get(key)
+        pipe.pttl(key)
+        value, pttl = pipe.execute()
+        if value is None:
+            return None, None
+        return value, (pttl / 1000.0 if pttl and pttl > 0 else None)
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._client.get(key)
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None):
+        if ttl:
+            self._client.set(key, value, px=int(ttl * 1000))
+        else:
+            self._client.set(key, value)
+
+    def compare_and_set(self, key, expected, value, ttl=None):
+        args = ["0" if expected is None else "1", expected or b"", value, int(ttl * 1000) if ttl else 0]
+        return self._compare_and_set(keys=[key], args=args) == 1
+
+    def delete(self, key: str):
+        self._client.delete(key)
+
+
+class TieredBackend(CacheBackend):
+    """A local LRU in front of a shared backend."""
+
+    def __init__(self, local: LRUBackend, shared: CacheBackend, local_ttl: float = CACHE_LOCAL_TTL):
+        self.local, self.shared, self.local_ttl = local, shared, local_ttl
+
+    def _local_ttl(self, remaining: Optional[float]) -> float:
+        return min(self.local_ttl, remaining) if remaining is not None else self.local_ttl
+
+    def get_with_ttl(self, key: str):
+        value, remaining = self.local.get_with_ttl(key)
+        if value is not None:
+            return value, remaining
+        value, remaining = self.shared.get_with_ttl(key)
+        if value is not None:
+            self.local.set(key, value, self._local_ttl(remaining))
+        return value, remaining
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.get_with_ttl(key)[0]
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None):
+        self.shared.set(key, value, ttl)
+        self.local.set(key, value, self._local_ttl(ttl))
+
+    def compare_and_set(self, key, expected, value, ttl=None):
+        # Decided by the shared tier alone: the local copy may be stale.
+        stored = self.shared.compare_and_set(key, expected, value, ttl)
+        if stored:
+            self.local.set(key, value, self._local_ttl(ttl))
+        else:
+            self.local.delete(key)
+        return stored
+
+    def delete(self, key: str):
+        self.shared.delete(key)
+        self.local.delete(key)
+
+
+def backend_from_url(url: str) -> CacheBackend:
+    """Builds the backend for CACHE_URL, wrapped with a local LRU tier."""
+    if url.startswith("memory://"):
+        return LRUBackend()
+    if url.startswith("sqlite:///"):
+        shared = SQLiteBackend(url[len("sqlite:///"):])
+    elif url.startswith(("redis://", "rediss://", "unix://")):
+        shared = RedisBackend(url)
+    else:
+        raise ValueError(f"Unsupported CACHE_URL: {url}")
+    return TieredBackend(LRUBackend(), shared)
+
+
+# --- Namespaced Cache ---
+
+class Cache:
+    """
+    A versioned key namespace on top of a backend.
+
+    Example:
+        roadmaps = get_cache("roadmaps", version=1, ttl=86400)
+        text = roadmaps.get_or_set(job_title.lower(), lambda: generate(job_title))
+
+    With local=False every read goes to the shared tier, so workers never act
+    on each other's stale copies.
+    """
+
+    def __init__(self, namespace: str, backend: Optional[CacheBackend] = None, version: int = 1,
+                 ttl: Optional[float] = None, local: bool = True):
+        self.namespace, self.version, self.ttl, self.local = namespace, version, ttl, local
+        self._backend = backend
+        self._prefix = f"{CACHE_PREFIX}:{namespace}:v{version}:"
+
+    @property
+    def backend(self) -> CacheBackend:
+        # Resolved lazily so module-level caches follow set_backend().
+        backend = self._backend or get_backend()
+        if not self.local and isinstance(backend, TieredBackend):
+            return backend.shared
+        return backend
+
+    def key(self, key: str) -> str:
+        return self._prefix + key
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            data = self.backend.get(self.key(key))
+        except Exception as e:
+            # A broken cache must never break the request.
+            print(f"Cache read failed for {self.namespace}: {e}")
+            return default
+        return default if data is None else decode(data)
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        try:
+            self.backend.set(self.key(key), encode(value), ttl if ttl is not None else self.ttl)
+        except Exception as e:
+            print(f"Cache write failed for {self.namespace}: {e}")
+
+    def delete(self, key: str):
+        try:
+            self.backend.delete(self.key(key))
+        except Exception as e:
+            print(f"Cache delete failed for {self.namespace}: {e}")
+
+    def get_or_set(self, key: str, factory: Callable[[], Any], ttl: Optional[float] = None) -> Any:
+        value = self.get(key)
+        if value is None:
+            value = factory()
+            if value is not None:
+                self.set(key, value, ttl)
+        return value
+
+    def update(self, key: str, change: Callable[[Any], Any], ttl: Optional[float] = None) -> Any:
+        """
+        Atomically replaces the value with change(current value or None) and
+        returns the new value. `change` is called again if another writer got
+        in first, so it must not have side effects; exceptions it raises abort
+        the update. Unlike get/set, backend errors are raised.
+        """
+        key = self.key(key)
+        ttl = ttl if ttl is not None else self.ttl
+        while True:
+            data = self.backend.get(key)
+            value = change(None if data is None else decode(data))
+            if self.backend.compare_and_set(key, data, encode(value), ttl):
+                return value
+
+    async def aget_or_set(self, key: str, factory: Callable[[], Awaitable[Any]],
+                          ttl: Optional[float] = None) -> Any:
+        value = await asyncio.to_thread(self.get, key)
+        if value is None:
+            value = await factory()
+            if value is not None:
+                await asyncio.to_thread(self.set, key, value, ttl)
+        return value
+
+
+_backend: Optional[CacheBackend] = None
+_backend_lock = threading.Lock()
+
+
+def get_backend() -> CacheBackend:
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = backend_from_url(CACHE_URL)
+    return _backend
+
+
+def set_backend(backend: CacheBackend):
+    """Replaces the process-wide backend (e.g. with LRUBackend() in tests or benchmarks)."""
+    global _backend
+    _backend = backend
+
+
+def get_cache(namespace: str, version: int = 1, ttl: Optional[float] = None, local: bool = True) -> Cache:
+    """Returns a cache for `namespace` on the process-wide backend."""
+    return Cache(namespace, version=version, ttl=ttl, local=local)
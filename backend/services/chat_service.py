@@ -0,0 +1,270 @@
+import asyncio
+import os
+import threading
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, List, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from ..database import SessionLocal
+from ..models import ChatMessage, Conversation, User
+from . import model_router, prompts
+from .gemini_service import CHAT_MODEL
+
+# --- Chat Context Management ---
+# Conversations are stored server side; the model never sees the full history.
+# Every turn is sent as:
+#
+#   [system: CHAT_SYSTEM + student profile]   stable -> provider prefix cache hit
+#   [system: rolling summary]                 changes only when a summary rolls
+#   [recent messages, verbatim]               bounded by CHAT_HISTORY_TOKEN_BUDGET
+#   [new user message]
+#
+# When the unsummarized history grows past CHAT_HISTORY_TOKEN_BUDGET, everything
+# except the newest CHAT_KEEP_RECENT_TOKENS is folded into the summary (after the
+# reply has been sent), so the prompt size, and with it per-turn latency and
+# cost, stays flat however long the conversation gets.
+CHAT_HISTORY_TOKEN_BUDGET = int(os.getenv("CHAT_HISTORY_TOKEN_BUDGET", "2000"))
+CHAT_KEEP_RECENT_TOKENS = int(os.getenv("CHAT_KEEP_RECENT_TOKENS", "600"))
+CHAT_MAX_MESSAGE_TOKENS = int(os.getenv("CHAT_MAX_MESSAGE_TOKENS", "1000"))
+CHAT_PROFILE_MAX_TOKENS = int(os.getenv("CHAT_PROFILE_MAX_TOKENS", "400"))
+CHAT_MAX_OUTPUT_TOKENS = int(os.getenv("CHAT_MAX_OUTPUT_TOKENS", "800"))
+CHAT_TITLE_CHARS = 80
+
+
+class ConversationNotFound(LookupError):
+    """The conversation does not exist or belongs to another user."""
+
+
+@dataclass
+class ChatTurn:
+    conversation_id: int
+    messages: List[Dict[str, str]]
+    input_tokens: int
+
+
+# --- Prompt Assembly ---
+
+def profile_block(user: User) -> str:
+    """
+    The student's profile as plain text, built deterministically (sorted, no
+    timestamps) so the prompt prefix is byte-identical from turn to turn.
+    """
+    lines = [f"Name: {user.full_name or 'Student'}"]
+    student = user.student
+    if student is not None:
+        study = ", ".join(v for v in (student.degree, student.branch, student.college) if v)
+        if study:
+            lines.append(f"Studying: {study}" + (f" (year {student.year_of_study})" if student.year_of_study else ""))
+        if student.job_type:
+            lines.append(f"Looking for: {student.job_type}")
+    if user.skills:
+        skills = sorted(f"{s.skill_name} ({s.proficiency})" for s in user.skills)
+        lines.append("Skills: " + ", ".join(skills))
+    if user.education:
+        lines.append("Education: " + "; ".join(
+            sorted(f"{e.degree}, {e.university}" for e in user.education)
+        ))
+    if user.experience:
+        lines.append("Experience: " + "; ".join(
+            sorted(f"{e.role} at {e.company}" for e in user.experience)
+        ))
+    if user.projects:
+        lines.append("Projects: " + "; ".join(sorted(p.title for p in user.projects)))
+    return prompts.truncate_to_tokens("\n".join(lines), CHAT_PROFILE_MAX_TOKENS)
+
+
+def system_prefix(user: User) -> str:
+    return f"{prompts.CHAT_SYSTEM}\n\nStudent profile:\n{profile_block(user)}"
+
+
+def _fit_history(history: List[ChatMessage], budget: int) -> List[ChatMessage]:
+    """Newest messages whose token counts fit in `budget` (a backstop if summarizing lags)."""
+    kept, used = [], 0
+    for message in reversed(history):
+        used += message.token_count
+        if kept and used > budget:
+            break
+        kept.append(message)
+    kept.reverse()
+    return kept
+
+
+def unsummarized_messages(db: Session, conversation: Conversation) -> List[ChatMessage]:
+    query = db.query(ChatMessage).filter(ChatMessage.conversation_id == conversation.conversation_id)
+    if conversation.summarized_through is not None:
+        query = query.filter(ChatMessage.message_id > conversation.summarized_through)
+    return query.order_by(ChatMessage.message_id).all()
+
+
+def build_messages(prefix: str, summary: Optional[str], history: List[ChatMessage],
+                   message: str) -> List[Dict[str, str]]:
+    messages = [{"role": "system", "content": prefix}]
+    if summary:
+        messages.append({"role": "system", "content": f"Summary of the earlier conversation:\n{summary}"})
+    for item in _fit_history(history, CHAT_HISTORY_TOKEN_BUDGET * 2):
+        messages.append({
+            "role": item.role,
+            "content": prompts.truncate_to_tokens(item.content, CHAT_MAX_MESSAGE_TOKENS),
+        })
+    messages.append({"role": "user", "content": message})
+    return messages
+
+
+# --- Conversation Storage ---
+
+def get_conversation(db: Session, user_id: int, conversation_id: int) -> Conversation:
+    conversation = db.query(Conversation).filter(
+        Conversation.conversation_id == conversation_id, Conversation.user_id == user_id
+    ).first()
+    if conversation is None:
+        raise ConversationNotFound(conversation_id)
+    return conversation
+
+
+def start_turn(db: Session, user: User, message: str, conversation_id: Optional[int] = None) -> ChatTurn:
+    """
+    Stores the user's message and returns the prompt for the model's reply.
+
+    Raises ConversationNotFound when `conversation_id` is not one of the user's.
+    """
+    if conversation_id is None:
+        conversation = Conversation(user_id=user.user_id, title=" ".join(message.split())[:CHAT_TITLE_CHARS])
+        db.add(conversation)
+        db.flush()
+        history = []
+    else:
+        conversation = get_conversation(db, user.user_id, conversation_id)
+        history = unsummarized_messages(db, conversation)
+
+    message = prompts.truncate_to_tokens(prompts.normalize_whitespace(message), CHAT_MAX_MESSAGE_TOKENS)
+    messages = build_messages(system_prefix(user), conversation.summary, history, message)
+    db.add(ChatMessage(
+        conversation_id=conversation.conversation_id, role="user",
+        content=message, token_count=prompts.estimate_tokens(message),
+    ))
+    db.commit()
+    input_tokens = sum(prompts.estimate_tokens(m["content"]) for m in messages)
+    return ChatTurn(conversation.conversation_id, messages, input_tokens)
+
+
+def save_reply(conversation_id: int, reply: str) -> int:
+    """Stores the assistant's reply in its own session (the request's may be closed while streaming)."""
+    db = SessionLocal()
+    try:
+        message = ChatMessage(
+            conversation_id=conversation_id, role="assistant",
+            content=reply, token_count=prompts.estimate_tokens(reply),
+        )
+        db.add(message)
+        conversation = db.get(Conversation, conversation_id)
+        if conversation is not None:
+            conversation.updated_at = func.now()
+        db.commit()
+        return message.message_id
+    finally:
+        db.close()
+
+
+# --- Model Calls ---
+
+def _config() -> dict:
+    return {"max_tokens": CHAT_MAX_OUTPUT_TOKENS}
+
+
+async def reply(turn: ChatTurn) -> str:
+    return await model_router.acomplete("litellm", "chat", turn.messages, tokens=turn.input_tokens,
+                                        default_model=CHAT_MODEL, **_config())
+
+
+async def stream_reply(turn: ChatTurn) -> AsyncIterator[str]:
+    async for chunk in model_router.astream("litellm", "chat", turn.messages, tokens=turn.input_tokens,
+                                            default_model=CHAT_MODEL, **_config()):
+        yield chunk
+
+
+# --- Rolling Summarization ---
+
+_summarizing = set()
+_summarizing_lock = threading.Lock()
+
+
+def _split_for_summary(history: List[ChatMessage]):
+    """(older messages to fold into the summary, newest messages to keep verbatim)."""
+    keep, used = len(history), 0
+    while keep > 0 and used + history[keep - 1].token_count <= CHAT_KEEP_RECENT_TOKENS:
+        keep -= 1
+        used += history[keep].token_count
+    # Always keep the latest exchange verbatim.
+    keep = min(keep, max(len(history) - 2, 0))
+    return history[:keep], history[keep:]
+
+
+async def summarize_if_needed(conversation_id: int) -> bool:
+    """
+    Folds older messages into the conversation's rolling summary once the
+    unsummarized history exceeds CHAT_HISTORY_TOKEN_BUDGET. Returns True if it rolled.
+    """
+    with _summarizing_lock:
+        if conversation_id in _summarizing:
+            return False
+        _summarizing.add(conversation_id)
+    try:
+        return await _summarize(conversation_id)
+    except Exception as e:
+        # The next turn retries; until then the history backstop bounds the prompt.
+        print(f"Error summarizing conversation {conversation_id}: {e}")
+        return False
+    finally:
+        with _summarizing_lock:
+            _summarizing.discard(conversation_id)
+
+
+def _pending_summary(conversation_id: int):
+    db = SessionLocal()
+    try:
+        conversation = db.get(Conversation, conversation_id)
+        if conversation is None:
+            return None
+        history = unsummarized_messages(db, conversation)
+        if sum(m.token_count for m in history) <= CHAT_HISTORY_TOKEN_BUDGET:
+            return None
+        older, _ = _split_for_summary(history)
+        if not older:
+            return None
+        transcript = "\n".join(f"{m.role.capitalize()}: {m.content}" for m in older)
+        return conversation.summarized_through, conversation.summary or "(none)", transcript, older[-1].message_id
+    finally:
+        db.close()
+
+
+def _store_summary(conversation_id: int, expected_through: Optional[int], summary: str, through: int) -> bool:
+    db = SessionLocal()
+    try:
+        conversation = db.get(Conversation, conversation_id)
+        # Another worker rolled the summary meanwhile; keep theirs.
+        if conversation is None or conversation.summarized_through != expected_through:
+            return False
+        conversation.summary = summary
+        conversation.summarized_through = through
+        db.commit()
+        return True
+    finally:
+        db.close()
+
+
+async def _summarize(conversation_id: int) -> bool:
+    pending = await asyncio.to_thread(_pending_summary, conversation_id)
+    if pending is None:
+        return False
+    expected_through, previous, transcript, through = pending
+    rendered = prompts.render("chat_summary", summary=previous, transcript=transcript)
+    summary = await model_router.acomplete(
+        "litellm", "chat_summary", rendered.messages, tokens=rendered.input_tokens,
+        default_model=CHAT_MODEL, max_tokens=rendered.max_tokens
+    )
+    summary = summary.strip()
+    if not summary:
+        return False
+    return await asyncio.to_thread(_store_summary, conversation_id, expected_through, summary, through)
@@ -1,11 +1,15 @@
+import asyncio
 import os
+from typing import List, Tuple
+
 import litellm
 import google.generativeai as genai
 from dotenv import load_dotenv
-from langchain_litellm import ChatLiteLLM
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.output_parsers import JsonOutputParser
 from .vertex_ai_service import vertex_ai_service
+from .llm_provider import ProviderUnavailableError
+from .cache import get_cache
+from . import interview_scoring, model_router, prompts
+from ..schemas import InterviewEvaluation
 
 # Load environment variables from .env file
 load_dotenv()
@@ -24,17 +28,64 @@ os.environ["GEMINI_API_KEY"] = os.getenv("GEMINI_API_KEY", "")
 # Fallback models if needed
 litellm.fallbacks = [
     {"openai/gpt-4o": ["openai/gpt-4o-mini"]},
-    {"gemini/gemini-1.5-flash": ["openai/gpt-4o"]}
+    {"openai/gpt-4o-mini": ["gemini/gemini-1.5-flash"]},
+    {"gemini/gemini-1.5-flash": ["openai/gpt-4o"]},
+    {"gemini/gemini-pro": ["openai/gpt-4o-mini"]},
 ]
 
-# LangChain setup
-llm = ChatLiteLLM(model="gemini/gemini-pro")
+# Model used for the registered chat prompts below (called through litellm) when
+# model routing is off; otherwise model_router picks one per call
+CHAT_MODEL = os.getenv("GEMINI_CHAT_MODEL", "gemini/gemini-pro")
+
+# Maximum feedback calls in flight for one batch-evaluated mock interview
+INTERVIEW_BATCH_CONCURRENCY = int(os.getenv("INTERVIEW_BATCH_CONCURRENCY", "8"))
+
+# Roadmaps depend only on the job title (and the routed model), so they are shared across users and workers
+roadmap_cache = get_cache("roadmaps", version=1, ttl=int(os.getenv("ROADMAP_CACHE_TTL", str(24 * 3600))))
+
+
+# Asks litellm for a JSON object response (OpenAI / Gemini JSON mode)
+JSON_RESPONSE_FORMAT = {"type": "json_object"}
+
+def _invoke(prompt_name: str, json_mode: bool = False, **variables) -> str:
+    """
+    Renders a registered prompt and sends it through the litellm provider, on
+    the model picked by model_router.
+
+    If every provider is unavailable, returns the prompt's degraded reply when
+    it has one and raises ProviderUnavailableError otherwise.
+    """
+    rendered = prompts.render(prompt_name, **variables)
+    config = {"response_format": JSON_RESPONSE_FORMAT} if json_mode else {}
+    try:
+        return model_router.complete(
+            "litellm", prompt_name, rendered.messages, tokens=rendered.input_tokens,
+            default_model=CHAT_MODEL, max_tokens=rendered.max_tokens, **config
+        )
+    except ProviderUnavailableError:
+        if rendered.degraded:
+            return rendered.degraded
+        raise
+
+async def _ainvoke(prompt_name: str, json_mode: bool = False, **variables) -> str:
+    """Async variant of `_invoke`."""
+    rendered = prompts.render(prompt_name, **variables)
+    config = {"response_format": JSON_RESPONSE_FORMAT} if json_mode else {}
+    try:
+        return await model_router.acomplete(
+            "litellm", prompt_name, rendered.messages, tokens=rendered.input_tokens,
+            default_model=CHAT_MODEL, max_tokens=rendered.max_tokens, **config
+        )
+    except ProviderUnavailableError:
+        if rendered.degraded:
+            return rendered.degraded
+        raise
 
 # --- Service Functions ---
 
 def generate_career_path(job_title: str) -> str:
     """
-    Generates a career path roadmap using LangChain for enhanced output.
+    Generates a career path roadmap from the registered `career_path` prompt.
 
     Args:
         job_title: The career title entered by the user.
@@ -42,36 +93,28 @@ def generate_career_path(job_title: str) -> str:
     Returns:
         A formatted string containing the AI-generated career path.
     """
-    prompt = ChatPromptTemplate.from_messages([
-        ("system", "You are an expert career coach providing structured career advice."),
-        ("user", """
-        A user wants to become a '{job_title}'.
-        Provide a clear, encouraging, and structured career roadmap for them.
-        The response must be in Markdown format and include these three sections exactly as titled below:
-
-        ### 🚀 Potential Career Path
-        List 3-5 potential roles, starting from an entry-level position and progressing upwards.
-
-        ### 🔧 Key Skills to Master
-        List 5-7 crucial technical and soft skills required for a '{job_title}'. Briefly explain why each is important.
-
-        ### 🤔 Sample Interview Questions
-        Provide 3 insightful interview questions for a '{job_title}' role: one behavioral, one technical, and one situational.
-        """)
-    ])
+    cache_key = " ".join(job_title.lower().split())
+    # Pro users are routed to the large model; keep their roadmaps apart from the small model's
+    model = model_router.cache_tag("litellm", 0, "career_path")
+    if model:
+        cache_key = f"{model}\x1f{cache_key}"
+    cached = roadmap_cache.get(cache_key)
+    if cached:
+        return cached
 
     try:
-        chain = prompt | llm
-        response = chain.invoke({"job_title": job_title})
-        return response.content
+        roadmap = _invoke("career_path", job_title=job_title)
     except Exception as e:
         print(f"An error occurred while calling the AI API: {e}")
         return "Sorry, there was an issue generating the career path. Please try again later."
 
+    roadmap_cache.set(cache_key, roadmap)
+    return roadmap
+
 
 def generate_interview_feedback(question: str, user_answer: str) -> str:
     """
-    Generates feedback for a user's answer to an interview question using LangChain.
+    Generates feedback for a user's answer to an interview question.
 
     Args:
         question: The interview question asked.
@@ -80,32 +123,56 @@ def generate_interview_feedback(question: str, user_answer: str) -> str:
     Returns:
         A formatted string containing AI-generated feedback.
     """
-    prompt = ChatPromptTemplate.from_messages([
-        ("system", "You are a friendly but professional FAANG interviewer providing constructive feedback."),
-        ("user", """
-        A candidate was asked the following question:
-        **Question:** "{question}"
-
-        Here is their answer:
-        **Answer:** "{user_answer}"
-
-        Please provide constructive feedback on their answer in Markdown format. The feedback should include:
-        1.  **Overall Impression:** A brief summary of how they did.
-        2.  **Strengths:** 2-3 bullet points on what was good about their answer.
-        3.  **Areas for Improvement:** 2-3 bullet points with specific, actionable advice on how they could make their answer better.
-        Keep the tone encouraging and helpful.
-        """)
-    ])
-
     try:
-        chain = prompt | llm
-        response = chain.invoke({"question": question, "user_answer": user_answer})
-        return response.content
+        return _invoke("interview_feedback", question=question, user_answer=user_answer)
     except Exception as e:
         print(f"An error occurred while calling the AI API: {e}")
         return "Sorry, there was an issue generating feedback. Please try again later."
 
 
+def evaluate_interview_answer(question: str, user_answer: str) -> InterviewEvaluation:
+    """
+    Scores an interview answer and generates feedback in a single model call.
+
+    Args:
+        question: The interview question asked.
+        user_answer: The user's answer to the question.
+
+    Returns:
+        A validated InterviewEvaluation. If the model call fails or returns
+        invalid JSON, the local heuristic scorer is used instead.
+    """
+    try:
+        output = _invoke("interview_evaluation", json_mode=True, question=question, user_answer=user_answer)
+    except Exception as e:
+        print(f"An error occurred while calling the AI API: {e}")
+        output = None
+    return interview_scoring.evaluation_from_output(question, user_answer, output)
+
+
+async def evaluate_interview_batch(answers: List[Tuple[str, str]]) -> List[InterviewEvaluation]:
+    """
+    Evaluates every (question, user_answer) pair of a mock interview concurrently.
+
+    At most INTERVIEW_BATCH_CONCURRENCY calls run at once, so an 8-question
+    interview takes about one model latency instead of eight. Each pair falls
+    back to the heuristic scorer independently.
+    """
+    semaphore = asyncio.Semaphore(INTERVIEW_BATCH_CONCURRENCY)
+
+    async def evaluate(question: str, user_answer: str) -> InterviewEvaluation:
+        async with semaphore:
+            try:
+                output = await _ainvoke("interview_evaluation", json_mode=True,
+                                        question=question, user_answer=user_answer)
+            except Exception as e:
+                print(f"An error occurred while calling the AI API: {e}")
+                output = None
+        return interview_scoring.evaluation_from_output(question, user_answer, output)
+
+    return await asyncio.gather(*(evaluate(q, a) for q, a in answers))
+
+
 async def analyze_resume(resume_text: str, college_tier: str = "Tier 2/3",
                         character_profile: str = "Not specified",
                         skills: list = None) -> dict:
@@ -189,7 +256,7 @@ async def analyze_resume(resume_text: str, college_tier: str = "Tier 2/3",
 
 def generate_career_advice(user_profile: dict) -> str:
     """
-    Generate personalized career advice based on user profile using LangChain.
+    Generate personalized career advice based on user profile.
 
     Args:
         user_profile (dict): User's profile information.
@@ -197,26 +264,8 @@ def generate_career_advice(user_profile: dict) -> str:
     Returns:
         str: Personalized career advice.
     """
-    prompt = ChatPromptTemplate.from_messages([
-        ("system", "You are a career counselor providing personalized advice."),
-        ("user", """
-        Based on the following user profile, provide personalized career advice:
-
-        Profile: {user_profile}
-
-        Provide comprehensive career advice including:
-        1. Career path recommendations
-        2. Skill development suggestions
-        3. Industry trends to watch
-        4. Networking opportunities
-        5. Short-term and long-term goals
-        """)
-    ])
-
     try:
-        chain = prompt | llm
-        response = chain.invoke({"user_profile": user_profile})
-        return response.content
+        return _invoke("career_advice", user_profile=user_profile)
     except Exception as e:
         print(f"Error generating career advice: {str(e)}")
         return "Sorry, there was an issue generating career advice. Please try again later."
@@ -0,0 +1,364 @@
+import asyncio
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import orjson
+
+# --- Idempotency Keys ---
+# Clients retry AI requests on timeout. With an `Idempotency-Key` header, a
+# retry does not run the endpoint again (no second LLM call, no duplicate
+# InterviewSession row):
+#   - the first request with a key claims it and runs normally; a response
+#     below 500 is stored for IDEMPOTENCY_TTL seconds,
+#   - a duplicate arriving while it runs waits for it (up to
+#     IDEMPOTENCY_WAIT_SECONDS, then 409) and gets the same response,
+#   - a duplicate arriving later gets the stored response replayed, marked
+#     with an `Idempotent-Replayed: true` header,
+#   - the same key with a different request body is rejected with 422,
+#   - a 5xx or a crash releases the key, so the retry runs again. A claim
+#     whose worker died expires after IDEMPOTENCY_LOCK_SECONDS.
+# Keys are scoped per user (verified bearer token subject) and endpoint.
+# Requests without the header, or without a valid token, are not affected.
+#
+# The store is a SQLite file shared by the workers of one host (or memory://
+# for a single process), selected with IDEMPOTENCY_URL.
+IDEMPOTENCY_URL = os.getenv("IDEMPOTENCY_URL", "sqlite:///./.cache/careerup-idempotency.db")
+IDEMPOTENCY_TTL = float(os.getenv("IDEMPOTENCY_TTL", str(24 * 3600)))
+IDEMPOTENCY_LOCK_SECONDS = float(os.getenv("IDEMPOTENCY_LOCK_SECONDS", "300"))
+IDEMPOTENCY_WAIT_SECONDS = float(os.getenv("IDEMPOTENCY_WAIT_SECONDS", "60"))
+# Larger responses are not stored; their key is released instead.
+IDEMPOTENCY_MAX_BODY_BYTES = int(os.getenv("IDEMPOTENCY_MAX_BODY_BYTES", str(1024 * 1024)))
+IDEMPOTENCY_HEADER = b"idempotency-key"
+MAX_KEY_LENGTH = 255
+
+# POST endpoints that call an LLM.
+IDEMPOTENT_PATHS = {
+    "/api/career/generate-roadmap",
+    "/api/interview/feedback",
+    "/api/interview/sessions/batch",
+    "/api/market-insights",
+    "/api/resume/review",
+    "/api/chat",
+}
+# Path prefixes for POSTs with ids in the path (start / answer of a mock interview).
+IDEMPOTENT_PREFIXES = ("/api/interview/mock",)
+
+IN_PROGRESS, COMPLETED = "in_progress", "completed"
+
+
+@dataclass
+class IdempotencyRecord:
+    state: str
+    fingerprint: str
+    status: int = 0
+    headers: List[Tuple[str, str]] = field(default_factory=list)
+    body: bytes = b""
+
+
+# --- Stores ---
+
+class IdempotencyStore:
+    """
+    Claims and results per idempotency key.
+
+    `claim` is atomic: exactly one caller gets None (it must then `complete`
+    or `release` the key); everyone else gets the existing record.
+    """
+
+    def claim(self, key: str, fingerprint: str, lock_seconds: float) -> Optional[IdempotencyRecord]:
+        raise NotImplementedError
+
+    def get(self, key: str) -> Optional[IdempotencyRecord]:
+        raise NotImplementedError
+
+    def complete(self, key: str, record: IdempotencyRecord, ttl: float):
+        raise NotImplementedError
+
+    def release(self, key: str):
+        raise NotImplementedError
+
+
+class MemoryIdempotencyStore(IdempotencyStore):
+    """In-process store for a single worker (and tests). Expired keys are purged on claim."""
+
+    PURGE_EVERY = 500
+
+    def __init__(self):
+        self._data: Dict[str, Tuple[IdempotencyRecord, float]] = {}
+        self._lock = threading.Lock()
+        self._claims = 0
+
+    def _live(self, key: str, now: float) -> Optional[IdempotencyRecord]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        if entry[1] <= now:
+            del self._data[key]
+            return None
+        return entry[0]
+
+    def claim(self, key, fingerprint, lock_seconds):
+        now = time.time()
+        with self._lock:
+            self._claims += 1
+            if self._claims % self.PURGE_EVERY == 0:
+                self._data = {k: v for k, v in self._data.items() if v[1] > now}
+            existing = self._live(key, now)
+            if existing is not None:
+                return existing
+            self._data[key] = (IdempotencyRecord(IN_PROGRESS, fingerprint), now + lock_seconds)
+            return None
+
+    def get(self, key):
+        with self._lock:
+            return self._live(key, time.time())
+
+    def complete(self, key, record, ttl):
+        with self._lock:
+            self._data[key] = (record, time.time() + ttl)
+
+    def release(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+
+class SQLiteIdempotencyStore(IdempotencyStore):
+    """
+    Store in a SQLite file shared by every worker on the host.
+
+    Same setup as the cache's SQLiteBackend: WAL mode, one connection per
+    thread, expired rows ignored on read and purged periodically.
+    """
+
+    PURGE_EVERY = 500  # claims between expired-row purges
+
+    def __init__(self, path: str):
+        self.path = path
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._claims = 0
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS idempotency_keys ("
+            " key TEXT PRIMARY KEY, fingerprint TEXT NOT NULL, state TEXT NOT NULL,"
+            " status INTEGER, headers BLOB, body BLOB, expires_at REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_idempotency_keys_expires_at ON idempotency_keys (expires_at)")
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _record(row) -> IdempotencyRecord:
+        fingerprint, state, status, headers, body = row
+        return IdempotencyRecord(state, fingerprint, status or 0,
+                                 [tuple(h) for h in orjson.loads(headers)] if headers else [],
+                                 bytes(body) if body is not None else b"")
+
+    def claim(self, key, fingerprint, lock_seconds):
+        conn, now = self._conn(), time.time()
+        # An expired row (finished long ago, or a claim whose worker died) may be taken over.
+        inserted = conn.execute(
+            "INSERT INTO idempotency_keys (key, fingerprint, state, expires_at) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET fingerprint = excluded.fingerprint, state = excluded.state,"
+            " status = NULL, headers = NULL, body = NULL, expires_at = excluded.expires_at "
+            "WHERE idempotency_keys.expires_at <= ?",
+            (key, fingerprint, IN_PROGRESS, now + lock_seconds, now),
+        ).rowcount
+        self._claims += 1
+        if self._claims % self.PURGE_EVERY == 0:
+            conn.execute("DELETE FROM idempotency_keys WHERE expires_at <= ?", (now,))
+        if inserted:
+            return None
+        existing = self.get(key)
+        # Released between the insert and the read: claim again.
+        return existing if existing is not None else self.claim(key, fingerprint, lock_seconds)
+
+    def get(self, key):
+        row = self._conn().execute(
+            "SELECT fingerprint, state, status, headers, body FROM idempotency_keys"
+            " WHERE key = ? AND expires_at > ?", (key, time.time())
+        ).fetchone()
+        return self._record(row) if row else None
+
+    def complete(self, key, record, ttl):
+        self._conn().execute(
+            "UPDATE idempotency_keys SET state = ?, status = ?, headers = ?, body = ?, expires_at = ?"
+            " WHERE key = ?",
+            (COMPLETED, record.status, orjson.dumps(record.headers), record.body, time.time() + ttl, key),
+        )
+
+    def release(self, key):
+        self._conn().execute("DELETE FROM idempotency_keys WHERE key = ?", (key,))
+
+
+def store_from_url(url: str) -> IdempotencyStore:
+    if url.startswith("memory://"):
+        return MemoryIdempotencyStore()
+    if url.startswith("sqlite:///"):
+        return SQLiteIdempotencyStore(url[len("sqlite:///"):])
+    raise ValueError(f"Unsupported IDEMPOTENCY_URL: {url}")
+
+
+_store: Optional[IdempotencyStore] = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> IdempotencyStore:
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = store_from_url(IDEMPOTENCY_URL)
+    return _store
+
+
+def set_store(store: IdempotencyStore):
+    """Replaces the process-wide store (e.g. with MemoryIdempotencyStore() in benchmarks)."""
+    global _store
+    _store = store
+
+
+# --- Middleware ---
+
+def _request_user(scope) -> Optional[str]:
+    """Subject of a valid bearer token, or None."""
+    from ..utils.security import request_claims
+    claims = request_claims(scope)
+    return claims.get("sub") if claims else None
+
+
+def _error(status: int, detail: str) -> Tuple[int, List[Tuple[bytes, bytes]], bytes]:
+    body = orjson.dumps({"detail": detail})
+    return status, [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())], body
+
+
+class IdempotencyMiddleware:
+    """ASGI middleware that deduplicates retried AI POSTs carrying an Idempotency-Key header."""
+
+    def __init__(self, app, paths=IDEMPOTENT_PATHS, prefixes=IDEMPOTENT_PREFIXES):
+        self.app = app
+        self.paths = paths
+        self.prefixes = prefixes
+        # Wakes duplicates waiting in this worker as soon as the original finishes.
+        self._finished: Dict[str, asyncio.Event] = {}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or not (
+                scope["path"] in self.paths or scope["path"].startswith(self.prefixes)):
+            await self.app(scope, receive, send)
+            return
+        idempotency_key = next((v for k, v in scope.get("headers") or [] if k == IDEMPOTENCY_HEADER), None)
+        user = _request_user(scope) if idempotency_key else None
+        if not idempotency_key or user is None:
+            await self.app(scope, receive, send)
+            return
+        if len(idempotency_key) > MAX_KEY_LENGTH:
+            await self._send(send, *_error(400, "Idempotency-Key is too long."))
+            return
+
+        # The body is part of the fingerprint, so it is read up front and replayed to the app.
+        chunks, more = [], True
+        while more:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            chunks.append(message.get("body", b""))
+            more = message.get("more_body", False)
+        body = b"".join(chunks)
+        fingerprint = hashlib.sha256(body).hexdigest()
+        key = hashlib.sha256(b"\0".join([user.encode(), scope["path"].encode(), idempotency_key])).hexdigest()
+
+        store = get_store()
+        while True:
+            record = await asyncio.to_thread(store.claim, key, fingerprint, IDEMPOTENCY_LOCK_SECONDS)
+            if record is None:
+                await self._run(scope, body, send, store, key, fingerprint)
+                return
+            if record.state == IN_PROGRESS:
+                record = await self._wait(store, key)
+                if record is None:
+                    # The original failed and released the key: this request runs instead.
+                    continue
+            break
+
+        if record.state == IN_PROGRESS:
+            await self._send(send, *_error(409, "A request with this Idempotency-Key is still in progress."))
+        elif record.fingerprint != fingerprint:
+            await self._send(send, *_error(422, "This Idempotency-Key was used with a different request body."))
+        else:
+            headers = [(k.encode("latin-1"), v.encode("latin-1")) for k, v in record.headers]
+            await self._send(send, record.status, headers + [(b"idempotent-replayed", b"true")], record.body)
+
+    async def _run(self, scope, body: bytes, send, store: IdempotencyStore, key: str, fingerprint: str):
+        replayed = False
+
+        async def receive_body():
+            nonlocal replayed
+            if replayed:
+                # Nothing more to read; wait like a real receive() until the client goes away.
+                await asyncio.Event().wait()
+            replayed = True
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        status, headers, parts, size = 500, [], [], 0
+
+        async def capture(message):
+            nonlocal status, headers, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = [(k.decode("latin-1"), v.decode("latin-1")) for k, v in message.get("headers", [])]
+            elif message["type"] == "http.response.body" and size <= IDEMPOTENCY_MAX_BODY_BYTES:
+                parts.append(message.get("body", b""))
+                size += len(parts[-1])
+            await send(message)
+
+        self._finished[key] = event = asyncio.Event()
+        stored = False
+        try:
+            await self.app(scope, receive_body, capture)
+            if status < 500 and size <= IDEMPOTENCY_MAX_BODY_BYTES:
+                # Set-Cookie belongs to the original response only.
+                kept = [(k, v) for k, v in headers if k.lower() != "set-cookie"]
+                record = IdempotencyRecord(COMPLETED, fingerprint, status, kept, b"".join(parts))
+                await asyncio.to_thread(store.complete, key, record, IDEMPOTENCY_TTL)
+                stored = True
+        finally:
+            if not stored:
+                await asyncio.shield(asyncio.to_thread(store.release, key))
+            event.set()
+            self._finished.pop(key, None)
+
+    async def _wait(self, store: IdempotencyStore, key: str) -> Optional[IdempotencyRecord]:
+        """Waits for the request holding `key` to finish; returns its record (None if it was released)."""
+        deadline = time.monotonic() + IDEMPOTENCY_WAIT_SECONDS
+        delay = 0.05
+        while True:
+            event = self._finished.get(key)
+            remaining = deadline - time.monotonic()
+            try:
+                # Same worker: woken by the event. Another worker: poll the store.
+                await asyncio.wait_for(event.wait() if event else asyncio.sleep(delay), min(delay, max(remaining, 0)))
+            except asyncio.TimeoutError:
+                pass
+            record = await asyncio.to_thread(store.get, key)
+            if record is None or record.state != IN_PROGRESS or time.monotonic() >= deadline:
+                return record
+            delay = min(delay * 2, 0.5)
+
+    @staticmethod
+    async def _send(send, status: int, headers, body: bytes):
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,134 @@
+import json
+import re
+from typing import List, Optional
+
+from pydantic import ValidationError
+
+from ..schemas import InterviewEvaluation
+
+# --- Interview Answer Scoring ---
+# The model is asked for one JSON object (score, strengths, improvements,
+# feedback) validated against `InterviewEvaluation`. When the call fails or the
+# output does not validate, `heuristic_evaluation` scores the answer locally
+# from its length, STAR structure, metrics and overlap with the question, so
+# every saved session gets a real score.
+
+_FENCE = re.compile(r"^```(?:json)?\s*|\s*```$", re.IGNORECASE)
+_WORD = re.compile(r"[a-z][a-z'+#.-]*")
+_NUMBER = re.compile(r"\d")
+
+# Phrases that signal each part of a STAR (Situation, Task, Action, Result) answer.
+STAR_MARKERS = {
+    "situation": ("situation", "when i was", "at my", "during my", "in my internship", "in my last", "once"),
+    "task": ("task", "goal", "responsible for", "needed to", "had to", "challenge", "objective"),
+    "action": ("i decided", "i built", "i led", "i implemented", "i created", "i designed", "i worked",
+               "i proposed", "i organized", "so i", "i used"),
+    "result": ("result", "outcome", "as a result", "improved", "reduced", "increased", "saved",
+               "learned", "delivered", "achieved"),
+}
+STOPWORDS = {
+    "about", "after", "also", "been", "before", "could", "describe", "does", "from", "have", "into",
+    "tell", "that", "their", "there", "they", "this", "time", "what", "when", "where", "which", "with",
+    "would", "your", "you", "were", "will", "more", "most", "some", "than", "then", "them", "these",
+}
+
+
+def parse_evaluation(text: str) -> InterviewEvaluation:
+    """
+    Validates model output as an InterviewEvaluation.
+
+    Tolerates Markdown code fences and text around the JSON object.
+    Raises ValueError when no valid object is found.
+    """
+    cleaned = _FENCE.sub("", text.strip())
+    start, end = cleaned.find("{"), cleaned.rfind("}")
+    if start == -1 or end <= start:
+        raise ValueError("No JSON object in model output")
+    try:
+        data = json.loads(cleaned[start:end + 1])
+        return InterviewEvaluation.model_validate({**data, "scored_by": "model"})
+    except (json.JSONDecodeError, ValidationError) as e:
+        raise ValueError(f"Invalid evaluation: {e}") from e
+
+
+def _content_words(text: str) -> set:
+    return {w for w in _WORD.findall(text.lower()) if len(w) > 3 and w not in STOPWORDS}
+
+
+def heuristic_evaluation(question: str, user_answer: str) -> InterviewEvaluation:
+    """Scores an answer locally (no model call) on a 0-10 scale."""
+    answer = user_answer.lower()
+    words = len(user_answer.split())
+    strengths: List[str] = []
+    improvements: List[str] = []
+
+    # Length: very short answers cannot show much; very long ones tend to ramble.
+    if words < 20:
+        score = 2.0
+        improvements.append("Expand the answer with a concrete example.")
+    elif words < 50:
+        score = 4.0
+        improvements.append("Add more detail about what you did and why.")
+    elif words <= 300:
+        score = 6.0
+        strengths.append("Good level of detail.")
+    else:
+        score = 5.5
+        improvements.append("Keep the answer under two minutes; trim background detail.")
+
+    star = [part for part, markers in STAR_MARKERS.items() if any(m in answer for m in markers)]
+    score += 0.5 * len(star)
+    if len(star) >= 3:
+        strengths.append("Follows a clear STAR structure.")
+    else:
+        missing = ", ".join(p.capitalize() for p in STAR_MARKERS if p not in star)
+        improvements.append(f"Structure it with STAR; the {missing} part is unclear.")
+
+    if _NUMBER.search(user_answer):
+        score += 0.5
+        strengths.append("Backs claims with numbers.")
+    else:
+        improvements.append("Quantify the impact (time saved, % improvement, users).")
+
+    question_words = _content_words(question)
+    if question_words:
+        overlap = len(question_words & _content_words(user_answer)) / len(question_words)
+        score += round(overlap, 2)
+        if overlap >= 0.5:
+            strengths.append("Stays focused on the question.")
+        elif overlap < 0.2:
+            improvements.append("Tie the answer back to what the question asked.")
+
+    score = round(min(max(score, 0.0), 10.0), 1)
+    return InterviewEvaluation(
+        score=score,
+        strengths=strengths[:3] or ["You answered the question directly."],
+        improvements=improvements[:3] or ["Close with what you learned or would do differently."],
+        feedback=(
+            f"This answer was scored automatically ({score}/10) because detailed AI feedback "
+            "was unavailable. The points below are based on its structure and content."
+        ),
+        scored_by="heuristic",
+    )
+
+
+def evaluation_from_output(question: str, user_answer: str, output: Optional[str]) -> InterviewEvaluation:
+    """Parses model output, falling back to the heuristic scorer when it is missing or invalid."""
+    if output:
+        try:
+            return parse_evaluation(output)
+        except ValueError as e:
+            print(f"Falling back to heuristic interview scoring: {e}")
+    return heuristic_evaluation(question, user_answer)
+
+
+def to_markdown(evaluation: InterviewEvaluation) -> str:
+    """Renders an evaluation in the feedback layout the frontend already displays."""
+    strengths = "\n".join(f"- {s}" for s in evaluation.strengths)
+    improvements = "\n".join(f"- {s}" for s in evaluation.improvements)
+    return (
+        f"1.  **Overall Impression:** {evaluation.feedback}\n"
+        f"2.  **Strengths:**\n{strengths}\n"
+        f"3.  **Areas for Improvement:**\n{improvements}\n"
+        f"\n**Score:** {evaluation.score}/10"
+    )
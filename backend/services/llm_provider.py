@@ -0,0 +1,769 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from ..utils.profiling import phase
+
+logger = logging.getLogger(__name__)
+
+# --- LLM Provider Layer ---
+# Every service talks to a model through an LLMProvider instead of calling
+# litellm / Vertex directly. This gives us one place to add record/replay,
+# fakes for benchmarks, and resilience (circuit breakers, hedging).
+#
+# LLM_MODE selects how providers behave:
+#   live   - call the real provider (default)
+#   record - call the real provider and store every response in the cassette store
+#   replay - serve responses from the cassette store with zero network I/O
+LLM_MODE = os.getenv("LLM_MODE", "live").lower()
+LLM_CASSETTE_DIR = os.getenv("LLM_CASSETTE_DIR", "./cassettes")
+
+Message = Dict[str, str]
+
+
+class CassetteMissError(LookupError):
+    """Raised in replay mode when no recorded response exists for a request."""
+
+
+# --- Providers ---
+
+class LLMProvider:
+    """
+    Base interface for a chat-completion style model provider.
+
+    Implementations receive OpenAI-style messages (`{"role": ..., "content": ...}`)
+    and return the generated text.
+    """
+
+    name = "base"
+    default_model: Optional[str] = None
+
+    def resolve_model(self, model: Optional[str]) -> Optional[str]:
+        return model or self.default_model
+
+    def complete(self, messages: List[Message], model: Optional[str] = None, **config: Any) -> str:
+        raise NotImplementedError
+
+    async def acomplete(self, messages: List[Message], model: Optional[str] = None, **config: Any) -> str:
+        # Fallback for blocking SDKs: run them off the event loop.
+        return await asyncio.to_thread(self.complete, messages, model, **config)
+
+    async def astream(self, messages: List[Message], model: Optional[str] = None,
+                      **config: Any) -> AsyncIterator[str]:
+        """Yields the completion as text chunks. Providers without streaming yield it whole."""
+        yield await self.acomplete(messages, model, **config)
+
+
+class LiteLLMProvider(LLMProvider):
+    """Calls any model supported by litellm (OpenAI, Gemini, ...)."""
+
+    name = "litellm"
+
+    @property
+    def default_model(self) -> Optional[str]:
+        import litellm
+        return litellm.model
+
+    def complete(self, messages: List[Message], model: Optional[str] = None, **config: Any) -> str:
+        import litellm
+        response = litellm.completion(model=self.resolve_model(model), messages=messages, **config)
+        return response.choices[0].message.content or ""
+
+    async def acomplete(self, messages: List[Message], model: Optional[str] = None, **config: Any) -> str:
+        # Native async client: concurrent calls do not each hold a worker thread.
+        import litellm
+        response = await litellm.acompletion(model=self.resolve_model(model), messages=messages, **config)
+        return response.choices[0].message.content or ""
+
+    async def astream(self, messages: List[Message], model: Optional[str] = None,
+                      **config: Any) -> AsyncIterator[str]:
+        import litellm
+        response = await litellm.acompletion(
+            model=self.resolve_model(model), messages=messages, stream=True, **config
+        )
+        async for chunk in response:
+            delta = chunk.choices[0].delta.content if chunk.choices else None
+            if delta:
+                yield delta
+
+
+class VertexProvider(LLMProvider):
+    """Calls Gemini models through the Vertex AI SDK (vertexai.init must already have run)."""
+
+    name = "vertex"
+    default_model = "gemini-1.5-pro"
+
+    # Maps our provider-neutral config names onto Vertex generation_config keys.
+    _CONFIG_KEYS = {"max_tokens": "max_output_tokens"}
+
+    def __init__(self):
+        self._models = {}
+        self._lock = threading.Lock()
+
+    def _get_model(self, model_name: str):
+        with self._lock:
+            if model_name not in self._models:
+                from vertexai.generative_models import GenerativeModel
+                self._models[model_name] = GenerativeModel(model_name)
+            return self._models[model_name]
+
+    def _prepare(self, messages: List[Message], config: Dict[str, Any]):
+        prompt = "\n\n".join(m["content"] for m in messages)
+        generation_config = {self._CONFIG_KEYS.get(k, k): v for k, v in config.items() if v is not None}
+        return prompt, generation_config
+
+    def complete(self, messages: List[Message], model: Optional[str] = None, **config: Any) -> str:
+        prompt, generation_config = self._prepare(messages, config)
+        response = self._get_model(self.resolve_model(model)).generate_content(
+            prompt, generation_config=generation_config
+        )
+        return response.text
+
+    async def astream(self, messages: List[Message], model: Optional[str] = None,
+                      **config: Any) -> AsyncIterator[str]:
+        prompt, generation_config = self._prepare(messages, config)
+        responses = await self._get_model(self.resolve_model(model)).generate_content_async(
+            prompt, generation_config=generation_config, stream=True
+        )
+        async for response in responses:
+            if response.candidates and response.candidates[0].content.parts:
+                yield response.text
+
+    async def acomplete(self, messages: List[Message], model: Optional[str] = None, **config: Any) -> str:
+        prompt, generation_config = self._prepare(messages, config)
+        response = await self._get_model(self.resolve_model(model)).generate_content_async(
+            prompt, generation_config=generation_config
+        )
+        return response.text
+
+
+# --- Cassette Store (record / replay) ---
+
+def request_key(provider: str, model: Optional[str], messages: List[Message], config: Dict[str, Any]) -> str:
+    """Stable hash of everything that influences a completion."""
+    canonical = json.dumps(
+        {"provider": provider, "model": model, "messages": messages, "config": config},
+        sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class CassetteStore:
+    """
+    Append-only JSONL store of recorded completions, indexed by request hash.
+
+    The whole index is loaded into a dict on open, so replay is a single hash
+    lookup. Later recordings of the same request win; `compact()` rewrites the
+    file keeping only the latest entry per key.
+    """
+
+    FILENAME = "cassettes.jsonl"
+
+    def __init__(self, directory: str = LLM_CASSETTE_DIR):
+        self.path = Path(directory) / self.FILENAME
+        self._index: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        if not self.path.exists():
+            return
+        with self.path.open("r", encoding="utf-8") as fh:
+            for line in fh:
+                if not line.strip():
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning("Skipping corrupt cassette line in %s", self.path)
+                    continue
+                self._index[entry["key"]] = entry["response"]
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def get(self, key: str) -> Optional[str]:
+        return self._index.get(key)
+
+    def put(self, key: str, response: str, provider: str, model: Optional[str],
+            messages: List[Message], config: Dict[str, Any]):
+        entry = {
+            "key": key,
+            "provider": provider,
+            "model": model,
+            "messages": messages,
+            "config": config,
+            "response": response,
+            "recorded_at": time.time(),
+        }
+        line = json.dumps(entry, ensure_ascii=False, separators=(",", ":"), default=str)
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open("a", encoding="utf-8") as fh:
+                fh.write(line + "\n")
+            self._index[key] = response
+
+    def compact(self):
+        """Rewrites the store with one (the latest) entry per key."""
+        with self._lock:
+            if not self.path.exists():
+                return
+            latest = {}
+            with self.path.open("r", encoding="utf-8") as fh:
+                for line in fh:
+                    if not line.strip():
+                        continue
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        # Dropped, as in `_load` (e.g. a line cut short by a crash mid-append)
+                        logger.warning("Dropping corrupt cassette line from %s", self.path)
+                        continue
+                    latest[entry["key"]] = line if line.endswith("\n") else line + "\n"
+            tmp_path = self.path.with_suffix(".tmp")
+            with tmp_path.open("w", encoding="utf-8") as fh:
+                fh.writelines(latest.values())
+            os.replace(tmp_path, self.path)
+
+
+class RecordingProvider(LLMProvider):
+    """Delegates to a real provider and records every successful response."""
+
+    def __init__(self, inner: LLMProvider, store: CassetteStore):
+        self.inner, self.store = inner, store
+        self.name = inner.name
+
+    def resolve_model(self, model: Optional[str]) -> Optional[str]:
+        return self.inner.resolve_model(model)
+
+    def complete(self, messages: List[Message], model: Optional[str] = None, **config: Any) -> str:
+        model = self.resolve_model(model)
+        response = self.inner.complete(messages, model, **config)
+        key = request_key(self.name, model, messages, config)
+        self.store.put(key, response, self.name, model, messages, config)
+        return response
+
+    async def acomplete(self, messages: List[Message], model: Optional[str] = None, **config: Any) -> str:
+        model = self.resolve_model(model)
+        response = await self.inner.acomplete(messages, model, **config)
+        key = request_key(self.name, model, messages, config)
+        await asyncio.to_thread(self.store.put, key, response, self.name, model, messages, config)
+        return response
+
+    async def astream(self, messages: List[Message], model: Optional[str] = None,
+                      **config: Any) -> AsyncIterator[str]:
+        # Recorded as one response once the stream finishes; replay yields it whole.
+        model = self.resolve_model(model)
+        parts = []
+        async for chunk in self.inner.astream(messages, model, **config):
+            parts.append(chunk)
+            yield chunk
+        key = request_key(self.name, model, messages, config)
+        await asyncio.to_thread(self.store.put, key, "".join(parts), self.name, model, messages, config)
+
+
+class ReplayProvider(LLMProvider):
+    """Serves recorded responses only; never touches the network."""
+
+    def __init__(self, inner: LLMProvider, store: CassetteStore):
+        self.inner, self.store = inner, store
+        self.name = inner.name
+
+    def resolve_model(self, model: Optional[str]) -> Optional[str]:
+        return self.inner.resolve_model(model)
+
+    def complete(self, messages: List[Message], model: Optional[str] = None, **config: Any) -> str:
+        model = self.resolve_model(model)
+        response = self.store.get(request_key(self.name, model, messages, config))
+        if response is None:
+            raise CassetteMissError(f"No recorded {self.name} response for model {model}")
+        return response
+
+    async def acomplete(self, messages: List[Message], model: Optional[str] = None, **config: Any) -> str:
+        # A dict lookup does not need a worker thread.
+        return self.complete(messages, model, **config)
+
+
+class TimedProvider(LLMProvider):
+    """Reports provider calls as the "llm" phase of a profiled request."""
+
+    def __init__(self, inner: LLMProvider):
+        self.inner = inner
+        self.name = inner.name
+
+    def resolve_model(self, model: Optional[str]) -> Optional[str]:
+        return self.inner.resolve_model(model)
+
+    def complete(self, messages: List[Message], model: Optional[str] = None, **config: Any) -> str:
+        with phase("llm"):
+            return self.inner.complete(messages, model, **config)
+
+    async def acomplete(self, messages: List[Message], model: Optional[str] = None, **config: Any) -> str:
+        with phase("llm"):
+            return await self.inner.acomplete(messages, model, **config)
+
+    async def astream(self, messages: List[Message], model: Optional[str] = None,
+                      **config: Any) -> AsyncIterator[str]:
+        with phase("llm"):
+            async for chunk in self.inner.astream(messages, model, **config):
+                yield chunk
+
+
+# --- Resilience ---
+# Live calls go through ResilientProvider, so an outage costs milliseconds
+# instead of a full timeout per request:
+#   - A circuit breaker per (provider, model). LLM_BREAKER_FAILURES consecutive
+#     failures open it for LLM_BREAKER_COOLDOWN seconds; after that a single
+#     half-open probe decides whether it closes again. An open circuit is
+#     skipped without waiting.
+#   - LLM_TIMEOUT_SECONDS per attempt.
+#   - A hedged request to the fallback model once the primary has been slower
+#     than its recent p95. The first good answer wins; the other is cancelled.
+#     litellm models fall back per `litellm.fallbacks`, Vertex falls back to
+#     LLM_VERTEX_FALLBACK_MODEL through litellm.
+#   - When every attempt fails or is refused, the last good response to the
+#     same request (kept LLM_LAST_GOOD_TTL seconds) is served; failing that,
+#     ProviderUnavailableError is raised and callers use their degraded reply.
+# Client errors (bad request, auth) propagate as before and do not trip breakers.
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "30"))
+LLM_BREAKER_FAILURES = int(os.getenv("LLM_BREAKER_FAILURES", "5"))
+LLM_BREAKER_COOLDOWN = float(os.getenv("LLM_BREAKER_COOLDOWN", "30"))
+LLM_HEDGING = os.getenv("LLM_HEDGING", "1") == "1"
+# Hedge delay bounds; LLM_HEDGE_DEFAULT_DELAY applies until a model has enough samples for a p95.
+LLM_HEDGE_MIN_DELAY = float(os.getenv("LLM_HEDGE_MIN_DELAY", "1"))
+LLM_HEDGE_DEFAULT_DELAY = float(os.getenv("LLM_HEDGE_DEFAULT_DELAY", "8"))
+LLM_LATENCY_WINDOW = 200
+LLM_LATENCY_MIN_SAMPLES = 20
+LLM_VERTEX_FALLBACK_MODEL = os.getenv("LLM_VERTEX_FALLBACK_MODEL", "gemini/gemini-1.5-pro")
+LLM_LAST_GOOD_TTL = float(os.getenv("LLM_LAST_GOOD_TTL", str(24 * 3600)))  # 0 disables
+# Threads for hedged / timed-out blocking calls (complete()).
+LLM_SYNC_THREADS = int(os.getenv("LLM_SYNC_THREADS", "32"))
+
+
+class ProviderUnavailableError(RuntimeError):
+    """Every attempt for a request failed or was refused by an open circuit."""
+
+
+class CircuitBreaker:
+    """Closed -> open after consecutive failures -> half-open (one probe) -> closed or open again."""
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, failure_threshold: int = LLM_BREAKER_FAILURES, cooldown: float = LLM_BREAKER_COOLDOWN,
+                 clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.clock = clock
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Whether an attempt may start now. In half-open state only one probe is let through."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN:
+                if self.clock() - self.opened_at < self.cooldown:
+                    return False
+                self.state = self.HALF_OPEN
+            if self._probing:
+                return False
+            self._probing = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.state, self.failures, self._probing = self.CLOSED, 0, False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    logger.warning("LLM circuit opened after %d failures", self.failures)
+                self.state, self.opened_at = self.OPEN, self.clock()
+
+    def release(self):
+        """An attempt ended without a verdict (cancelled hedge, client error)."""
+        with self._lock:
+            self._probing = False
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            retry_in = max(self.cooldown - (self.clock() - self.opened_at), 0) if self.state == self.OPEN else 0
+            return {"state": self.state, "failures": self.failures, "retry_in_seconds": round(retry_in, 1)}
+
+
+class LatencyWindow:
+    """Recent successful call latencies, for the hedge delay."""
+
+    def __init__(self, size: int = LLM_LATENCY_WINDOW):
+        self._samples = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def add(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def p95(self) -> Optional[float]:
+        with self._lock:
+            if len(self._samples) < LLM_LATENCY_MIN_SAMPLES:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[int(0.95 * (len(ordered) - 1))]
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_latencies: Dict[str, LatencyWindow] = {}
+_resilience_lock = threading.Lock()
+_sync_pool: Optional[ThreadPoolExecutor] = None
+
+
+def _target(provider: str, model: Optional[str]) -> str:
+    return f"{provider}:{model}"
+
+
+def breaker_for(provider: str, model: Optional[str]) -> CircuitBreaker:
+    target = _target(provider, model)
+    breaker = _breakers.get(target)
+    if breaker is None:
+        with _resilience_lock:
+            breaker = _breakers.setdefault(target, CircuitBreaker())
+    return breaker
+
+
+def latency_for(provider: str, model: Optional[str]) -> LatencyWindow:
+    target = _target(provider, model)
+    window = _latencies.get(target)
+    if window is None:
+        with _resilience_lock:
+            window = _latencies.setdefault(target, LatencyWindow())
+    return window
+
+
+def circuit_states() -> Dict[str, Dict[str, Any]]:
+    """Breaker state and recent p95 latency per provider:model, for the admin API."""
+    states = {}
+    for target, breaker in list(_breakers.items()):
+        window = _latencies.get(target)
+        p95 = window.p95() if window else None
+        states[target] = {**breaker.snapshot(), "p95_seconds": round(p95, 3) if p95 is not None else None}
+    return states
+
+
+def hedge_delay(provider: str, model: Optional[str]) -> float:
+    p95 = latency_for(provider, model).p95()
+    delay = LLM_HEDGE_DEFAULT_DELAY if p95 is None else p95
+    return min(max(delay, LLM_HEDGE_MIN_DELAY), LLM_TIMEOUT_SECONDS)
+
+
+def fallback_for(provider: str, model: Optional[str]) -> Optional[Tuple[str, Optional[str]]]:
+    """(provider name, model) to hedge or fail over to, if any."""
+    if provider == "vertex":
+        return ("litellm", LLM_VERTEX_FALLBACK_MODEL) if LLM_VERTEX_FALLBACK_MODEL else None
+    if provider == "litellm":
+        import litellm
+        for entry in litellm.fallbacks or []:
+            if isinstance(entry, dict) and entry.get(model):
+                return "litellm", entry[model][0]
+    return None
+
+
+def is_provider_fault(error: BaseException) -> bool:
+    """Timeouts, connection errors, 5xx and 429 count against a breaker; other 4xx do not."""
+    status = getattr(error, "status_code", None)
+    return not (isinstance(status, int) and 400 <= status < 500 and status not in (408, 429))
+
+
+def _last_good_cache():
+    from .cache import get_cache
+    return get_cache("llm_last_good", version=1, ttl=LLM_LAST_GOOD_TTL)
+
+
+def _get_sync_pool() -> ThreadPoolExecutor:
+    global _sync_pool
+    if _sync_pool is None:
+        with _resilience_lock:
+            if _sync_pool is None:
+                _sync_pool = ThreadPoolExecutor(LLM_SYNC_THREADS, thread_name_prefix="llm-call")
+    return _sync_pool
+
+
+class ResilientProvider(LLMProvider):
+    """Circuit breakers, per-attempt timeouts, hedging and last-good fallback around a provider."""
+
+    def __init__(self, inner: LLMProvider):
+        self.inner = inner
+        self.name = inner.name
+
+    def resolve_model(self, model: Optional[str]) -> Optional[str]:
+        return self.inner.resolve_model(model)
+
+    def _attempts(self, model: Optional[str]) -> List[Tuple[LLMProvider, Optional[str]]]:
+        attempts = [(self.inner, self.resolve_model(model))]
+        fallback = fallback_for(self.name, attempts[0][1])
+        if fallback is not None:
+            attempts.append((_attempt_provider(fallback[0]), fallback[1]))
+        return attempts
+
+    def _remember(self, key: str, response: str):
+        if LLM_LAST_GOOD_TTL > 0 and response:
+            try:
+                _last_good_cache().set(key, response)
+            except Exception as e:
+                logger.warning("Could not store last good LLM response: %s", e)
+
+    def _degraded(self, key: str, errors: List[BaseException]) -> str:
+        cached = _last_good_cache().get(key) if LLM_LAST_GOOD_TTL > 0 else None
+        if cached:
+            logger.warning("All %s attempts failed; serving the last good response", self.name)
+            return cached
+        error = ProviderUnavailableError(
+            f"{self.name} is unavailable: " + ("; ".join(repr(e) for e in errors) or "all circuits open")
+        )
+        raise error from (errors[-1] if errors else None)
+
+    # Async: attempts are tasks; losers are cancelled.
+
+    async def _acall(self, provider: LLMProvider, model: Optional[str], messages: List[Message],
+                     config: Dict[str, Any]) -> str:
+        breaker, started = breaker_for(provider.name, model), time.perf_counter()
+        try:
+            response = await asyncio.wait_for(provider.acomplete(messages, model, **config), LLM_TIMEOUT_SECONDS)
+        except asyncio.CancelledError:
+            breaker.release()
+            raise
+        except Exception as e:
+            breaker.record_failure() if is_provider_fault(e) else breaker.release()
+            raise
+        breaker.record_success()
+        latency_for(provider.name, model).add(time.perf_counter() - started)
+        return response
+
+    async def acomplete(self, messages: List[Message], model: Optional[str] = None, **config: Any) -> str:
+        attempts = self._attempts(model)
+        key = request_key(self.name, attempts[0][1], messages, config)
+        waiting = list(attempts)  # not started yet, in order
+        running: Dict[asyncio.Task, Tuple[LLMProvider, Optional[str]]] = {}
+        errors: List[BaseException] = []
+
+        def start_next() -> bool:
+            while waiting:
+                provider, attempt_model = waiting.pop(0)
+                if breaker_for(provider.name, attempt_model).allow():
+                    task = asyncio.create_task(self._acall(provider, attempt_model, messages, config))
+                    running[task] = (provider, attempt_model)
+                    return True
+            return False
+
+        start_next()
+        hedge_at = time.monotonic() + hedge_delay(self.name, attempts[0][1]) if LLM_HEDGING else None
+        try:
+            while running or (waiting and start_next()):
+                timeout = max(hedge_at - time.monotonic(), 0) if hedge_at is not None and waiting else None
+                done, _ = await asyncio.wait(running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    # The primary is slower than its p95: hedge.
+                    hedge_at = None
+                    start_next()
+                    continue
+                for task in done:
+                    running.pop(task)
+                    error = task.exception()
+                    if error is None:
+                        response = task.result()
+                        await asyncio.to_thread(self._remember, key, response)
+                        return response
+                    if not is_provider_fault(error):
+                        raise error
+                    errors.append(error)
+                if not running:
+                    start_next()
+        finally:
+            for task in running:
+                task.cancel()
+        return await asyncio.to_thread(self._degraded, key, errors)
+
+    # Sync: attempts run on a thread pool; an attempt past its timeout is abandoned.
+
+    def _call(self, provider: LLMProvider, model: Optional[str], messages: List[Message],
+              config: Dict[str, Any]) -> Tuple[str, float]:
+        started = time.perf_counter()
+        return provider.complete(messages, model, **config), time.perf_counter() - started
+
+    def complete(self, messages: List[Message], model: Optional[str] = None, **config: Any) -> str:
+        attempts = self._attempts(model)
+        key = request_key(self.name, attempts[0][1], messages, config)
+        waiting = list(attempts)
+        running: Dict[Future, Tuple[LLMProvider, Optional[str], float]] = {}  # -> (provider, model, deadline)
+        errors: List[BaseException] = []
+        pool = _get_sync_pool()
+
+        def start_next() -> bool:
+            while waiting:
+                provider, attempt_model = waiting.pop(0)
+                if breaker_for(provider.name, attempt_model).allow():
+                    future = pool.submit(self._call, provider, attempt_model, messages, config)
+                    running[future] = (provider, attempt_model, time.monotonic() + LLM_TIMEOUT_SECONDS)
+                    return True
+            return False
+
+        start_next()
+        hedge_at = time.monotonic() + hedge_delay(self.name, attempts[0][1]) if LLM_HEDGING else None
+        try:
+            while running or (waiting and start_next()):
+                wake = min(deadline for _, _, deadline in running.values())
+                if hedge_at is not None and waiting:
+                    wake = min(wake, hedge_at)
+                done, _ = wait(running, timeout=max(wake - time.monotonic(), 0), return_when=FIRST_COMPLETED)
+                for future in done:
+                    provider, attempt_model, _ = running.pop(future)
+                    breaker = breaker_for(provider.name, attempt_model)
+                    error = future.exception()
+                    if error is None:
+                        response, seconds = future.result()
+                        breaker.record_success()
+                        latency_for(provider.name, attempt_model).add(seconds)
+                        self._remember(key, response)
+                        return response
+                    if not is_provider_fault(error):
+                        breaker.release()
+                        raise error
+                    breaker.record_failure()
+                    errors.append(error)
+                now = time.monotonic()
+                for future, (provider, attempt_model, deadline) in list(running.items()):
+                    if deadline <= now:
+                        # The thread cannot be interrupted; its result is ignored.
+                        running.pop(future)
+                        breaker_for(provider.name, attempt_model).record_failure()
+                        errors.append(TimeoutError(f"{provider.name} {attempt_model} timed out"))
+                if hedge_at is not None and now >= hedge_at:
+                    hedge_at = None
+                    start_next()
+                elif not running:
+                    start_next()
+        finally:
+            for future, (provider, attempt_model, _) in running.items():
+                future.cancel()
+                breaker_for(provider.name, attempt_model).release()
+        return self._degraded(key, errors)
+
+    # Streams are not hedged: the fallback is only tried if no chunk arrived in time.
+
+    async def astream(self, messages: List[Message], model: Optional[str] = None,
+                      **config: Any) -> AsyncIterator[str]:
+        errors: List[BaseException] = []
+        for provider, attempt_model in self._attempts(model):
+            breaker = breaker_for(provider.name, attempt_model)
+            if not breaker.allow():
+                continue
+            stream, started = provider.astream(messages, attempt_model, **config), time.perf_counter()
+            try:
+                first = await asyncio.wait_for(stream.__anext__(), LLM_TIMEOUT_SECONDS)
+            except StopAsyncIteration:
+                breaker.record_success()
+                return
+            except asyncio.CancelledError:
+                breaker.release()
+                raise
+            except Exception as e:
+                await stream.aclose()
+                if not is_provider_fault(e):
+                    breaker.release()
+                    raise
+                breaker.record_failure()
+                errors.append(e)
+                continue
+            breaker.record_success()
+            latency_for(provider.name, attempt_model).add(time.perf_counter() - started)
+            yield first
+            async for chunk in stream:
+                yield chunk
+            return
+        raise ProviderUnavailableError(
+            f"{self.name} is unavailable: " + ("; ".join(repr(e) for e in errors) or "all circuits open")
+        )
+
+
+# --- Provider Registry ---
+
+_base_providers: Dict[str, LLMProvider] = {}
+_attempt_providers: Dict[str, LLMProvider] = {}
+_providers: Dict[str, LLMProvider] = {}
+_store: Optional[CassetteStore] = None
+_registry_lock = threading.Lock()
+
+
+def get_cassette_store() -> CassetteStore:
+    global _store
+    if _store is None:
+        _store = CassetteStore(LLM_CASSETTE_DIR)
+    return _store
+
+
+def _default_provider(name: str) -> LLMProvider:
+    if name == "litellm":
+        return LiteLLMProvider()
+    if name == "vertex":
+        return VertexProvider()
+    raise KeyError(f"Unknown LLM provider: {name}")
+
+
+def _mode_wrap(provider: LLMProvider) -> LLMProvider:
+    if LLM_MODE == "record":
+        provider = RecordingProvider(provider, get_cassette_store())
+    elif LLM_MODE == "replay":
+        provider = ReplayProvider(provider, get_cassette_store())
+    return provider
+
+
+def _wrap(provider: LLMProvider) -> LLMProvider:
+    provider = _mode_wrap(provider)
+    if LLM_MODE != "replay":
+        provider = ResilientProvider(provider)
+    return TimedProvider(provider)
+
+
+def _attempt_provider(name: str) -> LLMProvider:
+    """`name` wrapped for LLM_MODE only: what ResilientProvider hedges and fails over to."""
+    provider = _attempt_providers.get(name)
+    if provider is None:
+        with _registry_lock:
+            provider = _attempt_providers.get(name)
+            if provider is None:
+                base = _base_providers.setdefault(name, _default_provider(name))
+                provider = _attempt_providers[name] = _mode_wrap(base)
+    return provider
+
+
+def register_provider(name: str, provider: LLMProvider):
+    """Replaces the underlying provider for `name` (used by fakes and benchmarks)."""
+    with _registry_lock:
+        _base_providers[name] = provider
+        _providers.pop(name, None)
+        _attempt_providers.pop(name, None)
+
+
+def get_provider(name: str) -> LLMProvider:
+    """Returns the provider for `name`, wrapped for the active LLM_MODE."""
+    provider = _providers.get(name)
+    if provider is None:
+        with _registry_lock:
+            provider = _providers.get(name)
+            if provider is None:
+                base = _base_providers.setdefault(name, _default_provider(name))
+                provider = _providers[name] = _wrap(base)
+    return provider
@@ -0,0 +1,295 @@
+import asyncio
+import os
+import time
+import uuid
+import weakref
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Dict, List, Optional
+
+from .cache import get_cache
+from .vertex_ai_service import vertex_ai_service
+
+# --- Mock Interview Sessions ---
+# A mock interview asks `total` questions for one role, one at a time. Before,
+# the client fetched the next question only after feedback for the current
+# answer came back, so every step waited for two model calls. The session now
+# keeps a buffer of upcoming questions that a background task tops up to
+# MOCK_PREFETCH_DEPTH while the user is typing. Moving to the next question is
+# then a buffer pop, and each step only waits for the feedback call.
+#
+# Session state (asked questions and the buffer) lives in the shared cache, so
+# any worker can serve the next step. It skips the workers' local cache tier,
+# and every change is an atomic compare-and-set (Cache.update), so two workers
+# cannot both apply a step: an answer is claimed for grading exactly once.
+# Buffered questions expire after MOCK_QUESTION_TTL and sessions after
+# MOCK_INTERVIEW_TTL of inactivity.
+MOCK_INTERVIEW_TTL = float(os.getenv("MOCK_INTERVIEW_TTL", str(2 * 3600)))
+MOCK_QUESTION_TTL = float(os.getenv("MOCK_QUESTION_TTL", "1800"))
+MOCK_PREFETCH_DEPTH = int(os.getenv("MOCK_PREFETCH_DEPTH", "2"))
+# Questions requested per background call; one call returning several is cheaper than several calls.
+MOCK_PREFETCH_BATCH = int(os.getenv("MOCK_PREFETCH_BATCH", "4"))
+# How long an answer being graded holds the current question. Grading normally
+# takes seconds; the expiry only frees questions whose worker died mid-grade.
+MOCK_ANSWER_CLAIM_TTL = float(os.getenv("MOCK_ANSWER_CLAIM_TTL", "120"))
+
+sessions_cache = get_cache("mock_interviews", version=1, ttl=MOCK_INTERVIEW_TTL, local=False)
+
+
+class MockInterviewNotFound(LookupError):
+    """No live mock interview with this id for this user."""
+
+
+class QuestionsUnavailable(RuntimeError):
+    """The model returned no usable question."""
+
+
+class AnswerInProgress(RuntimeError):
+    """The question is already answered or another answer to it is being graded."""
+
+
+@dataclass
+class MockInterview:
+    session_id: str
+    user_id: int
+    role: str
+    total: int
+    # Questions handed out so far, in order; the last one is current until answered.
+    asked: List[str] = field(default_factory=list)
+    answered: int = 0
+    # Upcoming questions as [question, expires_at] pairs, oldest first.
+    buffer: List[list] = field(default_factory=list)
+    # Until when an answer to the current question is being graded (0: none).
+    answering_until: float = 0.0
+
+    @property
+    def current(self) -> Optional[str]:
+        return self.asked[-1] if len(self.asked) > self.answered else None
+
+    @property
+    def finished(self) -> bool:
+        return self.answered >= self.total
+
+    @property
+    def remaining(self) -> int:
+        """Questions still to fetch: not asked and not buffered."""
+        return self.total - len(self.asked) - len(self.buffer)
+
+    def drop_expired(self, now: float):
+        self.buffer = [entry for entry in self.buffer if entry[1] > now]
+
+    def wants_prefetch(self) -> bool:
+        return self.remaining > 0 and len(self.buffer) < MOCK_PREFETCH_DEPTH
+
+
+# Per-worker coordination, so one worker does not ask the model twice for the
+# same missing question; correctness comes from the atomic updates. A lock lives
+# while someone holds it, so abandoned sessions leave nothing behind.
+_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+_prefetches: Dict[str, asyncio.Task] = {}
+
+
+def _lock(session_id: str) -> asyncio.Lock:
+    lock = _locks.get(session_id)
+    if lock is None:
+        lock = _locks[session_id] = asyncio.Lock()
+    return lock
+
+
+async def _load(session_id: str, user_id: int) -> MockInterview:
+    data = await asyncio.to_thread(sessions_cache.get, session_id)
+    if data is None or data["user_id"] != user_id:
+        raise MockInterviewNotFound(session_id)
+    return MockInterview(**data)
+
+
+async def _save(interview: MockInterview):
+    await asyncio.to_thread(sessions_cache.set, interview.session_id, asdict(interview))
+
+
+async def _update(session_id: str, user_id: int, change: Callable[[MockInterview], None]) -> MockInterview:
+    """
+    Applies `change` to the latest shared state in one atomic step and returns
+    the result. `change` edits the session in place; it runs again if another
+    worker changed the session first, and an exception from it aborts the update.
+    """
+    def apply(data):
+        if data is None or data["user_id"] != user_id:
+            raise MockInterviewNotFound(session_id)
+        interview = MockInterview(**data)
+        change(interview)
+        return asdict(interview)
+
+    return MockInterview(**await asyncio.to_thread(sessions_cache.update, session_id, apply))
+
+
+def _normalize(question: str) -> str:
+    return " ".join(question.lower().split())
+
+
+async def _generate(interview: MockInterview, count: int) -> List[str]:
+    """`count` new questions for the interview's role, skipping ones already asked or buffered."""
+    questions = await vertex_ai_service.generate_interview_questions(interview.role, count)
+    seen = {_normalize(q) for q in interview.asked} | {_normalize(q) for q, _ in interview.buffer}
+    fresh = []
+    for question in questions:
+        key = _normalize(question)
+        if key and key not in seen:
+            seen.add(key)
+            fresh.append(question)
+    return fresh
+
+
+def _append(interview: MockInterview, questions: List[str]):
+    expires_at = time.time() + MOCK_QUESTION_TTL
+    interview.buffer.extend([question, expires_at] for question in questions[:max(interview.remaining, 0)])
+
+
+async def _refill(session_id: str, user_id: int):
+    interview = await _load(session_id, user_id)
+    interview.drop_expired(time.time())
+    if not interview.wants_prefetch():
+        return
+    count = min(max(MOCK_PREFETCH_DEPTH - len(interview.buffer), MOCK_PREFETCH_BATCH), interview.remaining)
+    questions = await _generate(interview, count)
+
+    def store(interview: MockInterview):
+        # Applied to the latest state: the user may have moved on while the model was generating.
+        interview.drop_expired(time.time())
+        _append(interview, questions)
+
+    await _update(session_id, user_id, store)
+
+
+def prefetch(interview: MockInterview) -> Optional[asyncio.Task]:
+    """Starts topping up the buffer in the background, unless it is full or already being filled."""
+    task = _prefetches.get(interview.session_id)
+    if task is not None and not task.done():
+        return task
+    if not interview.wants_prefetch():
+        return None
+    task = asyncio.create_task(_refill(interview.session_id, interview.user_id))
+    _prefetches[interview.session_id] = task
+
+    def done(task: asyncio.Task):
+        _prefetches.pop(interview.session_id, None)
+        if not task.cancelled() and task.exception() is not None:
+            print(f"Mock interview prefetch failed for {interview.session_id}: {task.exception()}")
+
+    task.add_done_callback(done)
+    return task
+
+
+async def _await_prefetch(session_id: str, user_id: int):
+    """If the buffer is empty but this worker is filling it, waits for that instead of a second model call."""
+    task = _prefetches.get(session_id)
+    if task is None:
+        return
+    interview = await _load(session_id, user_id)
+    interview.drop_expired(time.time())
+    if not interview.buffer:
+        await asyncio.wait({task})
+
+
+def _hand_out(interview: MockInterview):
+    """Moves the next buffered question to `asked` when no question is current."""
+    interview.drop_expired(time.time())
+    if interview.current is None and not interview.finished and interview.buffer:
+        interview.asked.append(interview.buffer.pop(0)[0])
+
+
+async def _next_question(interview: MockInterview) -> MockInterview:
+    """
+    Hands out the next question when none is current, generating some first if
+    the buffer is empty. Raises QuestionsUnavailable if none could be generated.
+    """
+    async with _lock(interview.session_id):
+        interview = await _update(interview.session_id, interview.user_id, _hand_out)
+        if interview.current is not None or interview.finished:
+            return interview
+        questions = await _generate(interview, min(MOCK_PREFETCH_BATCH, interview.remaining))
+
+        def store(interview: MockInterview):
+            _append(interview, questions)
+            _hand_out(interview)
+
+        interview = await _update(interview.session_id, interview.user_id, store)
+    if interview.current is None and not interview.finished:
+        raise QuestionsUnavailable(interview.role)
+    return interview
+
+
+async def start(user_id: int, role: str, total: int) -> MockInterview:
+    """Creates a session and returns it with its first question ready."""
+    interview = MockInterview(session_id=uuid.uuid4().hex, user_id=user_id, role=role.strip(), total=total)
+    # One call for the first question and the prefetch depth behind it.
+    _append(interview, await _generate(interview, min(total, 1 + MOCK_PREFETCH_DEPTH)))
+    if not interview.buffer:
+        _append(interview, await _generate(interview, min(MOCK_PREFETCH_BATCH, total)))
+    _hand_out(interview)
+    if interview.current is None:
+        raise QuestionsUnavailable(interview.role)
+    # A new id: nobody else can be writing this session yet.
+    await _save(interview)
+    prefetch(interview)
+    return interview
+
+
+async def get(session_id: str, user_id: int) -> MockInterview:
+    interview = await _load(session_id, user_id)
+    if interview.current is None and not interview.finished:
+        # A previous step could not get its next question: try again now.
+        await _await_prefetch(session_id, user_id)
+        interview = await _next_question(interview)
+    prefetch(interview)
+    return interview
+
+
+async def claim(interview: MockInterview, question: str) -> MockInterview:
+    """
+    Reserves `question` for one answer before it is graded, so a double submit
+    is not graded, saved and counted twice, whichever workers it lands on.
+    Raises AnswerInProgress if the question is no longer current or another
+    answer already holds it.
+    """
+    def take(interview: MockInterview):
+        now = time.time()
+        if interview.current != question or interview.answering_until > now:
+            raise AnswerInProgress(interview.session_id)
+        interview.answering_until = now + MOCK_ANSWER_CLAIM_TTL
+
+    return await _update(interview.session_id, interview.user_id, take)
+
+
+async def release(interview: MockInterview, question: str):
+    """Gives up a claim on `question` whose answer could not be graded or saved."""
+    def give_up(interview: MockInterview):
+        if interview.current == question:
+            interview.answering_until = 0.0
+
+    try:
+        await _update(interview.session_id, interview.user_id, give_up)
+    except MockInterviewNotFound:
+        pass
+
+
+async def advance(interview: MockInterview, question: str) -> MockInterview:
+    """
+    Marks `question` answered and hands out the next one (normally straight
+    from the buffer). Returns the updated session; a no-op if `question` is
+    no longer the current one.
+    """
+    await _await_prefetch(interview.session_id, interview.user_id)
+
+    def answer(interview: MockInterview):
+        if interview.current != question:
+            return
+        interview.answered += 1
+        interview.answering_until = 0.0
+        _hand_out(interview)
+
+    interview = await _update(interview.session_id, interview.user_id, answer)
+    if interview.current is None and not interview.finished:
+        # The answer counts; if this fails, `get` hands out the next question later.
+        interview = await _next_question(interview)
+    prefetch(interview)
+    return interview
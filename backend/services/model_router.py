@@ -0,0 +1,253 @@
+import os
+import random
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from . import prompts
+from .llm_provider import LatencyWindow, Message, breaker_for, get_provider, latency_for
+
+# --- Model Routing ---
+# Every call used to go to one fixed model per provider: the global litellm model,
+# gemini-pro for the registered prompts and chat, gemini-1.5-pro for everything on
+# Vertex, down to one-line market lookups. Calls now name their task (the prompt)
+# and the router picks a tier per call:
+#
+#   heavy task and a pro user                          -> large
+#   heavy task and >= LLM_ROUTE_LARGE_INPUT_TOKENS in  -> large
+#   anything else                                      -> small
+#
+# The chosen model is then checked against its tier's latency SLO: when its recent
+# p95 (measured by the resilience layer) is over the SLO, or its breaker is open,
+# the call moves to the other tier if that one is healthy. LLM_ROUTE_PROBE_RATE of
+# those calls still go to the slow model so its p95 can recover. Decisions and
+# per-model outcomes are listed at /api/admin/llm/routing. LLM_ROUTING=0 restores
+# the fixed models.
+LLM_ROUTING = os.getenv("LLM_ROUTING", "1") == "1"
+MODEL_TIERS = {
+    "litellm": {
+        "small": os.getenv("LLM_SMALL_MODEL", "openai/gpt-4o-mini"),
+        "large": os.getenv("LLM_LARGE_MODEL", "openai/gpt-4o"),
+    },
+    "vertex": {
+        "small": os.getenv("VERTEX_SMALL_MODEL", "gemini-1.5-flash"),
+        "large": os.getenv("VERTEX_LARGE_MODEL", "gemini-1.5-pro"),
+    },
+}
+# Tasks where answer quality is the product; short lookups and summaries are not.
+HEAVY_TASKS = {"career_path", "career_advice", "interview_evaluation", "resume_review",
+               "resume_section_review", "chat"}
+LLM_ROUTE_LARGE_INPUT_TOKENS = int(os.getenv("LLM_ROUTE_LARGE_INPUT_TOKENS", "3000"))
+TIER_SLO_SECONDS = {
+    "small": float(os.getenv("LLM_SLO_SMALL_SECONDS", "6")),
+    "large": float(os.getenv("LLM_SLO_LARGE_SECONDS", "20")),
+}
+LLM_ROUTE_PROBE_RATE = float(os.getenv("LLM_ROUTE_PROBE_RATE", "0.05"))
+
+_OTHER_TIER = {"small": "large", "large": "small"}
+
+
+@dataclass(frozen=True)
+class RouteDecision:
+    provider: str
+    task: str
+    tier: str
+    model: Optional[str]
+    reason: str
+
+
+# --- Request Context ---
+
+_request_scope: ContextVar[Optional[dict]] = ContextVar("routing_request_scope", default=None)
+
+
+def request_role() -> Optional[str]:
+    """`role` claim of the current request's bearer token, if it is valid."""
+    scope = _request_scope.get()
+    if scope is None:
+        return None
+    from ..utils.security import request_claims
+    claims = request_claims(scope)
+    return claims.get("role") if claims else None
+
+
+class ModelRoutingMiddleware:
+    """ASGI middleware that keeps the request's scope for routing by user tier."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        # Only kept here; the token is verified if and when a model call needs the role
+        # (once per request, shared with the other middlewares: see security.request_claims).
+        token = _request_scope.set(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _request_scope.reset(token)
+
+
+# --- Metrics ---
+
+class _Outcome:
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.seconds = 0.0
+        self.latencies = LatencyWindow()
+
+    def snapshot(self) -> Dict[str, Any]:
+        p95 = self.latencies.p95()
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "mean_seconds": round(self.seconds / self.calls, 3) if self.calls else None,
+            "p95_seconds": round(p95, 3) if p95 is not None else None,
+        }
+
+
+_decisions: Dict[Tuple[str, str, str, Optional[str], str], int] = {}
+_outcomes: Dict[Tuple[str, Optional[str]], _Outcome] = {}
+_metrics_lock = threading.Lock()
+
+
+def _record_decision(decision: RouteDecision):
+    key = (decision.provider, decision.task, decision.tier, decision.model, decision.reason)
+    with _metrics_lock:
+        _decisions[key] = _decisions.get(key, 0) + 1
+
+
+def _record_outcome(decision: RouteDecision, seconds: float, failed: bool = False):
+    with _metrics_lock:
+        outcome = _outcomes.get((decision.provider, decision.model))
+        if outcome is None:
+            outcome = _outcomes[(decision.provider, decision.model)] = _Outcome()
+        outcome.calls += 1
+        outcome.errors += failed
+        outcome.seconds += seconds
+    if not failed:
+        outcome.latencies.add(seconds)
+
+
+def routing_stats() -> Dict[str, Any]:
+    """Decision counts and end-to-end outcomes per model, for the admin API."""
+    with _metrics_lock:
+        decisions = [
+            {"provider": provider, "task": task, "tier": tier, "model": model, "reason": reason, "count": count}
+            for (provider, task, tier, model, reason), count in sorted(_decisions.items(), key=str)
+        ]
+        outcomes = dict(_outcomes)
+    return {
+        "enabled": LLM_ROUTING,
+        "tiers": MODEL_TIERS,
+        "slo_seconds": TIER_SLO_SECONDS,
+        "decisions": decisions,
+        "outcomes": {f"{provider}:{model}": outcome.snapshot()
+                     for (provider, model), outcome in sorted(outcomes.items(), key=str)},
+    }
+
+
+# --- Routing ---
+
+def _healthy(provider: str, model: str, slo: float) -> bool:
+    """False while the model's breaker is open or its recent p95 is over `slo`."""
+    if breaker_for(provider, model).snapshot()["retry_in_seconds"] > 0:
+        return False
+    p95 = latency_for(provider, model).p95()
+    return p95 is None or p95 <= slo
+
+
+def input_tokens(messages: List[Message]) -> int:
+    return sum(prompts.estimate_tokens(m["content"]) for m in messages if isinstance(m.get("content"), str))
+
+
+def choose(provider: str, task: str, tokens: int, default_model: Optional[str] = None,
+           role: Optional[str] = None) -> RouteDecision:
+    """
+    Picks the model for one call of `task` with `tokens` of input.
+
+    `role` defaults to the current request's user role; `default_model` is used
+    when routing is off or the provider has no tiers.
+    """
+    tiers = MODEL_TIERS.get(provider)
+    if not LLM_ROUTING or tiers is None:
+        decision = RouteDecision(provider, task, "fixed", default_model, "routing_off")
+        _record_decision(decision)
+        return decision
+
+    role = role if role is not None else request_role()
+    if task in HEAVY_TASKS and role == "pro":
+        tier, reason = "large", "pro_heavy"
+    elif task in HEAVY_TASKS and tokens >= LLM_ROUTE_LARGE_INPUT_TOKENS:
+        tier, reason = "large", "large_input"
+    else:
+        tier, reason = "small", "small_request"
+
+    slo = TIER_SLO_SECONDS[tier]
+    if not _healthy(provider, tiers[tier], slo) and random.random() >= LLM_ROUTE_PROBE_RATE:
+        other = _OTHER_TIER[tier]
+        if _healthy(provider, tiers[other], slo):
+            tier, reason = other, "slo_shift"
+
+    decision = RouteDecision(provider, task, tier, tiers[tier], reason)
+    _record_decision(decision)
+    return decision
+
+
+def cache_tag(provider: str, tokens: int = 0, task: str = "") -> str:
+    """
+    The model a cached answer for `task` would come from without SLO shifts, so
+    caches keyed by model do not serve small-model answers to pro users.
+    """
+    tiers = MODEL_TIERS.get(provider)
+    if not LLM_ROUTING or tiers is None:
+        return ""
+    role = request_role()
+    large = task in HEAVY_TASKS and (role == "pro" or tokens >= LLM_ROUTE_LARGE_INPUT_TOKENS)
+    return tiers["large" if large else "small"]
+
+
+# --- Routed Calls ---
+
+def complete(provider: str, task: str, messages: List[Message], *, tokens: Optional[int] = None,
+             default_model: Optional[str] = None, **config: Any) -> str:
+    decision = choose(provider, task, input_tokens(messages) if tokens is None else tokens, default_model)
+    started = time.perf_counter()
+    try:
+        reply = get_provider(provider).complete(messages, model=decision.model, **config)
+    except Exception:
+        _record_outcome(decision, time.perf_counter() - started, failed=True)
+        raise
+    _record_outcome(decision, time.perf_counter() - started)
+    return reply
+
+
+async def acomplete(provider: str, task: str, messages: List[Message], *, tokens: Optional[int] = None,
+                    default_model: Optional[str] = None, **config: Any) -> str:
+    decision = choose(provider, task, input_tokens(messages) if tokens is None else tokens, default_model)
+    started = time.perf_counter()
+    try:
+        reply = await get_provider(provider).acomplete(messages, model=decision.model, **config)
+    except Exception:
+        _record_outcome(decision, time.perf_counter() - started, failed=True)
+        raise
+    _record_outcome(decision, time.perf_counter() - started)
+    return reply
+
+
+async def astream(provider: str, task: str, messages: List[Message], *, tokens: Optional[int] = None,
+                  default_model: Optional[str] = None, **config: Any) -> AsyncIterator[str]:
+    decision = choose(provider, task, input_tokens(messages) if tokens is None else tokens, default_model)
+    started = time.perf_counter()
+    try:
+        async for chunk in get_provider(provider).astream(messages, model=decision.model, **config):
+            yield chunk
+    except Exception:
+        _record_outcome(decision, time.perf_counter() - started, failed=True)
+        raise
+    _record_outcome(decision, time.perf_counter() - started)
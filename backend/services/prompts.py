@@ -0,0 +1,422 @@
+import math
+import re
+import string
+import textwrap
+from dataclasses import dataclass
+from collections import Counter
+from typing import Dict, List, Tuple
+
+# --- Prompt Registry ---
+# All model prompts live here. Templates are compiled once at import time,
+# rendered with cheap str.format calls, and every render is checked against a
+# per-endpoint input token budget. Oversized inputs (e.g. a pasted resume) are
+# truncated before they ever reach the provider, and the output budget is
+# passed along as max_tokens.
+
+try:
+    import tiktoken
+    _ENCODING = tiktoken.get_encoding("cl100k_base")
+except Exception:  # tiktoken is optional; fall back to a character heuristic
+    _ENCODING = None
+
+# Average characters per token for English prose; used when tiktoken is missing.
+CHARS_PER_TOKEN = 4
+
+_BLANK_RUNS = re.compile(r"\n{3,}")
+_SPACE_RUNS = re.compile(r"[ \t]{2,}")
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimates how many tokens `text` will cost."""
+    if not text:
+        return 0
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text, disallowed_special=()))
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def normalize_whitespace(text: str) -> str:
+    """Collapses the blank lines and padding that pasted documents are full of."""
+    text = _SPACE_RUNS.sub(" ", text.replace("\r\n", "\n"))
+    return _BLANK_RUNS.sub("\n\n", text).strip()
+
+
+def truncate_to_tokens(text: str, max_tokens: int, head_ratio: float = 0.7) -> str:
+    """
+    Shortens `text` to roughly `max_tokens`, keeping the beginning and the end.
+
+    The cut happens on line boundaries and is marked in the text, so the model
+    knows content was omitted. The head gets most of the budget because that is
+    where resumes and answers put their most important content.
+    """
+    if max_tokens <= 0:
+        return ""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+
+    marker = "\n[... {} lines omitted for length ...]\n"
+    budget_chars = max(max_tokens * CHARS_PER_TOKEN - len(marker), 0)
+    head_chars = int(budget_chars * head_ratio)
+    tail_chars = budget_chars - head_chars
+
+    lines = text.split("\n")
+    head, used = [], 0
+    for line in lines:
+        if used + len(line) + 1 > head_chars:
+            break
+        head.append(line)
+        used += len(line) + 1
+    tail, used = [], 0
+    for line in reversed(lines[len(head):]):
+        if used + len(line) + 1 > tail_chars:
+            break
+        tail.append(line)
+        used += len(line) + 1
+    tail.reverse()
+
+    if not head and not tail:
+        # A single enormous line: fall back to a plain character cut.
+        return text[:head_chars] + marker.format(1) + (text[-tail_chars:] if tail_chars else "")
+    omitted = len(lines) - len(head) - len(tail)
+    return "\n".join(head) + marker.format(omitted) + "\n".join(tail)
+
+
+@dataclass
+class RenderedPrompt:
+    messages: List[Dict[str, str]]
+    input_tokens: int
+    max_tokens: int
+    truncated: bool
+    # Canned reply served when every LLM provider is unavailable ("" if none).
+    degraded: str = ""
+
+
+class PromptTemplate:
+    """
+    A compiled prompt: a fixed system instruction plus a user template.
+
+    Args:
+        name: Registry key, also used as the endpoint name for budgets.
+        system: System instruction, sent exactly once as the system message.
+        user: str.format template for the user message.
+        max_input_tokens: Budget for the whole rendered prompt.
+        max_output_tokens: Passed to the provider as max_tokens.
+        truncatable: Variables that may be shortened to fit the budget, in the
+            order they should be shortened.
+        degraded: Optional str.format template for a precomputed reply, used
+            when every provider is unavailable (see llm_provider Resilience).
+    """
+
+    def __init__(self, name: str, system: str, user: str, max_input_tokens: int,
+                 max_output_tokens: int, truncatable: Tuple[str, ...] = (), degraded: str = ""):
+        self.name = name
+        self.system = textwrap.dedent(system).strip()
+        self.user = textwrap.dedent(user).strip()
+        self.max_input_tokens = max_input_tokens
+        self.max_output_tokens = max_output_tokens
+        self.truncatable = truncatable
+        self.degraded = textwrap.dedent(degraded).strip()
+
+        # Field -> number of occurrences, so a variable used twice is costed twice.
+        self.fields = Counter(f for _, f, _, _ in string.Formatter().parse(self.user) if f)
+        unknown = set(truncatable) - self.fields.keys()
+        if unknown:
+            raise ValueError(f"Prompt {name!r} cannot truncate unknown fields: {sorted(unknown)}")
+        # Cost of everything except the variables, computed once.
+        self._fixed_tokens = estimate_tokens(self.system) + estimate_tokens(
+            self.user.format(**{f: "" for f in self.fields})
+        )
+
+    def render(self, **variables) -> RenderedPrompt:
+        missing = self.fields.keys() - variables.keys()
+        if missing:
+            raise KeyError(f"Prompt {self.name!r} is missing variables: {sorted(missing)}")
+        values = {k: str(v) for k, v in variables.items()}
+        for field in self.truncatable:
+            values[field] = normalize_whitespace(values[field])
+
+        costs = {k: estimate_tokens(values[k]) * n for k, n in self.fields.items()}
+        total = self._fixed_tokens + sum(costs.values())
+        truncated = False
+        for field in self.truncatable:
+            if total <= self.max_input_tokens:
+                break
+            uses = self.fields[field]
+            allowed = max(costs[field] - (total - self.max_input_tokens), 0) // uses
+            values[field] = truncate_to_tokens(values[field], allowed)
+            new_cost = estimate_tokens(values[field]) * uses
+            total += new_cost - costs[field]
+            costs[field] = new_cost
+            truncated = True
+
+        messages = []
+        if self.system:
+            messages.append({"role": "system", "content": self.system})
+        messages.append({"role": "user", "content": self.user.format(**values)})
+        degraded = self.degraded.format(**values) if self.degraded else ""
+        return RenderedPrompt(messages, total, self.max_output_tokens, truncated, degraded)
+
+
+PROMPTS: Dict[str, PromptTemplate] = {}
+
+
+def register(template: PromptTemplate) -> PromptTemplate:
+    PROMPTS[template.name] = template
+    return template
+
+
+def render(name: str, **variables) -> RenderedPrompt:
+    """Renders the registered prompt `name`."""
+    return PROMPTS[name].render(**variables)
+
+
+# --- Registered Prompts ---
+
+register(PromptTemplate(
+    name="career_path",
+    system="You are an expert career coach providing structured career advice.",
+    user="""
+        A user wants to become a '{job_title}'.
+        Provide a clear, encouraging, and structured career roadmap for them.
+        The response must be in Markdown format and include these three sections exactly as titled below:
+
+        ### 🚀 Potential Career Path
+        List 3-5 potential roles, starting from an entry-level position and progressing upwards.
+
+        ### 🔧 Key Skills to Master
+        List 5-7 crucial technical and soft skills required for a '{job_title}'. Briefly explain why each is important.
+
+        ### 🤔 Sample Interview Questions
+        Provide 3 insightful interview questions for a '{job_title}' role: one behavioral, one technical, and one situational.
+    """,
+    max_input_tokens=400,
+    max_output_tokens=1200,
+    truncatable=("job_title",),
+))
+
+register(PromptTemplate(
+    name="interview_feedback",
+    system="You are a friendly but professional FAANG interviewer providing constructive feedback.",
+    user="""
+        A candidate was asked the following question:
+        **Question:** "{question}"
+
+        Here is their answer:
+        **Answer:** "{user_answer}"
+
+        Please provide constructive feedback on their answer in Markdown format. The feedback should include:
+        1.  **Overall Impression:** A brief summary of how they did.
+        2.  **Strengths:** 2-3 bullet points on what was good about their answer.
+        3.  **Areas for Improvement:** 2-3 bullet points with specific, actionable advice on how they could make their answer better.
+        Keep the tone encouraging and helpful.
+    """,
+    max_input_tokens=2000,
+    max_output_tokens=800,
+    truncatable=("user_answer", "question"),
+))
+
+register(PromptTemplate(
+    name="interview_evaluation",
+    system=(
+        "You are a friendly but professional FAANG interviewer. You grade interview answers "
+        "and reply with a single JSON object only."
+    ),
+    user="""
+        Grade the following interview answer.
+        **Question:** "{question}"
+        **Answer:** "{user_answer}"
+
+        Return exactly this JSON object, with no Markdown fences or extra text:
+        {{
+          "score": <number from 0 to 10; 5 is an average answer, 8+ is a strong hire signal>,
+          "strengths": [<2-3 short strings on what was good>],
+          "improvements": [<2-3 short, specific, actionable strings>],
+          "feedback": "<2-3 encouraging sentences in Markdown summarizing how they did>"
+        }}
+    """,
+    max_input_tokens=2000,
+    max_output_tokens=500,
+    truncatable=("user_answer", "question"),
+))
+
+register(PromptTemplate(
+    name="career_advice",
+    system="You are a career counselor providing personalized advice.",
+    user="""
+        Based on the following user profile, provide personalized career advice:
+
+        Profile: {user_profile}
+
+        Provide comprehensive career advice including:
+        1. Career path recommendations
+        2. Skill development suggestions
+        3. Industry trends to watch
+        4. Networking opportunities
+        5. Short-term and long-term goals
+    """,
+    max_input_tokens=2500,
+    max_output_tokens=1500,
+    truncatable=("user_profile",),
+    degraded="""
+        Our AI advisor is temporarily unavailable, so here is some general guidance in the meantime:
+        1. **Career path:** Pick one target role and study a few job postings for it closely.
+        2. **Skills:** Build the two or three skills those postings ask for most, through small projects.
+        3. **Industry trends:** Follow engineering blogs and communities in your target field.
+        4. **Networking:** Connect with alumni and attend local meetups or online events.
+        5. **Goals:** Set a 3-month learning goal and a 1-year role goal, and review them monthly.
+
+        Please try again later for advice tailored to your profile.
+    """,
+))
+
+RESUME_COACH_SYSTEM = """
+    You are an expert career coach and recruiter specializing in helping students from Tier 2/3 colleges land jobs at top companies.
+    Your feedback must be constructive, encouraging, and highly actionable.
+    Analyze the resume for ATS compatibility, impact metrics, action verbs, and clarity.
+    Provide feedback in simple markdown format.
+"""
+
+register(PromptTemplate(
+    name="resume_review",
+    system=RESUME_COACH_SYSTEM,
+    user="""
+        Please review the following resume for a student from a {college_tier} college.
+        Their self-identified character profile on CareerBridge is "{character_profile}".
+        Their target skills are: {skills}.
+
+        Resume Text:
+        ---
+        {resume_text}
+        ---
+
+        Provide a review with the following structure:
+        ### Overall Impression
+        (A brief, encouraging summary)
+
+        ### ATS Compatibility Score: [Give a score out of 10]
+        (Briefly explain why, mentioning keywords and formatting)
+
+        ### Actionable Feedback (Bulleted List)
+        - Point 1
+        - Point 2
+        - Point 3
+    """,
+    max_input_tokens=3500,
+    max_output_tokens=1500,
+    truncatable=("resume_text", "skills"),
+))
+
+# Map step of the chunked resume pipeline (see resume_service): one section at a time.
+register(PromptTemplate(
+    name="resume_section_review",
+    system=RESUME_COACH_SYSTEM,
+    user="""
+        Below is only the "{section}" section of a resume from a student at a {college_tier} college.
+        Their self-identified character profile on CareerBridge is "{character_profile}".
+        Their target skills are: {skills}.
+
+        Section Text:
+        ---
+        {section_text}
+        ---
+
+        Review this section on its own and answer with exactly this structure:
+        ### Section Summary
+        (One or two sentences)
+
+        ### Section Score: [Give a score out of 10]
+
+        ### Actionable Feedback
+        - Point 1
+        - Point 2
+    """,
+    max_input_tokens=1500,
+    max_output_tokens=400,
+    truncatable=("section_text", "skills"),
+))
+
+register(PromptTemplate(
+    name="interview_questions",
+    system="",
+    user="""
+        Generate {count} interview questions for the role of {role} in a professional setting.
+        Number them 1-{count} and make each question on a new line.
+        Focus on behavioral, technical, and situational questions appropriate for this role.
+    """,
+    max_input_tokens=200,
+    max_output_tokens=1024,
+    truncatable=("role",),
+    degraded="""
+        1. Tell me about yourself and why you are interested in this {role} role.
+        2. Describe a project you are proud of and the part you personally owned.
+        3. Tell me about a time you had to learn a new technology or skill quickly.
+        4. How do you approach a problem you have never seen before?
+        5. Describe a disagreement with a teammate and how you resolved it.
+        6. Walk me through how you would debug something that works locally but fails in production.
+        7. Tell me about a mistake you made and what you learned from it.
+        8. Where do you see yourself growing in a {role} position over the next two years?
+    """,
+))
+
+register(PromptTemplate(
+    name="job_market",
+    system="",
+    user="""
+        Analyze the current job market for the following skills: {skills}
+        Location: {location}
+
+        Provide analysis in the following JSON format:
+        {{
+            "demand_level": "High/Medium/Low",
+            "salary_range": "approximate range",
+            "top_companies": ["company1", "company2", "company3"],
+            "emerging_trends": ["trend1", "trend2", "trend3"],
+            "recommendations": ["rec1", "rec2", "rec3"]
+        }}
+    """,
+    max_input_tokens=400,
+    max_output_tokens=600,
+    truncatable=("skills",),
+    degraded="""
+        {{
+            "demand_level": "Unknown",
+            "salary_range": "Varies by role and experience",
+            "top_companies": [],
+            "emerging_trends": [],
+            "recommendations": ["Continuous learning", "Build portfolio", "Network actively"],
+            "degraded": true
+        }}
+    """,
+))
+
+# --- Chat ---
+# Chat prompts are assembled per turn by services/chat_service.py. The system
+# instruction below and the user's profile block come first and only change
+# when the profile does, so providers can reuse the cached prefix every turn.
+
+CHAT_SYSTEM = textwrap.dedent("""
+    You are the CareerBridge assistant, a friendly career mentor for students from Tier 2/3 colleges in India.
+    Help with career planning, resumes, interview preparation, skills and job search.
+    Keep answers concise, practical and specific to the student's profile. Use simple Markdown.
+    If a question is unrelated to careers or learning, politely steer the conversation back.
+""").strip()
+
+register(PromptTemplate(
+    name="chat_summary",
+    system="You maintain short running summaries of career-coaching conversations.",
+    user="""
+        Summarize the conversation so far for the assistant's memory.
+        Merge the previous summary with the new messages. Keep facts about the student
+        (goals, target roles, skills, deadlines, decisions) and any advice already given.
+        Drop greetings and small talk. Write at most 150 words in plain prose.
+
+        Previous summary:
+        {summary}
+
+        New messages:
+        {transcript}
+    """,
+    max_input_tokens=3000,
+    max_output_tokens=300,
+    truncatable=("transcript", "summary"),
+))
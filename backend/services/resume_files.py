@@ -0,0 +1,181 @@
+import asyncio
+import hashlib
+import os
+import re
+import threading
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Optional, Tuple
+
+# --- Resume File Handling ---
+# Uploaded resumes are streamed to disk in chunks while being hashed, stored
+# content-addressed (<dir>/<sha256[:2]>/<sha256>.<ext>), and parsed to text in a
+# process pool so PDF/DOCX parsing never runs on the event loop. The SHA-256 is
+# the dedupe key: a re-upload of the same file reuses the stored text.
+RESUME_UPLOAD_DIR = os.getenv("RESUME_UPLOAD_DIR", "./uploads/resumes")
+RESUME_MAX_UPLOAD_BYTES = int(os.getenv("RESUME_MAX_UPLOAD_BYTES", str(5 * 1024 * 1024)))
+RESUME_EXTRACT_WORKERS = int(os.getenv("RESUME_EXTRACT_WORKERS", str(min(4, os.cpu_count() or 1))))
+RESUME_EXTRACT_TIMEOUT = float(os.getenv("RESUME_EXTRACT_TIMEOUT", "30"))
+# Pages beyond this are ignored; resumes are 1-3 pages and this bounds hostile PDFs.
+RESUME_MAX_PAGES = int(os.getenv("RESUME_MAX_PAGES", "20"))
+MAX_TEXT_CHARS = 100_000
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+# Accepted file kinds -> (extension, MIME types)
+FILE_KINDS = {
+    "pdf": (".pdf", {"application/pdf"}),
+    "docx": (".docx", {"application/vnd.openxmlformats-officedocument.wordprocessingml.document"}),
+    "txt": (".txt", {"text/plain"}),
+}
+
+
+class UploadRejected(ValueError):
+    """The upload is too large, empty, or not a supported resume format."""
+
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+# --- Streaming to Disk ---
+
+def detect_kind(filename: Optional[str], head: bytes) -> str:
+    """Identifies the file by its leading bytes, using the extension only to tell DOCX from other zips."""
+    ext = Path(filename or "").suffix.lower()
+    if head.startswith(b"%PDF-"):
+        return "pdf"
+    if head.startswith(b"PK\x03\x04") and ext == ".docx":
+        return "docx"
+    if ext == ".txt" and b"\x00" not in head:
+        return "txt"
+    raise UploadRejected("Unsupported file type. Upload a PDF, DOCX or TXT resume.", status_code=415)
+
+
+async def save_upload(upload) -> Tuple[Path, str, int, str]:
+    """
+    Streams a Starlette UploadFile to a temporary file in RESUME_UPLOAD_DIR.
+
+    Returns (temp path, sha256 hex, size in bytes, kind). Raises UploadRejected
+    (and removes the partial file) when the upload is empty, too large or of an
+    unsupported type.
+    """
+    directory = Path(RESUME_UPLOAD_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    tmp_path = directory / f".upload-{uuid.uuid4().hex}"
+    digest = hashlib.sha256()
+    size, kind = 0, None
+    try:
+        with tmp_path.open("wb") as fh:
+            while True:
+                chunk = await upload.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                if kind is None:
+                    kind = detect_kind(upload.filename, chunk)
+                size += len(chunk)
+                if size > RESUME_MAX_UPLOAD_BYTES:
+                    raise UploadRejected(
+                        f"File is larger than {RESUME_MAX_UPLOAD_BYTES // (1024 * 1024)} MB.", status_code=413
+                    )
+                digest.update(chunk)
+                await asyncio.to_thread(fh.write, chunk)
+        if size == 0:
+            raise UploadRejected("The uploaded file is empty.")
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    return tmp_path, digest.hexdigest(), size, kind
+
+
+def store_path(content_hash: str, kind: str) -> Path:
+    return Path(RESUME_UPLOAD_DIR) / content_hash[:2] / f"{content_hash}{FILE_KINDS[kind][0]}"
+
+
+def commit_upload(tmp_path: Path, content_hash: str, kind: str) -> Path:
+    """Moves a finished upload to its content-addressed location (or drops it if already stored)."""
+    final_path = store_path(content_hash, kind)
+    if final_path.exists():
+        tmp_path.unlink(missing_ok=True)
+    else:
+        final_path.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(tmp_path, final_path)
+    return final_path
+
+
+# --- Text Extraction (runs in worker processes) ---
+
+_BLANK_LINES = re.compile(r"\n{3,}")
+_TRAILING_SPACE = re.compile(r"[ \t]+\n")
+
+
+def _clean(text: str) -> str:
+    text = text.replace("\r\n", "\n").replace("\r", "\n").replace("\x00", "")
+    text = _TRAILING_SPACE.sub("\n", text)
+    return _BLANK_LINES.sub("\n\n", text).strip()[:MAX_TEXT_CHARS]
+
+
+def extract_text(path: str, kind: str) -> Tuple[str, int]:
+    """Returns (plain text, page count) for a stored resume. Top-level so it can be pickled."""
+    if kind == "pdf":
+        from pypdf import PdfReader
+        reader = PdfReader(path)
+        pages = reader.pages[:RESUME_MAX_PAGES]
+        return _clean("\n\n".join(page.extract_text() or "" for page in pages)), len(reader.pages)
+    if kind == "docx":
+        import docx
+        document = docx.Document(path)
+        lines = [p.text for p in document.paragraphs]
+        # Many resume templates lay sections out in tables.
+        for table in document.tables:
+            for row in table.rows:
+                lines.append(" | ".join(cell.text.strip() for cell in row.cells if cell.text.strip()))
+        return _clean("\n".join(lines)), 1
+    with open(path, "r", encoding="utf-8", errors="replace") as fh:
+        return _clean(fh.read(MAX_TEXT_CHARS)), 1
+
+
+# --- Process Pool ---
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=RESUME_EXTRACT_WORKERS)
+        return _pool
+
+
+def _reset_pool(broken: ProcessPoolExecutor):
+    global _pool
+    with _pool_lock:
+        if _pool is broken:
+            _pool = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+async def extract_text_async(path: Path, kind: str) -> Tuple[str, int]:
+    """Extracts text in the process pool, bounded by RESUME_EXTRACT_TIMEOUT."""
+    pool = _get_pool()
+    loop = asyncio.get_running_loop()
+    try:
+        return await asyncio.wait_for(
+            loop.run_in_executor(pool, extract_text, str(path), kind), RESUME_EXTRACT_TIMEOUT
+        )
+    except BrokenProcessPool:
+        # A worker died (e.g. a parser crash); start a fresh pool for later uploads.
+        _reset_pool(pool)
+        raise
+
+
+def shutdown_pool():
+    """Stops the extraction workers (called on application shutdown)."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
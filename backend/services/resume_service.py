@@ -0,0 +1,263 @@
+import asyncio
+import hashlib
+import os
+import re
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from . import model_router, prompts
+from .cache import get_cache
+from .llm_provider import get_provider
+
+# --- Resume Review Pipeline ---
+# Short resumes go to the model as one prompt. Long ones are split by section
+# (education, experience, projects, ...), each section is reviewed concurrently
+# with bounded parallelism, and the section reviews are reduced locally into the
+# usual "### Overall Impression / ### ATS Compatibility Score / ### Actionable
+# Feedback" structure. The reduce step makes no model call, so wall-clock time
+# tracks the slowest section instead of the total resume length.
+
+# Resumes above this many tokens use the chunked pipeline.
+CHUNKING_THRESHOLD_TOKENS = int(os.getenv("RESUME_CHUNKING_THRESHOLD_TOKENS", "1200"))
+# Sections above this many tokens are split further on line boundaries.
+SECTION_MAX_TOKENS = int(os.getenv("RESUME_SECTION_MAX_TOKENS", "1000"))
+# Maximum number of section reviews in flight per resume.
+SECTION_CONCURRENCY = int(os.getenv("RESUME_SECTION_CONCURRENCY", "4"))
+# Sections shorter than this are grouped together instead of reviewed alone.
+MIN_SECTION_TOKENS = 15
+MAX_FEEDBACK_POINTS = 8
+
+# Heading keywords -> canonical section name.
+SECTION_ALIASES = {
+    "summary": "Summary", "objective": "Summary", "profile": "Summary", "about me": "Summary",
+    "education": "Education", "academic": "Education", "academics": "Education", "qualifications": "Education",
+    "experience": "Experience", "work experience": "Experience", "professional experience": "Experience",
+    "employment": "Experience", "internships": "Experience", "internship": "Experience",
+    "projects": "Projects", "project": "Projects", "academic projects": "Projects", "personal projects": "Projects",
+    "skills": "Skills", "technical skills": "Skills", "core skills": "Skills", "technologies": "Skills",
+    "certifications": "Certifications", "certificates": "Certifications", "courses": "Certifications",
+    "achievements": "Achievements", "awards": "Achievements", "honors": "Achievements",
+    "extracurricular": "Activities", "activities": "Activities", "leadership": "Activities",
+    "positions of responsibility": "Activities", "volunteering": "Activities",
+    "publications": "Publications", "research": "Publications",
+}
+
+_HEADING = re.compile(r"^\s*(?:#+\s*)?([A-Za-z][A-Za-z &/]{1,40}?)\s*:?\s*$")
+_SCORE = re.compile(r"Score:\s*\[?\s*(\d+(?:\.\d+)?)")
+
+
+def _heading_name(line: str) -> Optional[str]:
+    match = _HEADING.match(line)
+    if not match:
+        return None
+    key = re.sub(r"\s+", " ", match.group(1).strip().lower())
+    return SECTION_ALIASES.get(key)
+
+
+def split_sections(resume_text: str) -> List[Tuple[str, str]]:
+    """
+    Splits a resume into (section name, text) pairs using its headings.
+
+    Text before the first recognised heading is kept as "Header". Sections that
+    exceed SECTION_MAX_TOKENS are split into numbered parts, and sections too
+    small to review alone are grouped into "Other Sections".
+    """
+    sections: List[Tuple[str, List[str]]] = [("Header", [])]
+    for line in prompts.normalize_whitespace(resume_text).split("\n"):
+        name = _heading_name(line)
+        if name:
+            sections.append((name, []))
+        else:
+            sections[-1][1].append(line)
+
+    # Merge repeated headings (e.g. "Internships" and "Experience") in order.
+    merged: "OrderedDict[str, List[str]]" = OrderedDict()
+    for name, lines in sections:
+        merged.setdefault(name, []).extend(lines)
+
+    result, small = [], []
+    for name, lines in merged.items():
+        text = "\n".join(lines).strip()
+        if not text:
+            continue
+        if prompts.estimate_tokens(text) < MIN_SECTION_TOKENS:
+            # Tiny sections are reviewed together rather than costing a call each.
+            small.append(f"{name}:\n{text}")
+            continue
+        parts = _split_large(text)
+        for i, part in enumerate(parts, start=1):
+            result.append((name if len(parts) == 1 else f"{name} (part {i})", part))
+    if small:
+        result.append(("Other Sections", "\n\n".join(small)))
+    return result
+
+
+def _split_large(text: str) -> List[str]:
+    if prompts.estimate_tokens(text) <= SECTION_MAX_TOKENS:
+        return [text]
+    # Cut on line boundaries, preferring a blank line once a part is half full.
+    parts, current, current_tokens = [], [], 0
+    for line in text.split("\n"):
+        tokens = prompts.estimate_tokens(line) + 1
+        boundary = not line.strip() and current_tokens > SECTION_MAX_TOKENS // 2
+        if current and (current_tokens + tokens > SECTION_MAX_TOKENS or boundary):
+            parts.append("\n".join(current).strip())
+            current, current_tokens = [], 0
+        current.append(line)
+        current_tokens += tokens
+    if current:
+        parts.append("\n".join(current).strip())
+    # A single oversized line is left to the prompt's own truncation.
+    return [p for p in parts if p]
+
+
+# --- Section Result Cache ---
+# Shared across workers; a section reviewed once is reused by every resume that contains it.
+SECTION_CACHE_TTL = int(os.getenv("RESUME_SECTION_CACHE_TTL", str(7 * 24 * 3600)))
+section_cache = get_cache("resume_sections", version=1, ttl=SECTION_CACHE_TTL)
+
+
+def _section_key(provider: str, model: Optional[str], section: str, text: str,
+                 college_tier: str, character_profile: str, skills: str) -> str:
+    raw = "\x1f".join([provider, model or "", section, college_tier, character_profile, skills, text])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+# --- Map / Reduce ---
+
+def parse_section_review(section: str, feedback: str) -> Dict[str, Any]:
+    """Extracts summary, score and bullet points from one section review."""
+    summary_lines, points, score = [], [], None
+    current = ""
+    for line in feedback.split("\n"):
+        line = line.strip()
+        if line.startswith("### Section Summary"):
+            current = "summary"
+        elif line.startswith("### Section Score"):
+            current = "score"
+            match = _SCORE.search(line)
+            if match:
+                score = min(float(match.group(1)), 10.0)
+        elif line.startswith("### Actionable Feedback"):
+            current = "feedback"
+        elif current == "summary" and line and not line.startswith("###"):
+            summary_lines.append(line)
+        elif current == "feedback" and line.startswith(("-", "*")):
+            points.append(line[1:].strip())
+    return {"section": section, "summary": " ".join(summary_lines), "score": score, "points": points}
+
+
+def reduce_section_reviews(reviews: List[Dict[str, Any]], weights: List[int]) -> str:
+    """Combines section reviews into the standard three-part resume review."""
+    summaries = [f"**{r['section']}:** {r['summary']}" for r in reviews if r["summary"]]
+    scored = [(r["score"], w) for r, w in zip(reviews, weights) if r["score"] is not None]
+    if scored:
+        total_weight = sum(w for _, w in scored) or 1
+        ats_score = round(sum(s * w for s, w in scored) / total_weight)
+    else:
+        ats_score = 0
+
+    # Round-robin across sections so every section contributes its top points.
+    points, depth = [], 0
+    while len(points) < MAX_FEEDBACK_POINTS:
+        added = False
+        for r in reviews:
+            if depth < len(r["points"]) and len(points) < MAX_FEEDBACK_POINTS:
+                points.append(f"- ({r['section']}) {r['points'][depth]}")
+                added = True
+        if not added:
+            break
+        depth += 1
+
+    return "\n".join([
+        "### Overall Impression",
+        "Your resume was reviewed section by section.",
+        *summaries,
+        "",
+        f"### ATS Compatibility Score: {ats_score}",
+        "Weighted average of the per-section scores, by section length.",
+        "",
+        "### Actionable Feedback (Bulleted List)",
+        *(points or ["- Keep each section concise, quantified and keyword rich."]),
+    ])
+
+
+async def _complete(provider_name: str, task: str, rendered: prompts.RenderedPrompt, model: Optional[str],
+                    default_model: Optional[str], config: Dict[str, Any]) -> str:
+    """Sends a rendered prompt to `model`, or to the model picked by model_router when it is None."""
+    if model is not None:
+        return await get_provider(provider_name).acomplete(
+            rendered.messages, model, max_tokens=rendered.max_tokens, **config
+        )
+    return await model_router.acomplete(
+        provider_name, task, rendered.messages, tokens=rendered.input_tokens,
+        default_model=default_model, max_tokens=rendered.max_tokens, **config
+    )
+
+
+async def _review_section(semaphore: asyncio.Semaphore, provider_name: str, model: Optional[str],
+                          default_model: Optional[str], section: str, text: str, college_tier: str,
+                          character_profile: str, skills: str, config: Dict[str, Any]) -> Dict[str, Any]:
+    rendered = prompts.render("resume_section_review", section=section, college_tier=college_tier,
+                              character_profile=character_profile, skills=skills, section_text=text)
+    cache_model = model or model_router.cache_tag(provider_name, rendered.input_tokens,
+                                                  "resume_section_review") or default_model
+    key = _section_key(provider_name, cache_model, section, text, college_tier, character_profile, skills)
+    cached = await asyncio.to_thread(section_cache.get, key)
+    if cached is not None:
+        return cached
+
+    async with semaphore:
+        feedback = await _complete(provider_name, "resume_section_review", rendered, model, default_model, config)
+    review = parse_section_review(section, feedback)
+    await asyncio.to_thread(section_cache.set, key, review)
+    return review
+
+
+async def review_resume(resume_text: str, college_tier: str = "Tier 2/3",
+                        character_profile: str = "Not specified", skills: Optional[list] = None,
+                        provider: str = "litellm", model: Optional[str] = None,
+                        default_model: Optional[str] = None, **config: Any) -> str:
+    """
+    Reviews a resume and returns Markdown feedback in the standard structure.
+
+    Args:
+        resume_text: Plain text of the resume.
+        college_tier: College tier of the student.
+        character_profile: Display name of the CareerBridge character profile.
+        skills: Target skills for the student.
+        provider: Name of the LLM provider to use ("litellm" or "vertex").
+        model: Model override for the provider. When None, model_router picks one per call.
+        default_model: Model used when routing is off.
+        **config: Extra generation settings passed to the provider.
+
+    Returns:
+        str: The review in Markdown. Raises if every model call fails.
+    """
+    skills_str = ', '.join(skills) if skills else "Not specified"
+
+    if prompts.estimate_tokens(resume_text) <= CHUNKING_THRESHOLD_TOKENS:
+        rendered = prompts.render("resume_review", college_tier=college_tier,
+                                  character_profile=character_profile, skills=skills_str,
+                                  resume_text=resume_text)
+        return await _complete(provider, "resume_review", rendered, model, default_model, config)
+
+    sections = split_sections(resume_text)
+    semaphore = asyncio.Semaphore(SECTION_CONCURRENCY)
+    results = await asyncio.gather(
+        *(_review_section(semaphore, provider, model, default_model, name, text, college_tier,
+                          character_profile, skills_str, config)
+          for name, text in sections),
+        return_exceptions=True,
+    )
+
+    reviews, weights = [], []
+    for (name, text), result in zip(sections, results):
+        if isinstance(result, BaseException):
+            print(f"Section review failed for {name}: {result}")
+            continue
+        reviews.append(result)
+        weights.append(prompts.estimate_tokens(text))
+    if not reviews:
+        raise RuntimeError("Every section review failed.")
+    return reduce_section_reviews(reviews, weights)
@@ -0,0 +1,324 @@
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import bindparam, event, func, text
+from sqlalchemy.orm import Session
+
+from ..models import Experience, Project, ResumeDocument, SearchDocument, Student, User
+
+# --- Candidate Search ---
+# Projects, experience entries and uploaded resumes are mirrored into
+# `search_documents` (one row per record, written in the same transaction as
+# the record itself), and the database's own full-text index ranks them:
+#   SQLite      FTS5 external-content table `search_fts`, bm25() + snippet()
+#   PostgreSQL  weighted tsvector column + GIN index, ts_rank_cd() + ts_headline()
+#   MySQL       FULLTEXT index, MATCH ... AGAINST in boolean mode
+# Candidates are ranked by their best-matching document; skill and cohort
+# filters are correlated lookups on user_id, so no LIKE scans are involved.
+
+MAX_QUERY_TERMS = 10
+# SQLite ranks every match with bm25() and keeps the best SEARCH_RANK_WINDOW
+# (a bounded top-N sort, not a full one). Owners and filters are then looked
+# up best first, starting with (offset + limit + 1) * POOL_FACTOR documents.
+SEARCH_RANK_WINDOW = int(os.getenv("SEARCH_RANK_WINDOW", "10000"))
+POOL_FACTOR = 8
+SNIPPET_START, SNIPPET_END = "**", "**"
+SNIPPET_WORDS = 16
+
+_TERM = re.compile(r"[^\W_]+(?:[+#.][^\W_]*)*", re.UNICODE)
+
+# Mapped class -> (source name, primary key attribute)
+SOURCES = {
+    Project: ("project", "project_id"),
+    Experience: ("experience", "exp_id"),
+    ResumeDocument: ("resume", "resume_id"),
+}
+
+
+# --- Keeping Documents In Sync ---
+
+def document_for(target) -> Tuple[Optional[int], str, str]:
+    """(owner user_id, title, body) of a project, experience entry or resume."""
+    if isinstance(target, Project):
+        return target.user_id, target.title or "", f"{target.description or ''} {target.tech_stack or ''}"
+    if isinstance(target, Experience):
+        return target.user_id, f"{target.role} at {target.company}", target.achievements or ""
+    return target.uploaded_by, target.filename or "", target.extracted_text or ""
+
+
+def _where_source(table, source: str, source_id: int):
+    return (table.c.source == source) & (table.c.source_id == source_id)
+
+
+def _upsert_document(mapper, connection, target):
+    table = SearchDocument.__table__
+    source, key = SOURCES[type(target)]
+    source_id = getattr(target, key)
+    user_id, title, body = document_for(target)
+    if user_id is None:
+        connection.execute(table.delete().where(_where_source(table, source, source_id)))
+        return
+    values = {"user_id": user_id, "title": title[:300], "body": body}
+    updated = connection.execute(
+        table.update().where(_where_source(table, source, source_id)).values(**values, updated_at=func.now())
+    )
+    if updated.rowcount == 0:
+        connection.execute(table.insert().values(source=source, source_id=source_id, **values))
+
+
+def _delete_document(mapper, connection, target):
+    table = SearchDocument.__table__
+    source, key = SOURCES[type(target)]
+    connection.execute(table.delete().where(_where_source(table, source, getattr(target, key))))
+
+
+for _model in SOURCES:
+    event.listen(_model, "after_insert", _upsert_document)
+    event.listen(_model, "after_update", _upsert_document)
+    event.listen(_model, "after_delete", _delete_document)
+
+
+# --- Queries ---
+
+@dataclass
+class SearchFilters:
+    # Every listed skill is required (case-insensitive match on Skill.skill_name).
+    skills: List[str] = field(default_factory=list)
+    college: Optional[str] = None
+    branch: Optional[str] = None
+    year_of_study: Optional[str] = None
+    # "project", "experience" or "resume"
+    source: Optional[str] = None
+
+
+@dataclass
+class CandidateHit:
+    user_id: int
+    doc_id: int
+    score: float
+    matches: int
+    full_name: Optional[str] = None
+    college: Optional[str] = None
+    branch: Optional[str] = None
+    year_of_study: Optional[str] = None
+    source: Optional[str] = None
+    source_id: Optional[int] = None
+    title: Optional[str] = None
+    snippet: Optional[str] = None
+
+
+def query_terms(q: str) -> List[str]:
+    """Words of the user's query, stripped of full-text operator syntax."""
+    return _TERM.findall(q.lower())[:MAX_QUERY_TERMS]
+
+
+def _hits_sql(dialect: str) -> str:
+    """
+    CTE `hits` (user_id, doc_id, score) over the matching documents, with
+    search_documents aliased as d and higher scores better. SQLite ranks in
+    _rank_sqlite instead.
+    """
+    if dialect == "postgresql":
+        return (
+            "hits AS (SELECT d.user_id, d.doc_id, ts_rank_cd(d.search_vector, query) AS score "
+            "FROM search_documents d, to_tsquery('english', :q) query "
+            "WHERE d.search_vector @@ query"
+        )
+    if dialect in ("mysql", "mariadb"):
+        return (
+            "hits AS (SELECT d.user_id, d.doc_id, MATCH(d.title, d.body) AGAINST (:q IN BOOLEAN MODE) AS score "
+            "FROM search_documents d WHERE MATCH(d.title, d.body) AGAINST (:q IN BOOLEAN MODE)"
+        )
+    raise NotImplementedError(f"Full-text search is not available on {dialect}")
+
+
+def match_expression(dialect: str, terms: List[str]) -> str:
+    """
+    All terms required. No prefix matching: stemming already covers inflections,
+    and FTS5 prefix terms make every rowid lookup merge the prefix's doclists.
+    """
+    if dialect == "sqlite":
+        return " ".join(f'"{t}"' for t in terms)
+    # tsquery and MySQL boolean mode treat + # . as operators.
+    cleaned = [re.sub(r"\W", "", t) for t in terms]
+    if dialect == "postgresql":
+        return " & ".join(cleaned)
+    return " ".join(f"+{t}" for t in cleaned)
+
+
+def _rank_sqlite(db: Session, q: str, filter_sql: str, params: Dict[str, object],
+                 wanted: int) -> List[Tuple[int, int, float, int]]:
+    """
+    (user_id, doc_id, score, matches) for the first `wanted` users, best first.
+
+    All matches are ranked with bm25() and the best SEARCH_RANK_WINDOW kept;
+    owners and filters are then resolved in rank order, a batch of documents at
+    a time, until enough distinct users are found. `matches` is filled in later.
+    """
+    ranked = db.execute(text(
+        # bm25() is lower-is-better, hence the negation. Titles weigh 4x.
+        "SELECT doc_id, -bm FROM ("
+        "  SELECT rowid AS doc_id, bm25(search_fts, 4.0, 1.0) AS bm FROM search_fts "
+        "  WHERE search_fts MATCH :q ORDER BY bm, rowid LIMIT :window"
+        ") ORDER BY bm, doc_id"
+    ), {"q": q, "window": SEARCH_RANK_WINDOW})
+    owners_sql = text(
+        f"SELECT d.doc_id, d.user_id FROM search_documents d WHERE d.doc_id IN :ids{filter_sql}"
+    ).bindparams(bindparam("ids", expanding=True))
+
+    best: Dict[int, Tuple[int, float]] = {}
+    batch = wanted * POOL_FACTOR
+    # Batches grow, so a selective filter (a small college) costs a few queries, not hundreds.
+    while chunk := ranked.fetchmany(batch):
+        batch *= 4
+        owners = dict(db.execute(owners_sql, {**params, "ids": [doc_id for doc_id, _ in chunk]}).all())
+        for doc_id, score in chunk:
+            user_id = owners.get(doc_id)
+            if user_id is not None and user_id not in best:
+                best[user_id] = (doc_id, score)
+        if len(best) >= wanted:
+            break
+    ranked.close()
+    return [(user_id, doc_id, score, 1) for user_id, (doc_id, score) in list(best.items())[:wanted]]
+
+
+def _filter_sql(filters: SearchFilters, params: Dict[str, object]) -> str:
+    # Correlated on the user_id indexes: only the ranked pool of hits is checked,
+    # instead of scanning skills / students for everyone with the skill or cohort.
+    clauses = []
+    for i, skill in enumerate(filters.skills):
+        params[f"skill{i}"] = skill.strip().lower()
+        clauses.append(f"EXISTS (SELECT 1 FROM skills s WHERE s.user_id = d.user_id "
+                       f"AND lower(s.skill_name) = :skill{i})")
+    cohort = [(c, v) for c, v in (("college", filters.college), ("branch", filters.branch),
+                                  ("year_of_study", filters.year_of_study)) if v]
+    if cohort:
+        conditions = []
+        for column, value in cohort:
+            params[column] = value.strip().lower()
+            conditions.append(f"lower(st.{column}) = :{column}")
+        clauses.append(f"EXISTS (SELECT 1 FROM students st WHERE st.user_id = d.user_id "
+                       f"AND {' AND '.join(conditions)})")
+    if filters.source:
+        params["source"] = filters.source
+        clauses.append("d.source = :source")
+    return "".join(f" AND {clause}" for clause in clauses)
+
+
+def _snippets(db: Session, dialect: str, q: str, terms: List[str], doc_ids: List[int]) -> Dict[int, str]:
+    if not doc_ids:
+        return {}
+    ids = bindparam("ids", expanding=True)
+    if dialect == "sqlite":
+        rows = db.execute(text(
+            "SELECT rowid, snippet(search_fts, 1, :start, :end, '…', :words) FROM search_fts "
+            "WHERE search_fts MATCH :q AND rowid IN :ids"
+        ).bindparams(ids), {"q": q, "ids": doc_ids, "start": SNIPPET_START, "end": SNIPPET_END,
+                            "words": SNIPPET_WORDS}).all()
+        return dict(rows)
+    if dialect == "postgresql":
+        rows = db.execute(text(
+            "SELECT doc_id, ts_headline('english', body, to_tsquery('english', :q), :options) "
+            "FROM search_documents WHERE doc_id IN :ids"
+        ).bindparams(ids), {"q": q, "ids": doc_ids, "options": (
+            f"StartSel={SNIPPET_START}, StopSel={SNIPPET_END}, MaxWords={SNIPPET_WORDS}, MinWords=8"
+        )}).all()
+        return dict(rows)
+    rows = db.execute(text("SELECT doc_id, body FROM search_documents WHERE doc_id IN :ids").bindparams(ids),
+                      {"ids": doc_ids}).all()
+    return {doc_id: text_snippet(body or "", terms) for doc_id, body in rows}
+
+
+def _match_counts(db: Session, q: str, user_ids: List[int], source: Optional[str]) -> Dict[int, int]:
+    """Exact number of matching documents per user (SQLite, where ranking only sees a pool)."""
+    # Correlated, so FTS5 checks each of the users' few documents instead of
+    # materialising every match of a common term.
+    query = (
+        "SELECT user_id, COUNT(*) FROM search_documents d WHERE user_id IN :users "
+        "AND EXISTS (SELECT 1 FROM search_fts WHERE search_fts MATCH :q AND rowid = d.doc_id)"
+    )
+    params = {"users": user_ids, "q": q}
+    if source:
+        query += " AND source = :source"
+        params["source"] = source
+    statement = text(query + " GROUP BY user_id").bindparams(bindparam("users", expanding=True))
+    return dict(db.execute(statement, params).all())
+
+
+def text_snippet(body: str, terms: List[str]) -> str:
+    """A window of SNIPPET_WORDS words around the first term hit (for databases without one)."""
+    words = body.split()
+    lowered = [w.lower() for w in words]
+    start = next((i for i, w in enumerate(lowered) if any(w.startswith(t) for t in terms)), 0)
+    start = max(start - SNIPPET_WORDS // 4, 0)
+    window = words[start:start + SNIPPET_WORDS]
+    marked = [f"{SNIPPET_START}{w}{SNIPPET_END}" if any(w.lower().startswith(t) for t in terms) else w
+              for w in window]
+    return ("…" if start else "") + " ".join(marked) + ("…" if start + SNIPPET_WORDS < len(words) else "")
+
+
+def search_candidates(db: Session, q: str, filters: Optional[SearchFilters] = None,
+                      limit: int = 20, offset: int = 0) -> Tuple[List[CandidateHit], bool]:
+    """
+    Candidates whose projects, experience or resume match `q`, best match first.
+
+    Returns (one page of hits, whether more pages exist). Raises ValueError
+    when `q` contains no searchable words.
+    """
+    terms = query_terms(q)
+    if not terms:
+        raise ValueError("Search query must contain at least one word.")
+    dialect = db.get_bind().dialect.name
+    match = match_expression(dialect, terms)
+    filters = filters or SearchFilters()
+    params: Dict[str, object] = {"q": match, "limit": limit + 1, "offset": offset}
+    filter_sql = _filter_sql(filters, params)
+
+    if dialect == "sqlite":
+        rows = _rank_sqlite(db, match, filter_sql, params, offset + limit + 1)[offset:]
+    else:
+        rows = db.execute(text(
+            f"WITH {_hits_sql(dialect)}{filter_sql}), "
+            "best AS ("
+            "  SELECT user_id, doc_id, score, COUNT(*) OVER (PARTITION BY user_id) AS matches, "
+            "         ROW_NUMBER() OVER (PARTITION BY user_id ORDER BY score DESC, doc_id) AS rn "
+            "  FROM hits) "
+            "SELECT user_id, doc_id, score, matches FROM best WHERE rn = 1 "
+            "ORDER BY score DESC, user_id LIMIT :limit OFFSET :offset"
+        ), params).all()
+
+    has_more = len(rows) > limit
+    hits = [CandidateHit(user_id=r[0], doc_id=r[1], score=round(float(r[2]), 6), matches=r[3])
+            for r in rows[:limit]]
+    if not hits:
+        return hits, has_more
+    if dialect == "sqlite":
+        counts = _match_counts(db, match, [h.user_id for h in hits], filters.source)
+        for hit in hits:
+            hit.matches = counts.get(hit.user_id, hit.matches)
+
+    # Names, cohorts and snippets only for the page being returned.
+    user_ids = [h.user_id for h in hits]
+    people = {
+        row.user_id: row for row in db.query(
+            User.user_id, User.full_name, Student.college, Student.branch, Student.year_of_study
+        ).outerjoin(Student, Student.user_id == User.user_id).filter(User.user_id.in_(user_ids))
+    }
+    documents = {
+        row.doc_id: row for row in db.query(
+            SearchDocument.doc_id, SearchDocument.source, SearchDocument.source_id, SearchDocument.title
+        ).filter(SearchDocument.doc_id.in_([h.doc_id for h in hits]))
+    }
+    snippets = _snippets(db, dialect, match, terms, [h.doc_id for h in hits])
+    for hit in hits:
+        person, document = people.get(hit.user_id), documents.get(hit.doc_id)
+        if person is not None:
+            hit.full_name, hit.college, hit.branch, hit.year_of_study = (
+                person.full_name, person.college, person.branch, person.year_of_study
+            )
+        if document is not None:
+            hit.source, hit.source_id, hit.title = document.source, document.source_id, document.title
+        hit.snippet = snippets.get(hit.doc_id)
+    return hits, has_more
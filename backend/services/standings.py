@@ -0,0 +1,367 @@
+import asyncio
+import bisect
+import math
+import os
+import threading
+import time
+from array import array
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import event, select
+
+from ..database import SessionLocal
+from ..models import CareerScore, Student
+
+# --- Cohort Standings ---
+# "Where do I stand among my batch" without sorting the career_scores table per
+# request. Every cohort keeps an order-statistic structure over its scores:
+# large cohorts a Fenwick (binary indexed) tree of counts per career score
+# value, small ones (most batches) a sorted list, which is far smaller than a
+# dense tree. Rank, percentile and score-threshold queries are O(log n) either
+# way, and a score change is a remove + insert.
+#
+# Each student is counted in three cohorts: their batch (college, branch,
+# year_of_study), their college, and everyone. Committed CareerScore / Student
+# writes are applied incrementally through session events; `rebuild()` reloads
+# everything from the database with vectorized numpy (startup, then every
+# STANDINGS_REBUILD_SECONDS) to correct drift, e.g. from writes served by other
+# worker processes.
+STANDINGS_MAX_SCORE = int(os.getenv("STANDINGS_MAX_SCORE", "1000"))
+STANDINGS_REBUILD_SECONDS = float(os.getenv("STANDINGS_REBUILD_SECONDS", "300"))
+# Cohorts with more members than this switch from a sorted list to a Fenwick tree.
+DENSE_COHORT_SIZE = int(os.getenv("STANDINGS_DENSE_COHORT_SIZE", "512"))
+
+# (scope, college, branch, year_of_study); wider scopes use None for the unused parts.
+CohortKey = Tuple[str, Optional[str], Optional[str], Optional[str]]
+# (college, branch, year_of_study), normalized
+Batch = Tuple[Optional[str], Optional[str], Optional[str]]
+EVERYONE: CohortKey = ("overall", None, None, None)
+
+
+def _norm(value: Optional[str]) -> Optional[str]:
+    # "IIT  Delhi" and "iit delhi" are the same cohort.
+    value = " ".join(str(value).split()).lower() if value is not None else ""
+    return value or None
+
+
+def batch_of(student: Optional[Student]) -> Batch:
+    if student is None:
+        return (None, None, None)
+    return (_norm(student.college), _norm(student.branch), _norm(student.year_of_study))
+
+
+def cohort_keys(batch: Batch) -> List[CohortKey]:
+    college, branch, year = batch
+    keys = [EVERYONE]
+    if college:
+        keys.append(("college", college, None, None))
+        if branch and year:
+            keys.append(("batch", college, branch, year))
+    return keys
+
+
+def clamp_score(score) -> int:
+    return min(max(int(score), 0), STANDINGS_MAX_SCORE)
+
+
+# --- Order-Statistic Structures ---
+
+class SortedCounts:
+    """A small cohort's scores as a sorted list; same interface as FenwickCounts."""
+
+    __slots__ = ("values",)
+
+    def __init__(self, values: Optional[List[int]] = None):
+        self.values = values if values is not None else []
+
+    @property
+    def total(self) -> int:
+        return len(self.values)
+
+    def add(self, score: int, delta: int):
+        if delta > 0:
+            bisect.insort(self.values, score)
+        else:
+            i = bisect.bisect_left(self.values, score)
+            if i < len(self.values) and self.values[i] == score:
+                del self.values[i]
+
+    def count_le(self, score: int) -> int:
+        return bisect.bisect_right(self.values, score)
+
+    def kth(self, k: int) -> int:
+        return self.values[k - 1]
+
+
+class FenwickCounts:
+    """Counts of scores 0..max_score with O(log n) update, prefix count and k-th lookup."""
+
+    __slots__ = ("tree", "size", "total")
+
+    def __init__(self, max_score: int, tree: Optional[array] = None, total: int = 0):
+        self.size = max_score + 1
+        # 1-based: tree[i] counts scores i - lowbit(i) .. i - 1.
+        self.tree = tree if tree is not None else array("i", bytes(4 * (self.size + 1)))
+        self.total = total
+
+    def add(self, score: int, delta: int):
+        i = score + 1
+        tree, size = self.tree, self.size
+        while i <= size:
+            tree[i] += delta
+            i += i & -i
+        self.total += delta
+
+    def count_le(self, score: int) -> int:
+        """Number of entries with a score <= `score`."""
+        if score < 0:
+            return 0
+        i, tree, count = min(score + 1, self.size), self.tree, 0
+        while i > 0:
+            count += tree[i]
+            i -= i & -i
+        return count
+
+    def kth(self, k: int) -> int:
+        """The k-th smallest score (1-based k), by binary lifting down the tree."""
+        pos, tree = 0, self.tree
+        step = 1 << self.size.bit_length()
+        while step:
+            nxt = pos + step
+            if nxt <= self.size and tree[nxt] < k:
+                pos = nxt
+                k -= tree[nxt]
+            step >>= 1
+        # The answer sits at 1-based index pos + 1, i.e. score pos.
+        return pos
+
+    @classmethod
+    def from_counts(cls, counts: np.ndarray) -> "FenwickCounts":
+        """Builds the tree from a dense count vector in O(n) numpy operations."""
+        prefix = np.concatenate(([0], np.cumsum(counts, dtype=np.int64)))
+        idx = np.arange(1, len(counts) + 1)
+        tree = np.zeros(len(counts) + 1, dtype=np.int32)
+        tree[1:] = prefix[idx] - prefix[idx - (idx & -idx)]
+        return cls(len(counts) - 1, array("i", tree.tobytes()), int(prefix[-1]))
+
+
+# --- Standings Index ---
+
+@dataclass
+class Standing:
+    scope: str
+    college: Optional[str]
+    branch: Optional[str]
+    year_of_study: Optional[str]
+    rank: int
+    total: int
+    percentile: float
+    # Lowest score that still places in the top 10% of the cohort
+    top_10_percent_score: int
+
+
+class StandingsIndex:
+    """In-memory per-cohort score distributions; thread-safe."""
+
+    def __init__(self, max_score: int = STANDINGS_MAX_SCORE):
+        self.max_score = max_score
+        self._cohorts: Dict[CohortKey, FenwickCounts] = {}
+        self._batches: Dict[int, Batch] = {}       # user_id -> batch, for every known student
+        self._scores: Dict[int, int] = {}          # user_id -> clamped career score
+        self._lock = threading.RLock()
+        # Changes applied while a rebuild reads the database, replayed onto the new snapshot.
+        self._journal: Optional[list] = None
+        self.built_at: Optional[float] = None
+
+    def __len__(self) -> int:
+        return len(self._scores)
+
+    def _counts(self, scores: np.ndarray):
+        # `scores` is sorted.
+        if len(scores) > DENSE_COHORT_SIZE:
+            return FenwickCounts.from_counts(np.bincount(scores, minlength=self.max_score + 1))
+        return SortedCounts(scores.tolist())
+
+    def _place(self, user_id: int, delta: int):
+        score = self._scores.get(user_id)
+        if score is None:
+            return
+        for key in cohort_keys(self._batches.get(user_id, (None, None, None))):
+            counts = self._cohorts.get(key)
+            if counts is None:
+                counts = self._cohorts[key] = SortedCounts()
+            counts.add(score, delta)
+            if isinstance(counts, SortedCounts) and counts.total > DENSE_COHORT_SIZE:
+                self._cohorts[key] = self._counts(np.array(counts.values, dtype=np.int64))
+
+    def set_score(self, user_id: int, score) -> None:
+        """Sets (or with None removes) a user's career score."""
+        with self._lock:
+            if self._journal is not None:
+                self._journal.append(("score", user_id, score))
+            self._place(user_id, -1)
+            if score is None:
+                self._scores.pop(user_id, None)
+            else:
+                self._scores[user_id] = clamp_score(score)
+                self._place(user_id, +1)
+
+    def set_batch(self, user_id: int, batch: Batch) -> None:
+        """Moves a user to another batch (college / branch / year)."""
+        with self._lock:
+            if self._journal is not None:
+                self._journal.append(("batch", user_id, batch))
+            if self._batches.get(user_id) == batch:
+                return
+            self._place(user_id, -1)
+            self._batches[user_id] = batch
+            self._place(user_id, +1)
+
+    def score_of(self, user_id: int) -> Optional[int]:
+        return self._scores.get(user_id)
+
+    def standings(self, user_id: int) -> List[Standing]:
+        """The user's rank and percentile in each of their cohorts, narrowest first."""
+        with self._lock:
+            score = self._scores.get(user_id)
+            if score is None:
+                return []
+            results = []
+            for key in reversed(cohort_keys(self._batches.get(user_id, (None, None, None)))):
+                tree = self._cohorts[key]
+                below = tree.count_le(score - 1)
+                ties = tree.count_le(score) - below
+                above = tree.total - below - ties
+                # Percentile rank: share of the cohort below, counting ties as half.
+                percentile = 100.0 * (below + 0.5 * ties) / tree.total
+                top_k = max(math.ceil(tree.total * 0.1), 1)
+                results.append(Standing(
+                    scope=key[0], college=key[1], branch=key[2], year_of_study=key[3],
+                    rank=above + 1, total=tree.total, percentile=round(percentile, 1),
+                    top_10_percent_score=tree.kth(tree.total - top_k + 1),
+                ))
+            return results
+
+    # --- Rebuild ---
+
+    def load(self, batches: Dict[int, Batch], scores: Iterable[Tuple[int, int]]):
+        """Replaces the whole index with `scores` ((user_id, score) pairs), built vectorized."""
+        scores = list(scores)
+        user_ids = np.fromiter((u for u, _ in scores), dtype=np.int64, count=len(scores))
+        values = np.clip(np.fromiter((s for _, s in scores), dtype=np.int64, count=len(scores)),
+                         0, self.max_score)
+
+        # Distinct batches -> the codes of their (up to) three cohorts; -1 where absent.
+        batch_codes: Dict[Batch, int] = {}
+        user_batches = np.fromiter(
+            (batch_codes.setdefault(batches.get(u, (None, None, None)), len(batch_codes))
+             for u in user_ids.tolist()),
+            dtype=np.int64, count=len(scores),
+        )
+        codes: Dict[CohortKey, int] = {}
+        table = np.full((max(len(batch_codes), 1), 3), -1, dtype=np.int64)
+        for batch, row in batch_codes.items():
+            for col, key in enumerate(cohort_keys(batch)):
+                table[row, col] = codes.setdefault(key, len(codes))
+
+        # One (cohort, score) entry per membership, grouped by cohort and sorted by score.
+        memberships = table[user_batches]
+        present = memberships >= 0
+        member_cohorts = memberships[present]
+        member_scores = np.broadcast_to(values[:, None], memberships.shape)[present]
+        order = np.lexsort((member_scores, member_cohorts))
+        member_cohorts, member_scores = member_cohorts[order], member_scores[order]
+        bounds = np.searchsorted(member_cohorts, np.arange(len(codes) + 1))
+        cohorts = {
+            key: self._counts(member_scores[bounds[code]:bounds[code + 1]]) for key, code in codes.items()
+        }
+
+        with self._lock:
+            self._cohorts = cohorts
+            self._batches = dict(batches)
+            self._scores = dict(zip(user_ids.tolist(), values.tolist()))
+            self.built_at = time.time()
+
+    def rebuild(self, db) -> float:
+        """Reloads from the database; returns the seconds taken."""
+        started = time.perf_counter()
+        with self._lock:
+            self._journal = []
+        try:
+            students = db.execute(
+                select(Student.user_id, Student.college, Student.branch, Student.year_of_study)
+                .where(Student.user_id.isnot(None))
+            ).all()
+            batches = {row[0]: (_norm(row[1]), _norm(row[2]), _norm(row[3])) for row in students}
+            scores = db.execute(
+                select(CareerScore.user_id, CareerScore.career_score)
+                .where(CareerScore.career_score.isnot(None))
+            ).all()
+            with self._lock:
+                journal, self._journal = self._journal, None
+                self.load(batches, scores)
+                # Writes committed while the snapshot was being read.
+                for kind, user_id, value in journal:
+                    if kind == "score":
+                        self.set_score(user_id, value)
+                    else:
+                        self.set_batch(user_id, value)
+        finally:
+            with self._lock:
+                self._journal = None
+        return time.perf_counter() - started
+
+
+standings_index = StandingsIndex()
+
+
+def rebuild_standings() -> float:
+    db = SessionLocal()
+    try:
+        return standings_index.rebuild(db)
+    finally:
+        db.close()
+
+
+async def refresh_standings_periodically():
+    """Rebuilds the index now and then every STANDINGS_REBUILD_SECONDS (run as a lifespan task)."""
+    while True:
+        try:
+            elapsed = await asyncio.to_thread(rebuild_standings)
+            print(f"Rebuilt cohort standings for {len(standings_index)} students in {elapsed * 1000:.0f} ms")
+        except Exception as e:
+            print(f"Error rebuilding cohort standings: {e}")
+        await asyncio.sleep(STANDINGS_REBUILD_SECONDS)
+
+
+# --- Incremental Updates ---
+# Score and batch changes are collected at flush and applied only once the
+# transaction commits, so rolled-back writes never reach the index.
+
+@event.listens_for(SessionLocal, "after_flush")
+def _collect_changes(session, flush_context):
+    changes = session.info.setdefault("standings_changes", [])
+    for obj in session.new | session.dirty:
+        if isinstance(obj, CareerScore) and obj.user_id is not None:
+            changes.append(("score", obj.user_id, obj.career_score))
+        elif isinstance(obj, Student) and obj.user_id is not None:
+            changes.append(("batch", obj.user_id, batch_of(obj)))
+    for obj in session.deleted:
+        if isinstance(obj, CareerScore) and obj.user_id is not None:
+            changes.append(("score", obj.user_id, None))
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _apply_changes(session):
+    for kind, user_id, value in session.info.pop("standings_changes", ()):
+        if kind == "score":
+            standings_index.set_score(user_id, value)
+        else:
+            standings_index.set_batch(user_id, value)
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _discard_changes(session):
+    session.info.pop("standings_changes", None)
@@ -1,11 +1,13 @@
 import os
 from google.cloud import aiplatform
 from google.oauth2 import service_account
-from vertexai.generative_models import GenerativeModel
 import vertexai
 from typing import Optional, Dict, Any
 import json
 
+from .llm_provider import ProviderUnavailableError
+from . import model_router, prompts, resume_service
+
 class VertexAIService:
     def __init__(self):
         # Initialize Vertex AI
@@ -21,8 +23,36 @@ class VertexAIService:
             # Use default credentials (for deployed environments)
             vertexai.init(project=self.project_id, location=self.location)
 
-        # Initialize the generative model
-        self.model = GenerativeModel("gemini-1.5-pro")
+        # Model used when routing is off; otherwise model_router picks flash or pro per call.
+        # The provider layer owns the GenerativeModel instances.
+        self.model_name = "gemini-1.5-pro"
+
+    def _generate(self, prompt_name: str, variables: Dict[str, Any], **generation_config) -> str:
+        """Renders a registered prompt and sends it through the Vertex provider."""
+        rendered = prompts.render(prompt_name, **variables)
+        try:
+            return model_router.complete(
+                "vertex", prompt_name, rendered.messages, tokens=rendered.input_tokens,
+                default_model=self.model_name, max_tokens=rendered.max_tokens, **generation_config
+            )
+        except ProviderUnavailableError:
+            # Vertex and its fallback are both down: serve the prompt's canned reply if it has one
+            if rendered.degraded:
+                return rendered.degraded
+            raise
+
+    async def _agenerate(self, prompt_name: str, variables: Dict[str, Any], **generation_config) -> str:
+        """Async variant of `_generate`, so request handlers do not block the event loop."""
+        rendered = prompts.render(prompt_name, **variables)
+        try:
+            return await model_router.acomplete(
+                "vertex", prompt_name, rendered.messages, tokens=rendered.input_tokens,
+                default_model=self.model_name, max_tokens=rendered.max_tokens, **generation_config
+            )
+        except ProviderUnavailableError:
+            if rendered.degraded:
+                return rendered.degraded
+            raise
 
     async def review_resume(self, resume_text: str, college_tier: str = "Tier 2/3",
                           character_profile: str = "Not specified",
@@ -31,48 +61,18 @@ class VertexAIService:
         Review resume using Google Cloud Vertex AI Gemini model
         """
         try:
-            skills_str = ', '.join(skills) if skills else "Not specified"
-
-            system_instruction = """You are an expert career coach and recruiter specializing in helping students from Tier 2/3 colleges land jobs at top companies.
-Your feedback must be constructive, encouraging, and highly actionable.
-Analyze the resume for ATS compatibility, impact metrics, action verbs, and clarity.
-Provide feedback in simple markdown format."""
-
-            prompt = f"""{system_instruction}
-
-Please review the following resume for a student from a {college_tier} college.
-Their self-identified character profile on CareerBridge is "{character_profile}".
-Their target skills are: {skills_str}.
-
-Resume Text:
----
-{resume_text}
----
-
-Provide a review with the following structure:
-### Overall Impression
-(A brief, encouraging summary)
-
-### ATS Compatibility Score: [Give a score out of 10]
-(Briefly explain why, mentioning keywords and formatting)
-
-### Actionable Feedback (Bulleted List)
-- Point 1
-- Point 2
-- Point 3"""
-
-            # Generate content using Vertex AI
-            response = self.model.generate_content(
-                prompt,
-                generation_config={
-                    "temperature": 0.7,
-                    "top_p": 0.8,
-                    "top_k": 40,
-                    "max_output_tokens": 2048,
-                }
+            # Generate content using Vertex AI; long resumes are reviewed section by section
+            response_text = await resume_service.review_resume(
+                resume_text=resume_text,
+                college_tier=college_tier,
+                character_profile=character_profile,
+                skills=skills,
+                provider="vertex",
+                default_model=self.model_name,
+                temperature=0.7, top_p=0.8, top_k=40,
             )
 
-            feedback = response.text.strip()
+            feedback = response_text.strip()
 
             if feedback:
                 return {"feedback": feedback}
@@ -88,21 +88,12 @@ Provide a review with the following structure:
         Generate interview questions for a specific role using Vertex AI
         """
         try:
-            prompt = f"""Generate {count} interview questions for the role of {role} in a professional setting.
-Number them 1-{count} and make each question on a new line.
-Focus on behavioral, technical, and situational questions appropriate for this role."""
-
-            response = self.model.generate_content(
-                prompt,
-                generation_config={
-                    "temperature": 0.8,
-                    "top_p": 0.9,
-                    "top_k": 40,
-                    "max_output_tokens": 1024,
-                }
+            response_text = await self._agenerate(
+                "interview_questions", {"count": count, "role": role},
+                temperature=0.8, top_p=0.9, top_k=40,
             )
 
-            questions_text = response.text.strip()
+            questions_text = response_text.strip()
             # Parse the numbered questions
             questions = []
             for line in questions_text.split('\n'):
@@ -126,31 +117,14 @@ Focus on behavioral, technical, and situational questions appropriate for this r
         try:
             skills_str = ', '.join(skills) if skills else "general skills"
 
-            prompt = f"""Analyze the current job market for the following skills: {skills_str}
-Location: {location}
-
-Provide analysis in the following JSON format:
-{{
-    "demand_level": "High/Medium/Low",
-    "salary_range": "approximate range",
-    "top_companies": ["company1", "company2", "company3"],
-    "emerging_trends": ["trend1", "trend2", "trend3"],
-    "recommendations": ["rec1", "rec2", "rec3"]
-}}"""
-
-            response = self.model.generate_content(
-                prompt,
-                generation_config={
-                    "temperature": 0.3,
-                    "top_p": 0.8,
-                    "top_k": 40,
-                    "max_output_tokens": 1024,
-                }
+            response_text = await self._agenerate(
+                "job_market", {"skills": skills_str, "location": location},
+                temperature=0.3, top_p=0.8, top_k=40,
             )
 
             # Try to parse as JSON
             try:
-                result = json.loads(response.text.strip())
+                result = json.loads(response_text.strip())
                 return result
             except json.JSONDecodeError:
                 # If not valid JSON, return a structured response
@@ -160,7 +134,7 @@ Provide analysis in the following JSON format:
                     "top_companies": ["Tech companies", "Consulting firms", "Startups"],
                     "emerging_trends": ["AI integration", "Remote work", "Skill specialization"],
                     "recommendations": ["Continuous learning", "Build portfolio", "Network actively"],
-                    "raw_analysis": response.text.strip()
+                    "raw_analysis": response_text.strip()
                 }
 
         except Exception as e:
@@ -0,0 +1,344 @@
+import asyncio
+import heapq
+import itertools
+import json
+import logging
+import math
+import os
+import re
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# --- Admission Control ---
+# Every HTTP request is sorted into a route class (AI, auth, CRUD) and must get
+# one of that class's concurrency slots before it reaches the app. A class at
+# its limit queues requests (pro users ahead of free ones) up to a bounded
+# depth; past that, or after waiting queue_timeout seconds, the request is
+# rejected at once with 503 and a Retry-After estimate. Slow LLM calls
+# therefore queue inside their own class and cannot crowd out cheap reads.
+#
+# Limits adapt (AIMD): each completed request is compared with the fastest
+# recent latency of its endpoint. While latency stays within
+# ADMISSION_LATENCY_TOLERANCE times that baseline and the class is using its
+# slots, the limit grows by 1/limit per request (about +1 per round trip).
+# When latency or 5xx responses show the backend is saturated, it shrinks by
+# ADMISSION_BACKOFF, at most once per round trip.
+#
+# Operator routes (/api/admin) and health checks are never shed. Limits and
+# counters are per worker process and listed at /api/admin/admission.
+#
+#   app.add_middleware(AdmissionMiddleware, db_connections=pool_capacity(engine))
+ADMISSION_CONTROL = os.getenv("ADMISSION_CONTROL", "1") == "1"
+ADMISSION_LATENCY_TOLERANCE = float(os.getenv("ADMISSION_LATENCY_TOLERANCE", "2.0"))
+ADMISSION_BACKOFF = float(os.getenv("ADMISSION_BACKOFF", "0.9"))
+# The per-endpoint baseline is re-taken from the latest window of this many requests,
+# so it follows the backend when it gets permanently slower (new model, bigger tables).
+BASELINE_WINDOW = 250
+MAX_RETRY_AFTER_SECONDS = 30
+
+
+@dataclass
+class RouteClass:
+    name: str
+    initial_limit: int
+    min_limit: int
+    max_limit: int
+    # Waiting requests beyond the running ones; more are rejected immediately.
+    queue_size: int
+    # Longest a request waits for a slot before it is rejected.
+    queue_timeout: float
+
+
+# name -> (initial, min, max, queue, queue timeout, share of the DB pool).
+# Requests hold database connections while they run (AI ones across their LLM
+# call, some two at once), so by default a class may not run more requests than
+# its share of the primary pool: beyond that they would only pile up on pool
+# checkout until SQLAlchemy's 30s timeout. The shares overlap a little, as not
+# every request holds a connection the whole time.
+ROUTE_CLASS_DEFAULTS: Dict[str, Tuple[int, int, int, int, float, float]] = {
+    # Requests that wait on an LLM provider: few slots, patient queue.
+    "ai": (16, 2, 64, 64, 10.0, 0.4),
+    # bcrypt-bound login and registration.
+    "auth": (8, 1, 32, 64, 3.0, 0.2),
+    # Profile reads and writes: many slots, short queue wait.
+    "crud": (64, 4, 256, 256, 1.0, 0.6),
+}
+
+
+def route_classes(db_connections: Optional[int] = None) -> Dict[str, RouteClass]:
+    """
+    Route class settings: ADMISSION_<CLASS>_LIMIT / _MIN_LIMIT / _MAX_LIMIT / _QUEUE /
+    _QUEUE_TIMEOUT if set, else the defaults with max_limit capped by `db_connections`.
+    """
+    classes = {}
+    for name, (initial, minimum, maximum, queue, timeout, share) in ROUTE_CLASS_DEFAULTS.items():
+        if db_connections:
+            maximum = max(minimum, min(maximum, int(db_connections * share)))
+        prefix = f"ADMISSION_{name.upper()}_"
+        maximum = int(os.getenv(prefix + "MAX_LIMIT", str(maximum)))
+        classes[name] = RouteClass(
+            name=name,
+            initial_limit=int(os.getenv(prefix + "LIMIT", str(min(initial, maximum)))),
+            min_limit=int(os.getenv(prefix + "MIN_LIMIT", str(minimum))),
+            max_limit=maximum,
+            queue_size=int(os.getenv(prefix + "QUEUE", str(queue))),
+            queue_timeout=float(os.getenv(prefix + "QUEUE_TIMEOUT", str(timeout))),
+        )
+    return classes
+
+
+def pool_capacity(engine) -> Optional[int]:
+    """Connections `engine`'s pool can hand out at once, or None if it is unbounded."""
+    pool = engine.pool
+    size, overflow = getattr(pool, "size", None), getattr(pool, "_max_overflow", None)
+    if not callable(size) or overflow is None or overflow < 0:
+        return None
+    return size() + overflow
+
+
+# (method or "*", path prefix) -> route class; the first match wins, anything else is "crud".
+ROUTE_RULES: List[Tuple[str, str, Optional[str]]] = [
+    ("*", "/api/admin", None),
+    ("*", "/docs", None),
+    ("*", "/redoc", None),
+    ("*", "/openapi.json", None),
+    ("POST", "/api/career/generate-roadmap", "ai"),
+    ("POST", "/api/interview/feedback", "ai"),
+    ("POST", "/api/interview/sessions/batch", "ai"),
+    ("POST", "/api/interview/mock", "ai"),
+    ("POST", "/api/market-insights", "ai"),
+    ("POST", "/api/resume/review", "ai"),
+    ("POST", "/api/chat", "ai"),
+    ("*", "/api/auth", "auth"),
+]
+# Exact paths that are never shed.
+EXEMPT_PATHS = {"/", "/welcome"}
+
+_ID_SEGMENT = re.compile(r"/\d+(?=/|$)")
+
+
+def classify(method: str, path: str) -> Optional[str]:
+    """Route class of a request, or None if it bypasses admission control."""
+    if path in EXEMPT_PATHS:
+        return None
+    for rule_method, prefix, route_class in ROUTE_RULES:
+        if (rule_method == "*" or rule_method == method) and (
+                path == prefix or path.startswith(prefix + "/")):
+            return route_class
+    return "crud"
+
+
+def endpoint_key(method: str, path: str) -> str:
+    """`GET /api/profile/skills/{id}`: numeric path segments collapsed, for per-endpoint baselines."""
+    return f"{method} {_ID_SEGMENT.sub('/{id}', path)}"
+
+
+class _Baseline:
+    """Fastest recent latency of one endpoint: its no-load round trip."""
+
+    __slots__ = ("value", "window_min", "count")
+
+    def __init__(self, seconds: float):
+        self.value = self.window_min = seconds
+        self.count = 0
+
+    def add(self, seconds: float) -> float:
+        self.value = min(self.value, seconds)
+        self.window_min = min(self.window_min, seconds)
+        self.count += 1
+        if self.count >= BASELINE_WINDOW:
+            self.value, self.window_min, self.count = self.window_min, math.inf, 0
+        return self.value
+
+
+class AdaptiveLimiter:
+    """
+    Concurrency limit with a priority queue for one route class.
+
+    Runs on the event loop only, so it needs no locks.
+    """
+
+    def __init__(self, route_class: RouteClass):
+        self.route_class = route_class
+        self.limit = float(route_class.initial_limit)
+        self.in_flight = 0
+        self._queue: List[Tuple[int, int, asyncio.Future]] = []  # heap of (priority, seq, future)
+        self._seq = itertools.count()
+        self._baselines: Dict[str, _Baseline] = {}
+        self._last_decrease = 0.0
+        self._latency_ewma: Optional[float] = None
+        self.admitted = 0
+        self.rejected = 0
+
+    @property
+    def queued(self) -> int:
+        return sum(1 for _, _, future in self._queue if not future.done())
+
+    async def acquire(self, priority: int) -> bool:
+        """
+        Takes a slot, waiting in the queue if the class is at its limit.
+
+        `priority` 0 is served before 1. Returns False if the request must be
+        rejected: the queue is full or the wait timed out.
+        """
+        if self.in_flight < int(self.limit) and not self.queued:
+            self.in_flight += 1
+            self.admitted += 1
+            return True
+        if self.queued >= self.route_class.queue_size and not self._evict_for(priority):
+            self.rejected += 1
+            return False
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (priority, next(self._seq), future))
+        try:
+            admitted = await asyncio.wait_for(asyncio.shield(future), self.route_class.queue_timeout)
+        except asyncio.TimeoutError:
+            admitted = False
+        except asyncio.CancelledError:
+            # Client went away while waiting; hand back a slot granted in the meantime.
+            if future.done() and not future.cancelled() and future.result():
+                self.release()
+            else:
+                future.cancel()
+            raise
+        if not admitted:
+            if not future.done():
+                future.cancel()
+            elif future.result():
+                # Granted just as the wait timed out: keep it.
+                self.admitted += 1
+                return True
+            self.rejected += 1
+            return False
+        self.admitted += 1
+        return True
+
+    def _evict_for(self, priority: int) -> bool:
+        """Frees a queue place for `priority` by rejecting the newest waiter of a lower priority."""
+        victims = [entry for entry in self._queue if entry[0] > priority and not entry[2].done()]
+        if not victims:
+            return False
+        victim = max(victims, key=lambda entry: (entry[0], entry[1]))
+        victim[2].set_result(False)
+        return True
+
+    def release(self):
+        self.in_flight -= 1
+        self._dispatch()
+
+    def _dispatch(self):
+        while self._queue and self.in_flight < int(self.limit):
+            _, _, future = heapq.heappop(self._queue)
+            if future.done():
+                continue
+            self.in_flight += 1
+            future.set_result(True)
+
+    def record(self, endpoint: str, seconds: float, failed: bool):
+        """Adjusts the limit from one completed request."""
+        baseline = self._baselines.get(endpoint)
+        if baseline is None:
+            baseline = self._baselines[endpoint] = _Baseline(seconds)
+        fastest = baseline.add(seconds)
+        self._latency_ewma = seconds if self._latency_ewma is None else 0.9 * self._latency_ewma + 0.1 * seconds
+
+        route_class = self.route_class
+        now = time.monotonic()
+        if failed or seconds > fastest * ADMISSION_LATENCY_TOLERANCE:
+            # At most one decrease per round trip, so one slow burst is not counted many times over.
+            if now - self._last_decrease >= seconds:
+                self.limit = max(route_class.min_limit, self.limit * ADMISSION_BACKOFF)
+                self._last_decrease = now
+        elif self.in_flight + 1 >= self.limit / 2:
+            # Only grow a limit that is actually being used.
+            self.limit = min(route_class.max_limit, self.limit + 1 / self.limit)
+        self._dispatch()
+
+    def retry_after(self) -> int:
+        """Seconds until a queued request would likely get a slot."""
+        per_request = self._latency_ewma or 1.0
+        waves = (self.queued + 1) / max(int(self.limit), 1)
+        return max(1, min(MAX_RETRY_AFTER_SECONDS, math.ceil(waves * per_request)))
+
+    def snapshot(self) -> Dict[str, object]:
+        return {
+            "limit": round(self.limit, 1),
+            "min_limit": self.route_class.min_limit,
+            "max_limit": self.route_class.max_limit,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "latency_ewma_ms": round(self._latency_ewma * 1000, 1) if self._latency_ewma is not None else None,
+        }
+
+
+# Built by AdmissionMiddleware from the worker's database pool.
+limiters: Dict[str, AdaptiveLimiter] = {}
+
+
+def admission_stats() -> Dict[str, Dict[str, object]]:
+    return {name: limiter.snapshot() for name, limiter in limiters.items()}
+
+
+def _request_priority(scope) -> int:
+    """0 for pro users (by the `role` claim of a valid bearer token), 1 for everyone else."""
+    from .security import request_claims
+    claims = request_claims(scope)
+    return 0 if claims and claims.get("role") == "pro" else 1
+
+
+_BUSY_BODY = json.dumps({"detail": "The server is busy. Please retry shortly."}).encode()
+
+
+class AdmissionMiddleware:
+    """ASGI middleware that admits, queues or sheds requests per route class."""
+
+    def __init__(self, app, db_connections: Optional[int] = None, enabled: bool = ADMISSION_CONTROL):
+        self.app = app
+        self.enabled = enabled
+        limiters.clear()
+        limiters.update({name: AdaptiveLimiter(rc) for name, rc in route_classes(db_connections).items()})
+
+    async def __call__(self, scope, receive, send):
+        route_class = classify(scope.get("method", ""), scope.get("path", "")) if scope["type"] == "http" else None
+        if not self.enabled or route_class is None:
+            await self.app(scope, receive, send)
+            return
+
+        limiter = limiters[route_class]
+        if not await limiter.acquire(_request_priority(scope)):
+            await self._reject(send, limiter.retry_after())
+            return
+
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            limiter.in_flight -= 1
+            limiter.record(endpoint_key(scope["method"], scope["path"]), time.perf_counter() - started, status >= 500)
+
+    @staticmethod
+    async def _reject(send, retry_after: int):
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(_BUSY_BODY)).encode()),
+                (b"retry-after", str(retry_after).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": _BUSY_BODY})
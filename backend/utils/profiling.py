@@ -0,0 +1,200 @@
+import asyncio
+import json
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# --- Per-Request Profiling ---
+# ProfilingMiddleware captures a statistical profile of selected requests:
+#   - every request carrying `X-Profile: 1` plus a valid `X-Admin-Token`, and
+#   - a random PROFILE_SAMPLE_RATE fraction of all other requests.
+# While a request is profiled, a sampler thread records the Python stacks of
+# every thread (including the threadpool running sync endpoints) and the code
+# reports time spent per phase (auth, db, llm, serialization). Profiles are
+# written as JSON to a bounded on-disk ring buffer and served by the admin
+# routes; the "folded" stacks feed flamegraph.pl or speedscope directly.
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_DIR = os.getenv("PROFILE_DIR", "./.profiles")
+PROFILE_MAX_FILES = int(os.getenv("PROFILE_MAX_FILES", "200"))
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+# Deepest frames kept per sample; keeps folded output bounded.
+MAX_STACK_DEPTH = 64
+
+_phases: ContextVar[Optional[Dict[str, float]]] = ContextVar("profile_phases", default=None)
+
+
+# --- Phase Timing ---
+
+def record_phase(name: str, seconds: float):
+    """Adds `seconds` to phase `name` of the request being profiled, if any."""
+    phases = _phases.get()
+    if phases is not None:
+        phases[name] = phases.get(name, 0.0) + seconds
+
+
+@contextmanager
+def phase(name: str):
+    """Times the enclosed block as phase `name`; free when the request is not profiled."""
+    if _phases.get() is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_phase(name, time.perf_counter() - start)
+
+
+# --- Stack Sampler ---
+
+class StackSampler(threading.Thread):
+    """Samples the stacks of all other threads at a fixed interval."""
+
+    def __init__(self, interval: float):
+        super().__init__(daemon=True, name="profile-sampler")
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop_event = threading.Event()
+
+    def run(self):
+        own_id = threading.get_ident()
+        names = {}
+        while not self._stop_event.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None and len(stack) < MAX_STACK_DEPTH:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                    frame = frame.f_back
+                if thread_id not in names:
+                    names = {t.ident: t.name for t in threading.enumerate()}
+                stack.append(names.get(thread_id, str(thread_id)))
+                self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join(timeout=1)
+
+
+# --- Ring Buffer Store ---
+
+class ProfileStore:
+    """Keeps the newest `max_files` profiles as JSON files in `directory`."""
+
+    def __init__(self, directory: str = PROFILE_DIR, max_files: int = PROFILE_MAX_FILES):
+        self.directory = Path(directory)
+        self.max_files = max_files
+        self._lock = threading.Lock()
+
+    def _files(self) -> List[Path]:
+        if not self.directory.exists():
+            return []
+        return sorted(self.directory.glob("*.json"))
+
+    def save(self, profile: dict):
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            name = f"{int(profile['started_at'] * 1000):015d}-{profile['id']}.json"
+            tmp = self.directory / (name + ".tmp")
+            tmp.write_text(json.dumps(profile))
+            os.replace(tmp, self.directory / name)
+            files = self._files()
+            for old in files[:max(len(files) - self.max_files, 0)]:
+                old.unlink(missing_ok=True)
+
+    def list(self) -> List[dict]:
+        """Metadata of stored profiles, newest first."""
+        summaries = []
+        for path in reversed(self._files()):
+            try:
+                profile = json.loads(path.read_text())
+            except (OSError, ValueError):
+                continue
+            profile.pop("folded", None)
+            summaries.append(profile)
+        return summaries
+
+    def get(self, profile_id: str) -> Optional[dict]:
+        for path in self.directory.glob(f"*-{profile_id}.json") if self.directory.exists() else []:
+            return json.loads(path.read_text())
+        return None
+
+
+profile_store = ProfileStore()
+
+
+# --- Middleware ---
+
+class ProfilingMiddleware:
+    """ASGI middleware that profiles sampled or explicitly requested requests."""
+
+    def __init__(self, app, sample_rate: float = PROFILE_SAMPLE_RATE, store: ProfileStore = profile_store):
+        self.app = app
+        self.sample_rate = sample_rate
+        self.store = store
+
+    def _wants_profile(self, scope) -> bool:
+        headers = dict(scope.get("headers") or [])
+        if headers.get(b"x-profile") == b"1":
+            from .security import is_admin_token
+            if is_admin_token(headers.get(b"x-admin-token", b"").decode("latin-1")):
+                return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._wants_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = uuid.uuid4().hex[:12]
+        phases: Dict[str, float] = {}
+        token = _phases.set(phases)
+        status_code = 500
+        sampler = StackSampler(PROFILE_INTERVAL_MS / 1000.0)
+        started_at = time.time()
+        start = time.perf_counter()
+        sampler.start()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"x-profile-id", profile_id.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - start
+            sampler.stop()
+            _phases.reset(token)
+            profile = {
+                "id": profile_id,
+                "method": scope.get("method"),
+                "path": scope.get("path"),
+                "status": status_code,
+                "started_at": started_at,
+                "duration_ms": round(duration * 1000, 3),
+                "phases_ms": {k: round(v * 1000, 3) for k, v in sorted(phases.items())},
+                "samples": sampler.samples,
+                "interval_ms": PROFILE_INTERVAL_MS,
+                "folded": [f"{stack} {count}" for stack, count in sampler.stacks.most_common()],
+            }
+            try:
+                await asyncio.to_thread(self.store.save, profile)
+            except OSError as e:
+                print(f"Could not store profile {profile_id}: {e}")
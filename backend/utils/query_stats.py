@@ -0,0 +1,231 @@
+import logging
+import os
+import re
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+from .profiling import record_phase
+
+logger = logging.getLogger(__name__)
+
+# --- SQL Query Instrumentation ---
+# `install_query_instrumentation(engine)` hooks SQLAlchemy's cursor events to:
+#   - count and time every statement of the current request (QueryStatsMiddleware),
+#   - log statements slower than SLOW_QUERY_MS with normalized SQL and redacted parameters,
+#   - capture the EXPLAIN plan of SELECTs slower than EXPLAIN_QUERY_MS,
+#   - feed `assert_query_budget`, which fails when a block issues too many statements.
+# Recent slow queries are kept in memory and served at /api/admin/slow-queries.
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "100"))
+EXPLAIN_QUERY_MS = float(os.getenv("EXPLAIN_QUERY_MS", "250"))
+# Requests issuing more statements than this are logged as likely N+1 patterns.
+REQUEST_QUERY_WARN_COUNT = int(os.getenv("REQUEST_QUERY_WARN_COUNT", "25"))
+# Adds X-Query-Count / X-Query-Time-Ms response headers (benchmarks, local debugging).
+QUERY_STATS_HEADERS = os.getenv("QUERY_STATS_HEADERS", "0") == "1"
+# The same normalized statement is EXPLAINed at most once per interval.
+EXPLAIN_INTERVAL_SECONDS = 600
+SLOW_QUERY_HISTORY = 200
+
+
+# --- SQL Normalization ---
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*(?:\?|%s|:\w+|%\(\w+\)s)(?:\s*,\s*(?:\?|%s|:\w+|%\(\w+\)s))*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_sql(statement: str) -> str:
+    """Collapses whitespace, strips literals and folds `IN (?, ?, ...)` lists into one shape."""
+    sql = _WHITESPACE.sub(" ", statement).strip()
+    sql = _STRING_LITERAL.sub("?", sql)
+    sql = _NUMBER_LITERAL.sub("?", sql)
+    return _PLACEHOLDER_LIST.sub("(...)", sql)
+
+
+def redact_parameters(parameters, executemany: bool = False) -> str:
+    """Describes bound parameters by type only, so values never reach the logs."""
+    if parameters is None:
+        return "[]"
+    if executemany and isinstance(parameters, (list, tuple)) and parameters:
+        # Bulk inserts can carry thousands of rows; describe the first one.
+        return f"{len(parameters)} x {redact_parameters(parameters[0])}"
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{k}: <{type(v).__name__}>" for k, v in parameters.items()) + "}"
+    if isinstance(parameters, (list, tuple)):
+        return "[" + ", ".join(f"<{type(v).__name__}>" for v in parameters) + "]"
+    return f"<{type(parameters).__name__}>"
+
+
+# --- Statistics ---
+
+class QueryStats:
+    """Statement count and time for one request (or one `assert_query_budget` block)."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.statements: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def add(self, normalized: str, seconds: float):
+        with self._lock:
+            self.count += 1
+            self.seconds += seconds
+            self.statements[normalized] += 1
+
+    def summary(self, top: int = 5) -> str:
+        lines = [f"{self.count} statements in {self.seconds * 1000:.1f} ms"]
+        for sql, n in self.statements.most_common(top):
+            lines.append(f"  {n:>4} x {sql[:200]}")
+        return "\n".join(lines)
+
+
+_request_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+# Budgets watch every statement in the process, because test clients run the
+# app in another thread and context variables do not cross that boundary.
+_budgets: List[QueryStats] = []
+_budgets_lock = threading.Lock()
+
+slow_queries: deque = deque(maxlen=SLOW_QUERY_HISTORY)
+_explained_at: Dict[str, float] = {}
+
+
+def current_stats() -> Optional[QueryStats]:
+    return _request_stats.get()
+
+
+# --- EXPLAIN ---
+
+def _explain(conn, statement: str, parameters) -> Optional[List[str]]:
+    dialect = conn.dialect.name
+    if dialect == "sqlite":
+        prefix = "EXPLAIN QUERY PLAN "
+    elif dialect in ("postgresql", "mysql", "mariadb"):
+        prefix = "EXPLAIN "
+    else:
+        return None
+    # A separate DBAPI cursor, so the statement's own result set is untouched
+    # and the EXPLAIN itself is not counted.
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute(prefix + statement, parameters)
+        return [" | ".join(str(col) for col in row) for row in cursor.fetchall()]
+    finally:
+        cursor.close()
+
+
+def _record_slow_query(conn, statement: str, parameters, normalized: str, elapsed_ms: float, executemany: bool):
+    entry = {
+        "sql": normalized,
+        "parameters": redact_parameters(parameters, executemany),
+        "duration_ms": round(elapsed_ms, 3),
+        "at": time.time(),
+        "plan": None,
+    }
+    now = time.monotonic()
+    if (elapsed_ms >= EXPLAIN_QUERY_MS and not executemany
+            and normalized.lstrip().upper().startswith("SELECT")
+            and now - _explained_at.get(normalized, -EXPLAIN_INTERVAL_SECONDS) >= EXPLAIN_INTERVAL_SECONDS):
+        _explained_at[normalized] = now
+        try:
+            entry["plan"] = _explain(conn, statement, parameters)
+        except Exception as e:
+            logger.warning("EXPLAIN failed for slow query: %s", e)
+    slow_queries.append(entry)
+    plan = "\n    ".join(entry["plan"]) if entry["plan"] else "-"
+    logger.warning("Slow query (%.1f ms): %s params=%s\n  plan:\n    %s",
+                   elapsed_ms, normalized, entry["parameters"], plan)
+
+
+# --- Engine Hooks ---
+
+def install_query_instrumentation(engine):
+    """Registers the counting, timing, slow-query and EXPLAIN hooks on `engine`."""
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get("query_start")
+        if not starts:
+            return
+        elapsed = time.perf_counter() - starts.pop()
+        record_phase("db", elapsed)
+
+        stats = _request_stats.get()
+        if stats is None and not _budgets and elapsed * 1000 < SLOW_QUERY_MS:
+            return
+        normalized = normalize_sql(statement)
+        if stats is not None:
+            stats.add(normalized, elapsed)
+        if _budgets:
+            with _budgets_lock:
+                for budget in _budgets:
+                    budget.add(normalized, elapsed)
+        if elapsed * 1000 >= SLOW_QUERY_MS:
+            _record_slow_query(conn, statement, parameters, normalized, elapsed * 1000, executemany)
+
+
+# --- Middleware ---
+
+class QueryStatsMiddleware:
+    """ASGI middleware that collects QueryStats per request and flags statement-heavy requests."""
+
+    def __init__(self, app, warn_count: int = REQUEST_QUERY_WARN_COUNT, headers: bool = QUERY_STATS_HEADERS):
+        self.app = app
+        self.warn_count = warn_count
+        self.headers = headers
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = _request_stats.set(stats)
+
+        async def send_wrapper(message):
+            if self.headers and message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-query-count", str(stats.count).encode()))
+                headers.append((b"x-query-time-ms", f"{stats.seconds * 1000:.3f}".encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request_stats.reset(token)
+            if stats.count > self.warn_count:
+                logger.warning("%s %s issued %s", scope.get("method"), scope.get("path"), stats.summary())
+
+
+# --- Query Budgets ---
+
+@contextmanager
+def assert_query_budget(max_queries: int, label: str = "block"):
+    """
+    Fails with AssertionError when the enclosed block issues more than
+    `max_queries` statements, listing the most repeated ones.
+
+    Example:
+        with assert_query_budget(3, "GET /api/users/me"):
+            client.get("/api/users/me", headers=auth_headers)
+    """
+    stats = QueryStats()
+    with _budgets_lock:
+        _budgets.append(stats)
+    try:
+        yield stats
+    finally:
+        with _budgets_lock:
+            _budgets.remove(stats)
+    if stats.count > max_queries:
+        raise AssertionError(f"{label} exceeded its query budget of {max_queries}: {stats.summary()}")
@@ -1,12 +1,16 @@
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
-from fastapi import HTTPException, status
+from fastapi import HTTPException, Header, status
 from passlib.context import CryptContext
 from fastapi.security import OAuth2PasswordBearer
+import hashlib
 import os
+import secrets
 from dotenv import load_dotenv
 
+from .profiling import phase
+
 load_dotenv()
 
 # Security configuration
@@ -16,6 +20,9 @@ if not JWT_SECRET_KEY:
 
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "30"))
+# Shared secret for operator-only endpoints (profiles, exports). Admin routes are disabled when unset.
+ADMIN_API_TOKEN = os.getenv("ADMIN_API_TOKEN")
 
 # Password hashing configuration
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -26,17 +33,33 @@ def get_password_hash(password: str) -> str:
     """Hash a password using bcrypt"""
     if not password:
         raise ValueError("Password cannot be empty")
-    return pwd_context.hash(password)
+    with phase("auth"):
+        return pwd_context.hash(password)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash"""
     if not plain_password or not hashed_password:
         return False
     try:
-        return pwd_context.verify(plain_password, hashed_password)
+        with phase("auth"):
+            return pwd_context.verify(plain_password, hashed_password)
     except Exception:
         return False
 
+def is_admin_token(token: Optional[str]) -> bool:
+    """Check a value against ADMIN_API_TOKEN in constant time"""
+    if not ADMIN_API_TOKEN or not token:
+        return False
+    return secrets.compare_digest(token, ADMIN_API_TOKEN)
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """Dependency for operator-only endpoints; expects an X-Admin-Token header"""
+    if not is_admin_token(x_admin_token):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin token required",
+        )
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token"""
     to_encode = data.copy()
@@ -48,12 +71,51 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     to_encode.update({"exp": expire})
     return jwt.encode(to_encode, JWT_SECRET_KEY, algorithm=ALGORITHM)
 
-def verify_token(token: str) -> dict:
+def generate_refresh_token() -> str:
+    """Create an opaque, URL-safe refresh token"""
+    return secrets.token_urlsafe(32)
+
+def hash_refresh_token(token: str) -> str:
+    """
+    Hash a refresh token for storage and lookup.
+
+    Refresh tokens are long random strings, so a fast SHA-256 is enough here;
+    unlike passwords they do not need bcrypt.
+    """
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+def request_claims(scope) -> Optional[dict]:
+    """
+    Claims of the request's bearer token, or None when it is missing or invalid.
+
+    The middlewares that route by user (admission priority, idempotency keys,
+    model routing) and the auth dependencies all need them. The token is verified
+    once per request and the result is kept in scope["state"].
+    """
+    state = scope.setdefault("state", {})
+    if "token_claims" in state:
+        return state["token_claims"]
+    claims = None
+    for name, value in scope.get("headers") or []:
+        if name == b"authorization":
+            if value[:7].lower() == b"bearer ":
+                try:
+                    with phase("auth"):
+                        claims = jwt.decode(value[7:].decode("latin-1"), JWT_SECRET_KEY, algorithms=[ALGORITHM])
+                except (JWTError, UnicodeDecodeError):
+                    claims = None
+            break
+    state["token_claims"] = claims
+    return claims
+
+def verify_token(token: str, scope=None) -> dict:
     """
     Verify a JWT token and return the decoded payload
     
     Args:
         token (str): The JWT token to verify
+        scope: The ASGI scope of the request `token` came from, if any; claims
+            already verified for it are reused
         
     Returns:
         dict: The decoded token payload
@@ -61,8 +123,13 @@ def verify_token(token: str) -> dict:
     Raises:
         HTTPException: If token is invalid or expired
     """
+    if scope is not None:
+        claims = request_claims(scope)
+        if claims is not None and claims.get("sub") is not None:
+            return claims
     try:
-        payload = jwt.decode(token, JWT_SECRET_KEY, algorithms=[ALGORITHM])
+        with phase("auth"):
+            payload = jwt.decode(token, JWT_SECRET_KEY, algorithms=[ALGORITHM])
         email: str = payload.get("sub")
         if email is None:
             raise HTTPException(
@@ -0,0 +1,68 @@
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, Iterable
+
+import orjson
+from fastapi.responses import JSONResponse, Response
+from pydantic import TypeAdapter
+
+from .profiling import phase
+
+# --- Fast JSON Serialization ---
+# FastJSONResponse is the app's default response class: orjson renders
+# datetime/date/UUID natively and Decimal via `_default`. For schema-shaped
+# responses, `schema_response` validates the ORM object once and lets
+# pydantic-core write the JSON bytes directly, skipping FastAPI's second
+# validation pass and jsonable_encoder walk.
+
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def _default(obj: Any) -> Any:
+    # Matches pydantic's JSON mode, which emits Decimal as a string ("3.50").
+    if isinstance(obj, Decimal):
+        return str(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=_default, option=_ORJSON_OPTIONS)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson."""
+
+    def render(self, content: Any) -> bytes:
+        with phase("serialization"):
+            return dumps(content)
+
+
+@lru_cache(maxsize=None)
+def get_adapter(tp: Any) -> TypeAdapter:
+    """Returns a TypeAdapter for `tp`, built once per type."""
+    return TypeAdapter(tp)
+
+
+def serialize(tp: Any, obj: Any) -> bytes:
+    """Validates `obj` (ORM instance, dict, list, ...) as `tp` and returns JSON bytes."""
+    adapter = get_adapter(tp)
+    with phase("serialization"):
+        return adapter.dump_json(adapter.validate_python(obj, from_attributes=True))
+
+
+def schema_response(tp: Any, obj: Any, status_code: int = 200) -> Response:
+    """
+    Builds a JSON response for `obj` shaped by the schema `tp`.
+
+    Keep `response_model=tp` on the route for the OpenAPI docs; FastAPI does not
+    re-validate when a Response instance is returned.
+    """
+    return Response(content=serialize(tp, obj), status_code=status_code, media_type="application/json")
+
+
+def warm_up(types: Iterable[Any]):
+    """Builds the serializers for `types` ahead of the first request."""
+    for tp in types:
+        get_adapter(tp)
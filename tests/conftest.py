@@ -0,0 +1,54 @@
+import os
+import tempfile
+
+# --- Test Settings ---
+# Settings are read when backend modules are imported, so they are set here,
+# before any test module imports the app. Everything lives in a throwaway
+# directory: a SQLite database (migrated at app startup), in-memory caches and
+# no real model provider.
+_TMP_DIR = tempfile.mkdtemp(prefix="careerup-tests-")
+
+os.environ["DATABASE_URL"] = f"sqlite:///{_TMP_DIR}/app.db"
+os.environ["DATABASE_REPLICA_URLS"] = ""
+os.environ["CACHE_URL"] = "memory://"
+os.environ["IDEMPOTENCY_URL"] = "memory://"
+os.environ["ARCHIVE_DIR"] = f"{_TMP_DIR}/archive"
+os.environ["RESUME_UPLOAD_DIR"] = f"{_TMP_DIR}/uploads"
+os.environ["MIGRATE_ON_STARTUP"] = "1"
+os.environ.setdefault("JWT_SECRET_KEY", "test-secret")
+os.environ.setdefault("ADMIN_API_TOKEN", "test-admin")
+os.environ.setdefault("LITELLM_LOCAL_MODEL_COST_MAP", "True")
+
+import itertools
+
+import pytest
+from fastapi.testclient import TestClient
+
+_emails = itertools.count(1)
+
+
+@pytest.fixture(scope="session")
+def client():
+    from backend.benchmarks.fake_llm import FakeLLM, FakeLLMConfig, install
+    from backend.main import app
+
+    install(FakeLLM(FakeLLMConfig(latency_ms=1, latency_distribution="constant", tokens_per_second=0)))
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture
+def register(client):
+    """Registers a new user and returns their bearer headers."""
+    def register():
+        email = f"student{next(_emails)}@example.com"
+        client.post("/api/auth/register", json={"full_name": "Test Student", "email": email, "password": "secret123"})
+        token = client.post("/api/auth/login", data={"username": email, "password": "secret123"}).json()["access_token"]
+        return {"Authorization": f"Bearer {token}"}
+    return register
+
+
+@pytest.fixture
+def auth_headers(register):
+    """Bearer headers of a freshly registered user."""
+    return register()
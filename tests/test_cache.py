@@ -0,0 +1,120 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from backend.services.cache import Cache, LRUBackend, SQLiteBackend, TieredBackend
+
+# --- Shared Cache ---
+# Runs against the SQLite tier, the local stand-in for Redis: two TieredBackends
+# on one file behave like two uvicorn workers.
+
+
+def _worker(path: str, local_ttl: float = 30) -> TieredBackend:
+    return TieredBackend(LRUBackend(), SQLiteBackend(path), local_ttl=local_ttl)
+
+
+def test_entries_expire_after_their_ttl(tmp_path):
+    cache = Cache("ttl", _worker(str(tmp_path / "cache.db")), ttl=0.2)
+    cache.set("key", {"value": 1})
+    assert cache.get("key") == {"value": 1}
+    time.sleep(0.3)
+    assert cache.get("key") is None
+
+
+def test_local_tier_does_not_outlive_the_shared_ttl(tmp_path):
+    path = str(tmp_path / "cache.db")
+    writer, reader = _worker(path), _worker(path, local_ttl=60)
+    Cache("ttl", writer).set("key", "value", ttl=0.2)
+    # Copies the entry into the reader's LRU, capped at the 0.2s left in the shared tier.
+    assert Cache("ttl", reader).get("key") == "value"
+    time.sleep(0.3)
+    assert Cache("ttl", reader).get("key") is None
+
+
+def test_versions_are_separate_namespaces(tmp_path):
+    backend = _worker(str(tmp_path / "cache.db"))
+    Cache("roadmaps", backend, version=1).set("data analyst", "old prompt")
+    assert Cache("roadmaps", backend, version=2).get("data analyst") is None
+    assert Cache("other", backend, version=1).get("data analyst") is None
+    assert Cache("roadmaps", backend, version=1).get("data analyst") == "old prompt"
+
+
+def test_workers_share_entries_through_the_sqlite_tier(tmp_path):
+    path = str(tmp_path / "cache.db")
+    first, second = Cache("insights", _worker(path)), Cache("insights", _worker(path))
+    first.set("ml engineer", {"demand": "High"})
+    assert second.get("ml engineer") == {"demand": "High"}
+
+    # A worker started later still sees it.
+    assert Cache("insights", _worker(path)).get("ml engineer") == {"demand": "High"}
+
+
+def test_get_or_set_calls_the_factory_once_across_workers(tmp_path):
+    path = str(tmp_path / "cache.db")
+    calls = []
+
+    def factory():
+        calls.append(1)
+        return "roadmap"
+
+    assert Cache("roadmaps", _worker(path)).get_or_set("sde", factory) == "roadmap"
+    assert Cache("roadmaps", _worker(path)).get_or_set("sde", factory) == "roadmap"
+    assert len(calls) == 1
+
+
+def test_local_false_reads_through_to_the_shared_tier(tmp_path):
+    path = str(tmp_path / "cache.db")
+    a, b = _worker(path), _worker(path)
+    Cache("state", a, local=False).set("key", {"answered": 0})
+    assert Cache("state", b, local=False).get("key") == {"answered": 0}
+
+    Cache("state", a, local=False).set("key", {"answered": 1})
+
+    # A local tier would still hold {"answered": 0} for up to 30s.
+    assert Cache("state", b, local=False).get("key") == {"answered": 1}
+
+
+def test_compare_and_set_only_replaces_the_expected_value(tmp_path):
+    for backend in (LRUBackend(), SQLiteBackend(str(tmp_path / "cas.db")), _worker(str(tmp_path / "tiered.db"))):
+        assert backend.compare_and_set("key", None, b"1", ttl=30)
+        assert not backend.compare_and_set("key", None, b"2", ttl=30)
+        assert not backend.compare_and_set("key", b"0", b"2", ttl=30)
+        assert backend.compare_and_set("key", b"1", b"2", ttl=30)
+        assert backend.get("key") == b"2"
+
+
+def test_compare_and_set_treats_an_expired_value_as_missing(tmp_path):
+    for backend in (LRUBackend(), SQLiteBackend(str(tmp_path / "cas.db"))):
+        backend.set("key", b"old", ttl=0.05)
+        time.sleep(0.1)
+        assert not backend.compare_and_set("key", b"old", b"new")
+        assert backend.compare_and_set("key", None, b"new")
+
+
+def test_update_is_atomic_across_workers(tmp_path):
+    path = str(tmp_path / "cache.db")
+    workers = [Cache("counter", _worker(path), local=False) for _ in range(2)]
+
+    def increment(cache):
+        for _ in range(100):
+            cache.update("count", lambda count: (count or 0) + 1)
+
+    with ThreadPoolExecutor(2) as pool:
+        list(pool.map(increment, workers))
+
+    assert workers[0].get("count") == 200
+
+
+def test_update_aborts_when_the_change_raises(tmp_path):
+    cache = Cache("state", _worker(str(tmp_path / "cache.db")), local=False)
+    cache.set("key", {"claimed": True})
+
+    def claim(state):
+        if state["claimed"]:
+            raise LookupError("taken")
+        return {"claimed": True}
+
+    with pytest.raises(LookupError):
+        cache.update("key", claim)
+    assert cache.get("key") == {"claimed": True}
@@ -0,0 +1,52 @@
+import json
+
+from backend.services import chat_service
+
+# --- Chat Replies ---
+
+
+def _events(response):
+    return [json.loads(line[len("data: "):]) for line in response.text.splitlines() if line.startswith("data: ")]
+
+
+def _empty_reply(monkeypatch):
+    async def stream_reply(turn):
+        return
+        yield
+
+    async def reply(turn):
+        return ""
+
+    monkeypatch.setattr(chat_service, "stream_reply", stream_reply)
+    monkeypatch.setattr(chat_service, "reply", reply)
+
+
+def _roles(client, headers, conversation_id):
+    detail = client.get(f"/api/chat/conversations/{conversation_id}", headers=headers).json()
+    return [m["role"] for m in detail["messages"]]
+
+
+def test_streamed_reply_is_saved(client, auth_headers):
+    events = _events(client.post("/api/chat", headers=auth_headers, json={"message": "How do I learn SQL?"}))
+
+    assert [e["type"] for e in events][0] == "start"
+    assert events[-1]["type"] == "done"
+    assert "".join(e["text"] for e in events if e["type"] == "delta")
+    assert _roles(client, auth_headers, events[0]["conversation_id"])[-1] == "assistant"
+
+
+def test_empty_stream_is_an_error_and_not_saved(client, auth_headers, monkeypatch):
+    _empty_reply(monkeypatch)
+
+    events = _events(client.post("/api/chat", headers=auth_headers, json={"message": "Hello?"}))
+
+    assert [e["type"] for e in events] == ["start", "error"]
+    assert "assistant" not in _roles(client, auth_headers, events[0]["conversation_id"])
+
+
+def test_empty_reply_without_streaming_is_unavailable(client, auth_headers, monkeypatch):
+    _empty_reply(monkeypatch)
+
+    response = client.post("/api/chat", headers=auth_headers, json={"message": "Hello?", "stream": False})
+
+    assert response.status_code == 503
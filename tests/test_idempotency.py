@@ -0,0 +1,183 @@
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from jose import jwt
+
+from backend.services import gemini_service, idempotency
+from backend.services.idempotency import COMPLETED, IN_PROGRESS, IdempotencyRecord, SQLiteIdempotencyStore
+
+# --- Idempotency Keys ---
+
+FEEDBACK = {"question": "How would you speed up a slow query?", "user_answer": "Add an index on the filter column."}
+
+
+def _key():
+    return {"Idempotency-Key": uuid.uuid4().hex}
+
+
+@pytest.fixture(autouse=True)
+def store(tmp_path):
+    """A fresh SQLite store per test, as the workers of one host share it."""
+    store = SQLiteIdempotencyStore(str(tmp_path / "idempotency.db"))
+    previous = idempotency.get_store()
+    idempotency.set_store(store)
+    yield store
+    idempotency.set_store(previous)
+
+
+@pytest.fixture
+def grading(monkeypatch):
+    """Counts grading calls; `seconds` slows them down and `fail` makes them raise."""
+    grade = gemini_service.evaluate_interview_answer
+    calls = []
+    options = {"seconds": 0, "fail": False}
+
+    def evaluate(question, user_answer):
+        calls.append(question)
+        time.sleep(options["seconds"])
+        if options["fail"]:
+            raise RuntimeError("grading failed")
+        return grade(question, user_answer)
+
+    monkeypatch.setattr(gemini_service, "evaluate_interview_answer", evaluate)
+    return calls, options
+
+
+def _feedback(client, headers, body=FEEDBACK):
+    return client.post("/api/interview/feedback", headers=headers, json=body)
+
+
+def test_retry_replays_the_stored_response(client, auth_headers, grading):
+    calls, _ = grading
+    headers = {**auth_headers, **_key()}
+
+    first = _feedback(client, headers)
+    retry = _feedback(client, headers)
+
+    assert first.status_code == retry.status_code == 200
+    assert retry.json() == first.json()
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert "Idempotent-Replayed" not in first.headers
+    assert len(calls) == 1
+
+
+def test_key_reused_with_a_different_body_is_rejected(client, auth_headers, grading):
+    headers = {**auth_headers, **_key()}
+    _feedback(client, headers)
+
+    response = _feedback(client, headers, {**FEEDBACK, "user_answer": "Something else entirely."})
+
+    assert response.status_code == 422
+    assert len(grading[0]) == 1
+
+
+def test_keys_are_scoped_per_user(client, register, grading):
+    key = _key()
+    _feedback(client, {**register(), **key})
+    response = _feedback(client, {**register(), **key})
+
+    assert "Idempotent-Replayed" not in response.headers
+    assert len(grading[0]) == 2
+
+
+def test_duplicate_waits_for_the_request_in_flight(client, auth_headers, grading):
+    calls, options = grading
+    options["seconds"] = 0.3
+    headers = {**auth_headers, **_key()}
+
+    with ThreadPoolExecutor(2) as pool:
+        responses = list(pool.map(lambda _: _feedback(client, headers), range(2)))
+
+    assert [r.status_code for r in responses] == [200, 200]
+    assert responses[0].json() == responses[1].json()
+    assert sorted(r.headers.get("Idempotent-Replayed", "") for r in responses) == ["", "true"]
+    assert len(calls) == 1
+
+
+def test_server_error_releases_the_key(client, auth_headers, grading):
+    calls, options = grading
+    headers = {**auth_headers, **_key()}
+    options["fail"] = True
+    assert _feedback(client, headers).status_code == 500
+
+    options["fail"] = False
+    retry = _feedback(client, headers)
+
+    assert retry.status_code == 200
+    assert "Idempotent-Replayed" not in retry.headers
+    assert len(calls) == 2
+
+
+def test_requests_without_a_key_are_not_deduplicated(client, auth_headers, grading):
+    _feedback(client, auth_headers)
+    _feedback(client, auth_headers)
+
+    assert len(grading[0]) == 2
+
+
+def test_token_is_verified_once_per_request(client, auth_headers, monkeypatch):
+    # Admission priority, the idempotency key scope, model routing and the user
+    # dependency all read the token's claims.
+    decode, calls = jwt.decode, []
+
+    def counting_decode(*args, **kwargs):
+        calls.append(1)
+        return decode(*args, **kwargs)
+
+    monkeypatch.setattr(jwt, "decode", counting_decode)
+
+    response = client.post("/api/interview/mock", headers={**auth_headers, **_key()},
+                           json={"role": "Data Analyst", "questions": 2})
+
+    assert response.status_code == 201
+    assert len(calls) == 1
+
+
+# --- Shared SQLite Store ---
+
+def _workers(store):
+    """A second store on the same file, as another worker process would open it."""
+    return store, SQLiteIdempotencyStore(store.path)
+
+
+def test_one_claim_wins_across_workers(store):
+    a, b = _workers(store)
+
+    assert a.claim("k", "fp", 60) is None
+    assert b.claim("k", "fp", 60).state == IN_PROGRESS
+
+    a.complete("k", IdempotencyRecord(COMPLETED, "fp", 200, [("content-type", "application/json")], b"{}"), 60)
+    record = b.claim("k", "fp", 60)
+    assert (record.state, record.status, record.headers, record.body) == (
+        COMPLETED, 200, [("content-type", "application/json")], b"{}")
+
+
+def test_released_key_can_be_claimed_by_another_worker(store):
+    a, b = _workers(store)
+    a.claim("k", "fp", 60)
+
+    a.release("k")
+
+    assert b.claim("k", "fp", 60) is None
+
+
+def test_expired_claim_is_taken_over(store):
+    a, b = _workers(store)
+    # A worker that died mid-request never completes or releases its claim.
+    a.claim("k", "fp", 0.05)
+    time.sleep(0.1)
+
+    assert b.claim("k", "other", 60) is None
+    assert a.get("k").state == IN_PROGRESS and a.get("k").fingerprint == "other"
+
+
+def test_expired_results_are_not_replayed(store):
+    a, b = _workers(store)
+    a.claim("k", "fp", 60)
+    a.complete("k", IdempotencyRecord(COMPLETED, "fp", 200), 0.05)
+    time.sleep(0.1)
+
+    assert b.get("k") is None
+    assert b.claim("k", "fp", 60) is None
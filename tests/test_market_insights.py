@@ -0,0 +1,41 @@
+import json
+
+from backend.routers.job_market import insights_cache
+from backend.services import prompts
+from backend.services.vertex_ai_service import vertex_ai_service
+
+
+def _serve(monkeypatch, reply):
+    calls = []
+
+    async def analyze_job_market(skills, location="global"):
+        calls.append(skills)
+        return reply
+
+    monkeypatch.setattr(vertex_ai_service, "analyze_job_market", analyze_job_market)
+    return calls
+
+
+def test_degraded_insights_are_flagged_and_not_cached(client, monkeypatch):
+    degraded = json.loads(prompts.render("job_market", skills="Data Analyst", location="global").degraded)
+    calls = _serve(monkeypatch, degraded)
+
+    first = client.post("/api/market-insights", json={"jobTitle": "Data Analyst"}).json()
+    second = client.post("/api/market-insights", json={"jobTitle": "Data Analyst"}).json()
+
+    assert first["degraded"] is True and second["degraded"] is True
+    assert len(calls) == 2
+    assert insights_cache.get("data analyst") is None
+
+
+def test_insights_are_cached_per_job_title(client, monkeypatch):
+    calls = _serve(monkeypatch, {"demand_level": "High", "salary_range": "10-20 LPA",
+                                 "emerging_trends": ["SQL", "Power BI"]})
+
+    first = client.post("/api/market-insights", json={"jobTitle": "BI  Developer"}).json()
+    second = client.post("/api/market-insights", json={"jobTitle": "bi developer"}).json()
+
+    assert first == second
+    assert first["degraded"] is False
+    assert [s["name"] for s in first["topSkills"]] == ["SQL", "Power BI"]
+    assert len(calls) == 1
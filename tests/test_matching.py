@@ -0,0 +1,40 @@
+from sqlalchemy import delete, func, select
+
+from backend.database import SessionLocal, engine
+from backend.matching import run_matching
+from backend.models import MarketTrend, RoleMatch
+
+# --- Batch Role Matching ---
+
+
+def _match_count():
+    with engine.connect() as conn:
+        return conn.execute(select(func.count()).select_from(RoleMatch)).scalar()
+
+
+def test_run_without_qualifying_roles_clears_old_matches(client, auth_headers):
+    client.post("/api/profile/skills", json={"skill_name": "Kubernetes", "proficiency": "Expert"},
+                headers=auth_headers)
+    with SessionLocal() as db:
+        trend = MarketTrend(role="Platform Engineer", skills_required=["Kubernetes", "Go"])
+        db.add(trend)
+        db.commit()
+        trend_id = trend.trend_id
+
+    try:
+        run = run_matching(workers=1, bind=engine, read_bind=engine)
+        assert run.roles == 1 and run.matches >= 1
+        assert _match_count() == run.matches
+
+        # The only role stops qualifying: its matches must not outlive it.
+        with SessionLocal() as db:
+            db.get(MarketTrend, trend_id).skills_required = []
+            db.commit()
+        run = run_matching(workers=1, bind=engine, read_bind=engine)
+
+        assert run.roles == 0
+        assert _match_count() == 0
+    finally:
+        with engine.begin() as conn:
+            conn.execute(delete(RoleMatch))
+            conn.execute(delete(MarketTrend).where(MarketTrend.trend_id == trend_id))
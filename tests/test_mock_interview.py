@@ -0,0 +1,116 @@
+import asyncio
+import itertools
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from backend.services import gemini_service, mock_interview
+from backend.services.cache import Cache, LRUBackend, SQLiteBackend, TieredBackend
+from backend.services.vertex_ai_service import vertex_ai_service
+
+
+def _slow_grading(monkeypatch, seconds=0.3, fail=False):
+    grade = gemini_service.evaluate_interview_answer
+
+    def evaluate(question, answer):
+        time.sleep(seconds)
+        if fail:
+            raise RuntimeError("grading failed")
+        return grade(question, answer)
+
+    monkeypatch.setattr(gemini_service, "evaluate_interview_answer", evaluate)
+
+
+def _start(client, headers):
+    response = client.post("/api/interview/mock", headers=headers, json={"role": "Backend Developer", "questions": 3})
+    assert response.status_code == 201
+    return response.json()["session_id"]
+
+
+def test_concurrent_answers_are_graded_once(client, auth_headers, monkeypatch):
+    session_id = _start(client, auth_headers)
+    _slow_grading(monkeypatch)
+
+    def answer():
+        return client.post(f"/api/interview/mock/{session_id}/answer", headers=auth_headers,
+                           json={"user_answer": "I would add an index."})
+
+    with ThreadPoolExecutor(2) as pool:
+        responses = list(pool.map(lambda _: answer(), range(2)))
+
+    assert sorted(r.status_code for r in responses) == [200, 409]
+    state = client.get(f"/api/interview/mock/{session_id}", headers=auth_headers).json()
+    assert state["answered"] == 1
+    sessions = client.get("/api/interview/sessions", headers=auth_headers).json()
+    assert len(sessions["sessions"]) == 1
+
+
+def test_failed_grading_frees_the_question(client, auth_headers, monkeypatch):
+    session_id = _start(client, auth_headers)
+    url = f"/api/interview/mock/{session_id}/answer"
+    _slow_grading(monkeypatch, seconds=0, fail=True)
+    assert client.post(url, headers=auth_headers, json={"user_answer": "First try."}).status_code == 500
+
+    monkeypatch.undo()
+    response = client.post(url, headers=auth_headers, json={"user_answer": "Second try."})
+
+    assert response.status_code == 200
+    assert response.json()["answered"] == 1
+
+
+# --- Sessions Shared By Workers ---
+# Two TieredBackends on one SQLite file behave like two uvicorn workers.
+
+@pytest.fixture
+def workers(tmp_path, monkeypatch):
+    """Switches mock_interview to worker 0's or worker 1's view of the shared store."""
+    path = str(tmp_path / "cache.db")
+    caches = [Cache("mock_interviews", TieredBackend(LRUBackend(), SQLiteBackend(path)),
+                    ttl=mock_interview.MOCK_INTERVIEW_TTL, local=False) for _ in range(2)]
+    numbers = itertools.count(1)
+
+    async def generate_interview_questions(role, count):
+        return [f"Question {next(numbers)} for {role}?" for _ in range(count)]
+
+    monkeypatch.setattr(vertex_ai_service, "generate_interview_questions", generate_interview_questions)
+    return lambda worker: monkeypatch.setattr(mock_interview, "sessions_cache", caches[worker])
+
+
+def test_claim_on_one_worker_is_seen_by_another(workers):
+    async def scenario():
+        workers(0)
+        interview = await mock_interview.start(1, "Backend Developer", 3)
+        workers(1)
+        # Worker 1 has read the session before worker 0 claims its question.
+        seen = await mock_interview.get(interview.session_id, 1)
+        workers(0)
+        await mock_interview.claim(interview, interview.current)
+        workers(1)
+        with pytest.raises(mock_interview.AnswerInProgress):
+            await mock_interview.claim(seen, seen.current)
+
+    asyncio.run(scenario())
+
+
+def test_answered_question_is_not_served_again_by_another_worker(workers):
+    async def scenario():
+        workers(0)
+        interview = await mock_interview.start(1, "Backend Developer", 3)
+        first = interview.current
+        workers(1)
+        seen = await mock_interview.get(interview.session_id, 1)
+        workers(0)
+        await mock_interview.claim(interview, first)
+        await mock_interview.advance(interview, first)
+
+        workers(1)
+        state = await mock_interview.get(interview.session_id, 1)
+        assert state.answered == 1 and state.current != first
+        # A late advance of the old question from the other worker changes nothing.
+        late = await mock_interview.advance(seen, first)
+        assert (late.answered, late.current) == (1, state.current)
+        with pytest.raises(mock_interview.AnswerInProgress):
+            await mock_interview.claim(seen, first)
+
+    asyncio.run(scenario())
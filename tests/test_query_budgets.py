@@ -0,0 +1,53 @@
+import pytest
+
+from backend.utils.query_stats import assert_query_budget
+
+# --- Query Budgets ---
+# Statement counts per request must not grow with the user's data: each
+# endpoint runs against a profile with several rows in every related table,
+# so an N+1 pattern (a lazy load per row) blows the budget.
+ROWS_PER_TABLE = 5
+
+
+@pytest.fixture
+def populated_headers(client, auth_headers):
+    for n in range(ROWS_PER_TABLE):
+        client.post("/api/profile/skills", json={"skill_name": f"Skill {n}", "proficiency": "Advanced"},
+                    headers=auth_headers)
+        client.post("/api/profile/projects", json={"title": f"Project {n}"}, headers=auth_headers)
+        client.post("/api/profile/experience", json={"company": f"Company {n}", "role": "Intern"},
+                    headers=auth_headers)
+        client.post("/api/profile/education", json={"degree": "BTech", "university": f"University {n}"},
+                    headers=auth_headers)
+        client.post("/api/interview/feedback", json={"question": f"Question {n}?", "user_answer": "An answer."},
+                    headers=auth_headers)
+    return auth_headers
+
+
+def test_users_me(client, populated_headers):
+    # User, then one selectin query per relationship.
+    with assert_query_budget(7, "GET /api/users/me"):
+        response = client.get("/api/users/me", headers=populated_headers)
+    assert response.status_code == 200
+    assert len(response.json()["interview_sessions"]) == ROWS_PER_TABLE
+
+
+def test_interview_history(client, populated_headers):
+    with assert_query_budget(3, "GET /api/interview/sessions"):
+        response = client.get("/api/interview/sessions", headers=populated_headers)
+    assert response.status_code == 200
+    assert len(response.json()["sessions"]) == ROWS_PER_TABLE
+
+
+def test_add_skill(client, populated_headers):
+    with assert_query_budget(3, "POST /api/profile/skills"):
+        response = client.post("/api/profile/skills", json={"skill_name": "SQL", "proficiency": "Expert"},
+                               headers=populated_headers)
+    assert response.status_code == 201
+
+
+def test_budget_failure_lists_the_repeated_statement(client, populated_headers):
+    with pytest.raises(AssertionError, match="exceeded its query budget of 1"):
+        with assert_query_budget(1, "two requests"):
+            client.get("/api/interview/sessions", headers=populated_headers)
+            client.get("/api/interview/sessions", headers=populated_headers)
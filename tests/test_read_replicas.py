@@ -0,0 +1,86 @@
+import itertools
+import os
+import time
+
+import pytest
+
+from backend import database
+from backend.benchmarks.replicas import copy_database
+from backend.utils.query_stats import assert_query_budget, install_query_instrumentation
+
+# --- Read Replica Routing ---
+# A copy of the test database stands in for a replica, as with
+# `python -m backend.benchmarks.replicas`. Its lag is how much older its file is
+# than the primary's. Reads of /api/users/me show which database served them:
+# the copy does not have skills added after it was taken.
+
+
+@pytest.fixture
+def replica(tmp_path, monkeypatch):
+    path = tmp_path / "replica.db"
+    copy_database(database.engine.url.database, str(path))
+    replica = database.Replica(f"sqlite:///{path}")
+    # As main.py does for every configured replica.
+    install_query_instrumentation(replica.engine)
+    monkeypatch.setattr(database, "replicas", [replica])
+    monkeypatch.setattr(database, "_replica_cycle", itertools.cycle([replica]))
+    yield replica
+    replica.engine.dispose()
+
+
+def refresh(replica, lag: float = 0.0):
+    """Copies the primary into the replica again, `lag` seconds behind it."""
+    copy_database(database.engine.url.database, replica.engine.url.database)
+    primary_mtime = database._sqlite_mtime(database.engine.url.database)
+    os.utime(replica.engine.url.database, (primary_mtime - lag, primary_mtime - lag))
+    replica.checked_at = 0.0  # re-probe on the next read
+
+
+def skills(client, headers):
+    response = client.get("/api/users/me", headers=headers)
+    assert response.status_code == 200
+    return [skill["skill_name"] for skill in response.json()["skills"]]
+
+
+def test_reads_go_to_a_fresh_replica(client, auth_headers, replica):
+    refresh(replica)
+    assert database.choose_replica() is replica
+    # A skill written to the primary only: the replica serves the read without it.
+    with database.engine.begin() as conn:
+        conn.exec_driver_sql(
+            "INSERT INTO skills (user_id, skill_name, proficiency) "
+            "SELECT user_id, 'Primary only', 'Expert' FROM users ORDER BY user_id DESC LIMIT 1")
+    os.utime(replica.engine.url.database)  # keep the stale copy looking fresh
+    replica.checked_at = 0.0
+    assert skills(client, auth_headers) == []
+
+
+def test_lagging_replica_falls_back_to_the_primary(client, auth_headers, replica):
+    refresh(replica, lag=database.REPLICA_MAX_LAG_SECONDS + 60)
+    assert database.choose_replica() is None
+    client.post("/api/profile/skills", json={"skill_name": "Python", "proficiency": "Advanced"},
+                headers=auth_headers)
+    assert skills(client, auth_headers) == ["Python"]
+
+
+def test_writers_read_their_writes_from_the_primary(client, auth_headers, replica, monkeypatch):
+    monkeypatch.setattr(database, "REPLICA_STICKY_SECONDS", 0.5)
+    refresh(replica)
+    response = client.post("/api/profile/skills", json={"skill_name": "SQL", "proficiency": "Expert"},
+                           headers=auth_headers)
+    assert response.status_code == 201
+    # The replica is fresh but predates the write; this user's reads stick to the primary.
+    os.utime(replica.engine.url.database, (time.time() + 5, time.time() + 5))
+    replica.checked_at = 0.0
+    assert skills(client, auth_headers) == ["SQL"]
+
+    time.sleep(0.6)
+    replica.checked_at = 0.0
+    assert skills(client, auth_headers) == []
+
+
+def test_replica_reads_count_toward_query_budgets(client, auth_headers, replica):
+    refresh(replica)
+    with assert_query_budget(7, "GET /api/users/me on a replica") as stats:
+        skills(client, auth_headers)
+    assert stats.count > 0
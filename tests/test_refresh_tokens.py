@@ -0,0 +1,65 @@
+import itertools
+from datetime import datetime, timedelta
+
+import pytest
+
+from backend.database import SessionLocal
+from backend.models import RefreshToken
+from backend.utils.security import hash_refresh_token
+
+# --- Refresh Token Rotation ---
+
+_emails = itertools.count(1)
+
+
+@pytest.fixture
+def refresh_token(client):
+    """Refresh token of a fresh login."""
+    email = f"rotation{next(_emails)}@example.com"
+    client.post("/api/auth/register", json={"full_name": "Test Student", "email": email, "password": "secret123"})
+    login = client.post("/api/auth/login", data={"username": email, "password": "secret123"}).json()
+    assert login["refresh_token"]
+    return login["refresh_token"]
+
+
+def _refresh(client, token):
+    return client.post("/api/auth/refresh", json={"refresh_token": token})
+
+
+def test_refresh_rotates_the_token(client, refresh_token):
+    response = _refresh(client, refresh_token)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["refresh_token"] != refresh_token
+    me = client.get("/api/users/me", headers={"Authorization": f"Bearer {body['access_token']}"})
+    assert me.status_code == 200
+    assert _refresh(client, body["refresh_token"]).status_code == 200
+
+
+def test_reused_token_revokes_the_family(client, refresh_token):
+    newest = _refresh(client, refresh_token).json()["refresh_token"]
+
+    assert _refresh(client, refresh_token).status_code == 401
+    # The theft response takes the legitimate holder's newest token with it.
+    assert _refresh(client, newest).status_code == 401
+
+
+def test_expired_token_is_rejected(client, refresh_token):
+    with SessionLocal() as db:
+        db.query(RefreshToken).filter(RefreshToken.token_hash == hash_refresh_token(refresh_token)).update(
+            {RefreshToken.expires_at: datetime.utcnow() - timedelta(seconds=1)}
+        )
+        db.commit()
+
+    assert _refresh(client, refresh_token).status_code == 401
+
+
+def test_logout_revokes_the_family(client, refresh_token):
+    newest = _refresh(client, refresh_token).json()["refresh_token"]
+
+    assert client.post("/api/auth/logout", json={"refresh_token": refresh_token}).status_code == 204
+
+    assert _refresh(client, newest).status_code == 401
+    # Unknown tokens are ignored.
+    assert client.post("/api/auth/logout", json={"refresh_token": "x" * 43}).status_code == 204
@@ -0,0 +1,26 @@
+import hashlib
+
+# --- Resume Review by Upload Id ---
+
+RESUME = b"Asha Verma\nEXPERIENCE\nData intern at Acme, built SQL dashboards.\nEDUCATION\nBTech CSE\n"
+
+
+def test_review_by_upload_id(client):
+    upload = client.post("/api/resume/upload", files={"file": ("resume.txt", RESUME, "text/plain")})
+    assert upload.status_code == 201
+    resume_id = upload.json()["resumeId"]
+    assert resume_id == hashlib.sha256(RESUME).hexdigest()
+
+    review = client.post("/api/resume/review", json={"resumeId": resume_id})
+    assert review.status_code == 200
+    assert review.json().get("feedback")
+
+
+def test_row_ids_are_not_accepted(client):
+    client.post("/api/resume/upload", files={"file": ("resume.txt", RESUME, "text/plain")})
+    assert client.post("/api/resume/review", json={"resumeId": 1}).status_code == 422
+
+
+def test_unknown_upload_id_is_not_found(client):
+    response = client.post("/api/resume/review", json={"resumeId": hashlib.sha256(b"someone else").hexdigest()})
+    assert response.status_code == 404
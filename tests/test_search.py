@@ -0,0 +1,44 @@
+import pytest
+
+from backend.services import search
+
+ADMIN = {"X-Admin-Token": "test-admin"}
+
+
+@pytest.fixture
+def add_project(client):
+    def add(headers, title, description):
+        response = client.post("/api/profile/projects", headers=headers,
+                               json={"title": title, "description": description})
+        assert response.status_code == 201
+    return add
+
+
+def test_best_match_is_ranked_even_when_newer_matches_fill_the_window(client, register, add_project, monkeypatch):
+    # The strongest match is the oldest document: it must not lose to newer, weaker ones.
+    add_project(register(), "Zephyrquark Engine", "A zephyrquark simulator.")
+    for _ in range(3):
+        add_project(register(), "Weather dashboard",
+                    "Charts, maps and alerts for farmers; one widget mentions zephyrquark in passing.")
+    monkeypatch.setattr(search, "SEARCH_RANK_WINDOW", 1)
+
+    response = client.get("/api/search/candidates", params={"q": "zephyrquark"}, headers=ADMIN)
+
+    assert response.status_code == 200
+    assert [c["title"] for c in response.json()["candidates"]] == ["Zephyrquark Engine"]
+
+
+def test_all_matches_are_found_within_the_window(client, register, add_project):
+    for _ in range(3):
+        add_project(register(), "Quillorbit tracker", "Tracks quillorbit launches.")
+
+    response = client.get("/api/search/candidates", params={"q": "quillorbit", "limit": 2}, headers=ADMIN)
+
+    body = response.json()
+    assert len(body["candidates"]) == 2
+    assert body["next_offset"] == 2
+
+
+def test_search_requires_a_word(client):
+    response = client.get("/api/search/candidates", params={"q": "+++"}, headers=ADMIN)
+    assert response.status_code == 400